@@ -2,6 +2,7 @@
 from fastapi import APIRouter, HTTPException, Query, status, Path, Request, Depends, Body
 from typing import List,Annotated, Optional
 from schemas.imports import ScenarioName
+from core.pagination import page_size
 from schemas.response_schema import APIResponse
 from schemas.session import SessionOut
 from schemas.tokens_schema import accessTokenOut
@@ -18,6 +19,7 @@ from security.account_status_check import check_admin_account_status_and_permiss
 from services.admin_service import (
     add_admin,
     remove_admin,
+    retrieve_admin_page,
     retrieve_admins,
     authenticate_admin,
     retrieve_admin_by_admin_id,
@@ -28,7 +30,7 @@ from services.admin_service import (
 )
 from services.email_service import send_invite_notification
 from security.auth import verify_token_to_refresh,verify_admin_token
-from services.session_service import remove_session, retrieve_sessions
+from services.session_service import parse_session_include, remove_session, retrieve_session_page, retrieve_sessions
 router = APIRouter(prefix="/admins", tags=["Admins"])
 
 
@@ -66,17 +68,23 @@ def _absolute_audio_urls(sessions: List[SessionOut], base_url: str) -> List[Sess
 )
 async def list_admins(
     start: Annotated[
-        int,
+        Optional[int],
         Query(ge=0, description="The starting index (offset) for the list of admins.")
-    ] , 
+    ] = None, 
     stop: Annotated[
-        int, 
+        Optional[int], 
         Query(gt=0, description="The ending index for the list of admins (limit).")
-    ]
+    ] = None,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: Optional[int] = Query(None, description="Page size for cursor pagination (default 100)"),
 ):
-    items = await retrieve_admins(start=0, stop=100)
-    
-    return APIResponse(status_code=200, data=items, detail="Fetched successfully")
+    if start is not None or stop is not None:
+        if start is None or stop is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Both 'start' and 'stop' must be provided together.")
+        items = await retrieve_admins(start=start, stop=stop)
+        return APIResponse(status_code=200, data=items, detail="Fetched successfully")
+    items, next_cursor = await retrieve_admin_page(limit=page_size(limit), cursor=cursor)
+    return APIResponse(status_code=200, data=items, detail="Fetched successfully", next_cursor=next_cursor)
 
 
 @router.get(
@@ -239,11 +247,15 @@ async def list_sessions(
     stop: Optional[int] = Query(None, description="Stop index for range-based pagination"),
     page_number: Optional[int] = Query(None, description="Page number for page-based pagination (0-indexed)"),
     filters: Optional[ScenarioName] = Query(None, description="Optional Scenario name string "),
+    include: Optional[str] = Query(None, description="Comma separated extras to load: 'analysis' adds each turn's speechAnalysis"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: Optional[int] = Query(None, description="Page size for cursor pagination (default 100)"),
     user_id:str = Path(..., description="User Id of the user you want to view their session"),
 
 ):
     PAGE_SIZE = 50
     parsed_filters = {}
+    include_analysis = "analysis" in parse_session_include(include)
     
     
     
@@ -264,7 +276,7 @@ async def list_sessions(
         if stop < start:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'stop' cannot be less than 'start'.")
         
-        items = await retrieve_sessions(filters=parsed_filters, start=start, stop=stop,user_id=user_id)
+        items = await retrieve_sessions(filters=parsed_filters, start=start, stop=stop,user_id=user_id,include_analysis=include_analysis)
         base_url = _base_url_from_request(request)
         items = _absolute_audio_urls(items, base_url)
         return APIResponse(status_code=200, data=items, detail="Fetched successfully")
@@ -275,17 +287,19 @@ async def list_sessions(
         
         start_index = page_number * PAGE_SIZE
         stop_index = start_index + PAGE_SIZE
-        items = await retrieve_sessions(filters=parsed_filters, start=start_index, stop=stop_index,user_id=user_id)
+        items = await retrieve_sessions(filters=parsed_filters, start=start_index, stop=stop_index,user_id=user_id,include_analysis=include_analysis)
         base_url = _base_url_from_request(request)
         items = _absolute_audio_urls(items, base_url)
         return APIResponse(status_code=200, data=items, detail=f"Fetched page {page_number} successfully")
 
     else:
-        items = await retrieve_sessions(filters=parsed_filters, start=0, stop=100,user_id=user_id)
+        items, next_cursor = await retrieve_session_page(
+            filters=parsed_filters, limit=page_size(limit), cursor=cursor, user_id=user_id, include_analysis=include_analysis
+        )
         base_url = _base_url_from_request(request)
         items = _absolute_audio_urls(items, base_url)
-        detail_msg = "Fetched first 100 records successfully"
+        detail_msg = "Fetched successfully"
         if parsed_filters:
-            detail_msg = f"Fetched first 100 records successfully (with filters applied)"
-        return APIResponse(status_code=200, data=items, detail=detail_msg)
+            detail_msg = "Fetched successfully (with filters applied)"
+        return APIResponse(status_code=200, data=items, detail=detail_msg, next_cursor=next_cursor)
 
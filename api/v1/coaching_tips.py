@@ -7,12 +7,14 @@ from schemas.coaching_tips import (
     CoachingTipListItem,
     CoachingTipResponse,
 )
+from core.pagination import page_size
 from schemas.response_schema import APIResponse
 from schemas.tokens_schema import accessTokenOut
 from security.auth import verify_token_user_role
 from services.coaching_tips_service import (
     generate_or_get_coaching_tip,
     get_user_coaching_tip_by_id,
+    list_user_coaching_tip_page,
     list_user_coaching_tips,
 )
 
@@ -37,14 +39,19 @@ async def create_coaching_tip(
     response_model=APIResponse[List[CoachingTipListItem]],
 )
 async def list_coaching_tips(
-    start: Optional[int] = Query(0, description="Start index for pagination"),
-    stop: Optional[int] = Query(50, description="Stop index for pagination"),
+    start: Optional[int] = Query(None, description="Start index for offset pagination"),
+    stop: Optional[int] = Query(None, description="Stop index for offset pagination"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: Optional[int] = Query(None, description="Page size for cursor pagination (default 50)"),
     user: accessTokenOut = Depends(verify_token_user_role),
 ):
-    if start is None or stop is None:
-        raise HTTPException(status_code=400, detail="Start and stop must be provided")
-    items = await list_user_coaching_tips(user=user, start=start, stop=stop)
-    return APIResponse(status_code=200, data=items, detail="Fetched coaching tips")
+    if start is not None or stop is not None:
+        if start is None or stop is None:
+            raise HTTPException(status_code=400, detail="Start and stop must be provided")
+        items = await list_user_coaching_tips(user=user, start=start, stop=stop)
+        return APIResponse(status_code=200, data=items, detail="Fetched coaching tips")
+    items, next_cursor = await list_user_coaching_tip_page(user=user, limit=page_size(limit, 50), cursor=cursor)
+    return APIResponse(status_code=200, data=items, detail="Fetched coaching tips", next_cursor=next_cursor)
 
 
 @router.get(
@@ -5,8 +5,8 @@ import logging
 import os
 import random
 import time
-from fastapi import APIRouter, Depends, File, HTTPException, Query, Path, Request, UploadFile, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Path, Request, Response, UploadFile, status
+from fastapi.responses import FileResponse, StreamingResponse
 from typing import List, Optional, Tuple, Literal
 import json
 from openai import (
@@ -19,26 +19,45 @@ from openai import (
 )
 from bson import ObjectId
 from schemas.imports import ScenarioName
+from core.pagination import page_size
 from schemas.response_schema import APIResponse
 from schemas.session import (
     SessionBaseRequest,
     SessionCreate,
     SessionOut,
     SessionBase,
+    SessionGenerationStatus,
     SessionUpdate,
     ListOfSessionOut,
 )
 from schemas.tokens_schema import accessTokenOut
 from security.auth import verify_admin_token, verify_token_user_role
 from controller.script_generation.audio import extract_r2_key
-from controller.script_generation.clients import get_r2_client
-from repositories.session import get_session
+from controller.script_generation.audio_disk_cache import get_audio_disk_cache
+from controller.script_generation.audio_proxy import (
+    RangeNotSatisfiable,
+    get_object_meta,
+    invalidate_object_meta,
+    is_not_modified,
+    iter_multipart_ranges,
+    multipart_boundary,
+    multipart_length,
+    parse_ranges,
+    range_applies,
+)
+from controller.script_generation.clients import get_r2_store
+from controller.script_generation.r2_store import R2Error, R2NotFound
+from repositories.session import get_session_turn_audio
 from services.session_service import (
     add_session,
+    add_session_in_background,
+    parse_session_include,
     remove_session,
     retrieve_sessions,
     retrieve_session_summaries,
+    retrieve_session_summary_page,
     retrieve_session_by_session_id,
+    retrieve_session_generation_status,
     update_session_by_id,
 )
 from controller.script_generation.clients import get_openai_client
@@ -73,6 +92,8 @@ async def list_sessions(
     stop: Optional[int] = Query(None, description="Stop index for range-based pagination"),
     page_number: Optional[int] = Query(None, description="Page number for page-based pagination (0-indexed)"),
     filters: Optional[ScenarioName] = Query(None, description="Optional Scenario name string "),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: Optional[int] = Query(None, description="Page size for cursor pagination (default 100)"),
     token:accessTokenOut = Depends(verify_token_user_role)
 ):
     PAGE_SIZE = 50
@@ -110,20 +131,24 @@ async def list_sessions(
         return APIResponse(status_code=200, data=items, detail=f"Fetched page {page_number} successfully")
 
     else:
-        items = await retrieve_session_summaries(filters=parsed_filters, start=0, stop=100,user_id=token.userId)
-        detail_msg = "Fetched first 100 records successfully"
+        items, next_cursor = await retrieve_session_summary_page(
+            filters=parsed_filters, limit=page_size(limit), cursor=cursor, user_id=token.userId
+        )
+        detail_msg = "Fetched successfully"
         if parsed_filters:
-            detail_msg = f"Fetched first 100 records successfully (with filters applied)"
-        return APIResponse(status_code=200, data=items, detail=detail_msg)
+            detail_msg = "Fetched successfully (with filters applied)"
+        return APIResponse(status_code=200, data=items, detail=detail_msg, next_cursor=next_cursor)
 
 
 @router.get("/{id}",dependencies=[Depends(verify_token_user_role)], response_model=APIResponse[SessionOut])
 async def get_session_by_id(
     request: Request,
     id: str = Path(..., description="session ID to fetch specific item"),
+    include: Optional[str] = Query(None, description="Comma separated extras to load: 'analysis' adds each turn's speechAnalysis"),
      token:accessTokenOut = Depends(verify_token_user_role)
 ):
-    item = await retrieve_session_by_session_id(id=id,user_id=token.userId)
+    includes = parse_session_include(include)
+    item = await retrieve_session_by_session_id(id=id,user_id=token.userId,include_analysis="analysis" in includes)
     if not item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Session not found")
     base_url = _base_url_from_request(request)
@@ -134,10 +159,16 @@ async def get_session_by_id(
 @router.post("/", dependencies=[Depends(verify_token_user_role)], response_model=APIResponse[SessionOut], status_code=status.HTTP_201_CREATED)
 async def create_session(
     request: Request,
+    response: Response,
     payload: SessionBaseRequest,
+    background: bool = Query(False, description="Return immediately and generate the script in the background"),
     token:accessTokenOut = Depends(verify_token_user_role)
 ):
     new_data = SessionBase(**payload.model_dump(),userId=token.userId) 
+    if background:
+        new_item = await add_session_in_background(new_data)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return APIResponse(status_code=202, data=new_item, detail="Session accepted, script is generating")
     new_item = await add_session(new_data)
     if not new_item:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Failed to create session")
@@ -147,6 +178,15 @@ async def create_session(
     return APIResponse(status_code=201, data=new_item, detail=f"Session created successfully")
 
 
+@router.get("/{id}/status", dependencies=[Depends(verify_token_user_role)], response_model=APIResponse[SessionGenerationStatus])
+async def get_session_generation_status(
+    id: str = Path(..., description="session ID to poll"),
+    token:accessTokenOut = Depends(verify_token_user_role)
+):
+    item = await retrieve_session_generation_status(id=id, user_id=token.userId)
+    return APIResponse(status_code=200, data=item, detail="session generation status fetched")
+
+
 @router.patch("/{id}/{turn_index}", response_model=APIResponse[SessionOut])
 async def users_turn_to_speak(
     request: Request,
@@ -171,14 +211,9 @@ async def users_turn_to_speak(
 
 
 
-def _iter_audio_body(body, chunk_size: int = 1024 * 1024):
-    for chunk in body.iter_chunks(chunk_size=chunk_size):
-        if chunk:
-            yield chunk
-
-
-@router.get(
+@router.api_route(
     "/audio/{id}/{turn_index}",
+    methods=["GET", "HEAD"],
     dependencies=[Depends(verify_token_user_role)],
 )
 async def stream_session_audio(
@@ -192,19 +227,12 @@ async def stream_session_audio(
 ):
     if not ObjectId.is_valid(id):
         raise HTTPException(status_code=400, detail="Invalid session ID format")
-    session = await get_session(filter_dict={"_id": ObjectId(id), "userId": token.userId})
-    if not session:
+    turn = await get_session_turn_audio(id, token.userId, turn_index)
+    if not turn:
         raise HTTPException(status_code=404, detail="Session not found")
-    script = getattr(session, "script", None)
-    turns = getattr(script, "turns", None) if script else None
-    if not turns or turn_index < 0 or turn_index >= len(turns):
+    if turn_index < 0 or turn_index >= turn.turn_count:
         raise HTTPException(status_code=400, detail="Turn index out of range.")
-    turn = turns[turn_index]
-    audio_url = getattr(
-        turn,
-        "user_audio_url" if audio_type == "user" else "model_audio_url",
-        None,
-    )
+    audio_url = turn.user_audio_url if audio_type == "user" else turn.model_audio_url
     if not audio_url:
         raise HTTPException(status_code=404, detail="Audio not found for this turn.")
 
@@ -215,41 +243,100 @@ async def stream_session_audio(
     if not bucket:
         raise HTTPException(status_code=500, detail="Missing CLOUDFLARE_R2_BUCKET.")
 
-    range_header = request.headers.get("range")
-    if range_header and not range_header.startswith("bytes="):
-        range_header = None
-
-    client = get_r2_client()
-    get_kwargs = {"Bucket": bucket, "Key": key}
-    if range_header:
-        get_kwargs["Range"] = range_header
-
     try:
-        r2_response = await asyncio.to_thread(client.get_object, **get_kwargs)
-    except Exception as exc:
+        meta = await get_object_meta(key)
+    except R2NotFound as exc:
         raise HTTPException(status_code=404, detail="Audio object not found.") from exc
+    except R2Error as exc:
+        raise HTTPException(status_code=502, detail="Audio storage unavailable.") from exc
 
     headers = {
         "Accept-Ranges": "bytes",
         "Cache-Control": "private, max-age=3600",
     }
-    content_range = r2_response.get("ContentRange")
-    if content_range:
-        headers["Content-Range"] = content_range
-    content_length = r2_response.get("ContentLength")
-    if content_length is not None:
-        headers["Content-Length"] = str(content_length)
-    etag = r2_response.get("ETag")
-    if etag:
-        headers["ETag"] = etag
-
-    status_code = 206 if range_header else 200
-    content_type = r2_response.get("ContentType") or "audio/mpeg"
-    body = r2_response["Body"]
+    if meta.etag:
+        headers["ETag"] = meta.etag
+    if meta.last_modified:
+        headers["Last-Modified"] = meta.last_modified
+    content_type = meta.content_type or "audio/mpeg"
+
+    if is_not_modified(request.headers, meta):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    ranges = None
+    if range_applies(request.headers, meta):
+        try:
+            ranges = parse_ranges(request.headers.get("range"), meta.size)
+        except RangeNotSatisfiable:
+            return Response(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                headers={**headers, "Content-Range": f"bytes */{meta.size}"},
+            )
+
+    disk_cache = get_audio_disk_cache()
+    if disk_cache is not None and meta.etag:
+        cached = disk_cache.lookup(key, meta.etag)
+        if cached is not None:
+            # FileResponse serves Range, multi-range and HEAD itself.
+            path, stat_result = cached
+            return FileResponse(
+                path,
+                media_type=content_type,
+                headers={name: value for name, value in headers.items() if name != "Accept-Ranges"},
+                stat_result=stat_result,
+            )
+        if request.method != "HEAD":
+            disk_cache.consider(key, meta, playback_start=not ranges or ranges[0][0] == 0)
+
+    if ranges and len(ranges) > 1:
+        boundary = multipart_boundary()
+        headers["Content-Length"] = str(multipart_length(boundary, content_type, ranges, meta.size))
+        media_type = f"multipart/byteranges; boundary={boundary}"
+        if request.method == "HEAD":
+            return Response(status_code=206, headers=headers, media_type=media_type)
+        return StreamingResponse(
+            iter_multipart_ranges(key, meta, ranges, boundary, content_type),
+            status_code=206,
+            media_type=media_type,
+            headers=headers,
+        )
+
+    if ranges:
+        start, end = ranges[0]
+        headers["Content-Range"] = f"bytes {start}-{end}/{meta.size}"
+        headers["Content-Length"] = str(end - start + 1)
+        status_code = 206
+    else:
+        headers["Content-Length"] = str(meta.size)
+        status_code = 200
+    if request.method == "HEAD":
+        return Response(status_code=status_code, headers=headers, media_type=content_type)
+
+    try:
+        r2_object = await get_r2_store().get_object_stream(
+            key, range_header=f"bytes={ranges[0][0]}-{ranges[0][1]}" if ranges else None
+        )
+    except R2NotFound as exc:
+        invalidate_object_meta(key)
+        raise HTTPException(status_code=404, detail="Audio object not found.") from exc
+    except R2Error as exc:
+        invalidate_object_meta(key)
+        if exc.status_code == 416:
+            raise HTTPException(status_code=416, detail="Requested range not satisfiable.") from exc
+        raise HTTPException(status_code=502, detail="Audio storage unavailable.") from exc
+
+    if r2_object.headers.get("etag") != meta.etag:
+        # Replaced since the metadata was cached; trust what R2 sent.
+        invalidate_object_meta(key)
+        for name in ("Content-Range", "Content-Length", "ETag", "Last-Modified"):
+            headers.pop(name, None)
+            value = r2_object.headers.get(name)
+            if value:
+                headers[name] = value
 
     return StreamingResponse(
-        _iter_audio_body(body),
-        status_code=status_code,
+        r2_object.iter_chunks(),
+        status_code=r2_object.status_code,
         media_type=content_type,
         headers=headers,
     )
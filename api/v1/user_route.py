@@ -35,7 +35,6 @@ from schemas.user_schema import (
 from services.user_service import (
     add_user,
     remove_user,
-    retrieve_users,
     authenticate_user,
     retrieve_user_by_user_id,
  
@@ -0,0 +1,74 @@
+"""Per-turn grading CPU time: the old two-pass path vs grade_turn.
+
+The "two-pass" arm runs the frozen pre-grade_turn code in
+tests/grading_reference.py; the live compute_scores and
+build_speech_analysis now go through grade_turn themselves.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_grading
+"""
+import random
+import time
+from typing import Callable, List
+
+from controller.grading.char_distance import clear_char_distance_cache
+from controller.grading.scoring import grade_turn
+from controller.grading.speech_analysis_builder import project_speech_analysis
+from tests.grading_reference import (
+    MISPRONOUNCED_THRESHOLD,
+    reference_build_speech_analysis,
+    reference_compute_scores,
+)
+from tests.synthetic_turns import synthetic_turn
+
+
+def _two_pass(expected: List[str], actual: List[str]) -> None:
+    scores = reference_compute_scores(expected, actual, 1.0)
+    alignment, mispronounced = scores[6], scores[7]
+    reference_build_speech_analysis(
+        expected_text=" ".join(expected),
+        asr_text=" ".join(actual),
+        expected_tokens=expected,
+        actual_tokens=actual,
+        alignment=alignment,
+        mispronounced_words=mispronounced,
+        threshold=MISPRONOUNCED_THRESHOLD,
+    )
+
+
+def _single_pass(expected: List[str], actual: List[str]) -> None:
+    result = grade_turn(expected, actual, 1.0)
+    result.turn_score()
+    project_speech_analysis(
+        result,
+        expected_text=" ".join(expected),
+        asr_text=" ".join(actual),
+    )
+
+
+def _cpu_ms_per_turn(fn: Callable[[List[str], List[str]], None], turns, repeat: int) -> float:
+    start = time.process_time()
+    for _ in range(repeat):
+        for expected, actual in turns:
+            clear_char_distance_cache()
+            fn(expected, actual)
+    return (time.process_time() - start) * 1000 / (repeat * len(turns))
+
+
+def main() -> None:
+    rng = random.Random(42)
+    print(f"{'tokens':>6} {'two-pass ms':>12} {'single-pass ms':>15} {'speedup':>8}")
+    for length in (10, 50, 200):
+        turns = [synthetic_turn(rng, length) for _ in range(20)]
+        repeat = max(1, 200 // length)
+        before = after = float("inf")
+        # Interleave the runs so frequency scaling and noise hit both paths.
+        for _ in range(7):
+            before = min(before, _cpu_ms_per_turn(_two_pass, turns, repeat))
+            after = min(after, _cpu_ms_per_turn(_single_pass, turns, repeat))
+        print(f"{length:>6} {before:>12.3f} {after:>15.3f} {before / after:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
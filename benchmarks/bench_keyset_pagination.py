@@ -0,0 +1,87 @@
+"""Deep session list pages: skip/limit offsets vs keyset cursors.
+
+Seeds one user with 20,000 small sessions into a scratch database, creates
+the declared indexes, then reads a page at increasing depths both ways and
+prints latency and the documents Mongo examined (from ``explain``). Needs a
+reachable MongoDB (MONGO_URL); the scratch database is dropped at the end.
+
+Run from the repository root:
+
+    BENCH_DB_NAME=yamfluent_bench python -m benchmarks.bench_keyset_pagination
+"""
+import asyncio
+import os
+import random
+import time
+
+os.environ["DB_NAME"] = os.getenv("BENCH_DB_NAME", "yamfluent_bench")
+
+from core.database import client, db, ensure_indexes
+from core.pagination import keyset_filter, keyset_sort
+from repositories.session import SESSION_SORT_KEY, get_session_summaries, get_session_summary_page
+
+SESSIONS = 20000
+PAGE = 50
+DEPTHS = (0, 1000, 5000, 19000)
+USER_ID = "bench-user"
+
+
+def _session_doc(rng: random.Random, n: int) -> dict:
+    now = 1_700_000_000 + n
+    return {
+        "userId": USER_ID,
+        "scenario": rng.choice(["cafe_ordering", "doctor_visit", "job_interview"]),
+        "status": "ready",
+        "script": {"totalNumberOfTurns": 2, "turns": [{"index": 0, "role": "ai", "text": "hi"}]},
+        "average_score": rng.uniform(40, 100),
+        "date_created": now,
+        # Ties on the sort key exercise the _id tie-break.
+        "last_updated": now - now % 3,
+    }
+
+
+async def _cursor_at(depth: int):
+    cursor = None
+    for _ in range(depth // PAGE):
+        _, cursor = await get_session_summary_page({"userId": USER_ID}, PAGE, cursor)
+    return cursor
+
+
+async def _examined(filter_dict: dict, skip: int) -> int:
+    find = db.sessions.find(filter_dict).sort(keyset_sort(SESSION_SORT_KEY)).skip(skip).limit(PAGE)
+    plan = await find.explain()
+    return plan["executionStats"]["totalDocsExamined"] + plan["executionStats"]["totalKeysExamined"]
+
+
+async def _best(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+async def main() -> None:
+    rng = random.Random(7)
+    await db.sessions.delete_many({"userId": USER_ID})
+    await db.sessions.insert_many([_session_doc(rng, n) for n in range(SESSIONS)])
+    await ensure_indexes(["sessions"])
+    try:
+        print(f"sessions={SESSIONS} page={PAGE}")
+        for depth in DEPTHS:
+            cursor = await _cursor_at(depth)
+            offset_ms = await _best(lambda: get_session_summaries({"userId": USER_ID}, depth, depth + PAGE))
+            keyset_ms = await _best(lambda: get_session_summary_page({"userId": USER_ID}, PAGE, cursor))
+            offset_work = await _examined({"userId": USER_ID}, depth)
+            keyset_work = await _examined(keyset_filter({"userId": USER_ID}, SESSION_SORT_KEY, cursor), 0)
+            print(
+                f"depth={depth:>5} offset={offset_ms:6.1f}ms examined={offset_work:>6} "
+                f"cursor={keyset_ms:6.1f}ms examined={keyset_work:>6}"
+            )
+    finally:
+        await client.drop_database(os.environ["DB_NAME"])
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+"""Per-request reads on the hot auth and audio paths: full documents vs projections.
+
+Seeds one user and one graded 41-turn session into a scratch database, then
+compares what each request used to read (get_user, get_session) with the
+projection helpers (user_exists, get_session_turn_audio): bytes returned
+by Mongo and CPU time per call in this process. Needs a reachable MongoDB
+(MONGO_URL); the scratch database is dropped at the end.
+
+Run from the repository root:
+
+    BENCH_DB_NAME=yamfluent_bench python -m benchmarks.bench_projection_reads
+"""
+import asyncio
+import os
+import random
+import time
+
+os.environ["DB_NAME"] = os.getenv("BENCH_DB_NAME", "yamfluent_bench")
+
+import bson
+from bson import ObjectId
+
+from benchmarks.bench_session_summaries import synthetic_session_doc
+from core.database import client, db
+from repositories.session import get_session, get_session_turn_audio
+from repositories.user_repo import get_user, user_exists
+
+CALLS = 500
+TURN = 7
+
+
+async def _cpu_ms(call) -> float:
+    started = time.process_time()
+    for _ in range(CALLS):
+        await call()
+    return (time.process_time() - started) * 1000 / CALLS
+
+
+async def main() -> None:
+    rng = random.Random(11)
+    user = await db.users.insert_one(
+        {
+            "firstName": "Bench",
+            "lastName": "User",
+            "email": "bench@example.com",
+            "password": "x" * 60,
+            "loginType": "PASSWORD",
+            "date_created": int(time.time()),
+        }
+    )
+    user_id = str(user.inserted_id)
+    session = await db.sessions.insert_one(synthetic_session_doc(rng, user_id=user_id))
+    session_id = str(session.inserted_id)
+    try:
+        full_user = await db.users.find_one({"_id": ObjectId(user_id)})
+        slim_user = await db.users.find_one({"_id": ObjectId(user_id)}, {"_id": 1})
+        full_session = await db.sessions.find_one({"_id": ObjectId(session_id)})
+        slim_session = await db.sessions.find_one(
+            {"_id": ObjectId(session_id)}, {"script.turns.speech_analysis": 0}
+        )
+        print(f"user bytes: get_user={len(bson.encode(full_user))} user_exists={len(bson.encode(slim_user))}")
+        print(
+            f"session bytes: embedded analysis={len(bson.encode(full_session))} "
+            f"get_session={len(bson.encode(slim_session))} "
+            f"get_session_turn_audio={len(bson.encode((await get_session_turn_audio(session_id, user_id, TURN)).model_dump()))}"
+        )
+
+        filter_user = {"_id": ObjectId(user_id)}
+        filter_session = {"_id": ObjectId(session_id), "userId": user_id}
+        rows = [
+            ("get_user", lambda: get_user(filter_user)),
+            ("user_exists", lambda: user_exists(user_id)),
+            ("get_session", lambda: get_session(filter_session)),
+            ("get_session_turn_audio", lambda: get_session_turn_audio(session_id, user_id, TURN)),
+        ]
+        for name, call in rows:
+            await call()
+            print(f"{name}: {await _cpu_ms(call):.3f} ms CPU per call")
+    finally:
+        await client.drop_database(os.environ["DB_NAME"])
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
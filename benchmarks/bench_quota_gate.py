@@ -0,0 +1,50 @@
+"""Load test for the per-process OpenAI quota gate.
+
+Thousands of concurrent callers compete for a short window so the run takes
+seconds instead of minutes. Reports admitted throughput, queue wait and the
+gate's own CPU cost per admission.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_quota_gate
+"""
+import asyncio
+import statistics
+import time
+
+from controller.script_generation.quota_gate import QuotaGate
+
+CALLERS = 5000
+RPM_LIMIT = 1000
+TPM_LIMIT = 40000
+WINDOW_S = 0.1
+
+
+async def _run() -> None:
+    gate = QuotaGate(window_s=WINDOW_S)
+    waits = []
+
+    async def call(index: int) -> None:
+        started = time.perf_counter()
+        await gate.acquire(20 + index % 40, RPM_LIMIT, TPM_LIMIT)
+        waits.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    await asyncio.gather(*[call(i) for i in range(CALLERS)])
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+
+    waits.sort()
+    metrics = gate.metrics()
+    print(f"callers={CALLERS} rpm={RPM_LIMIT}/{WINDOW_S}s tpm={TPM_LIMIT}/{WINDOW_S}s")
+    print(f"elapsed={elapsed:.2f}s throughput={CALLERS / elapsed:.0f} admits/s")
+    print(
+        f"wait_ms p50={statistics.median(waits):.1f} "
+        f"p99={waits[int(len(waits) * 0.99) - 1]:.1f} max={waits[-1]:.1f}"
+    )
+    print(f"cpu_us_per_admit={cpu / CALLERS * 1e6:.1f} max_queue_depth={metrics['max_queue_depth']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(_run())
@@ -0,0 +1,105 @@
+"""Session list latency and transfer: full documents vs the summary projection.
+
+Seeds one user with 600 graded 41-turn sessions (speech analysis included)
+into a scratch database, then pages through them with both query paths.
+Needs a reachable MongoDB (MONGO_URL); the scratch database is dropped at
+the end.
+
+Run from the repository root:
+
+    BENCH_DB_NAME=yamfluent_bench python -m benchmarks.bench_session_summaries
+"""
+import asyncio
+import os
+import random
+import time
+
+os.environ["DB_NAME"] = os.getenv("BENCH_DB_NAME", "yamfluent_bench")
+
+import bson
+
+from controller.grading.scoring import grade_turn
+from controller.grading.speech_analysis_builder import project_speech_analysis
+from core.database import client, db
+from repositories.session import _SUMMARY_PROJECTION, get_session_summaries, get_sessions
+from schemas.imports import Turn
+from schemas.session import ListOfSessionOut
+from tests.synthetic_turns import synthetic_turn
+
+SESSIONS = 600
+TURNS = 41
+PAGE = 100
+USER_ID = "bench-user"
+
+
+def synthetic_session_doc(rng: random.Random, user_id: str = USER_ID, turns: int = TURNS) -> dict:
+    """A graded session shaped like the ones calculate_turn_score writes."""
+    script_turns = []
+    for index in range(turns):
+        role = "user" if index % 2 else "ai"
+        expected, actual = synthetic_turn(rng, rng.randint(8, 24))
+        turn = Turn(
+            index=index,
+            role=role,
+            text=" ".join(expected),
+            model_audio_url=f"https://cdn.example/tts/{rng.getrandbits(64):016x}.mp3",
+        )
+        if role == "user":
+            result = grade_turn(expected, actual, 1.0)
+            turn.score = result.turn_score()
+            turn.user_audio_url = f"https://cdn.example/user-audio/{user_id}/s/turn-{index}.mp3"
+            turn.speech_analysis = project_speech_analysis(
+                result, expected_text=" ".join(expected), asr_text=" ".join(actual)
+            )
+        script_turns.append(turn.model_dump())
+    now = int(time.time())
+    return {
+        "userId": user_id,
+        "scenario": rng.choice(["cafe_ordering", "doctor_visit", "job_interview"]),
+        "status": "ready",
+        "script": {"totalNumberOfTurns": turns, "turns": script_turns},
+        "date_created": now,
+        "last_updated": now,
+    }
+
+
+async def _full_documents(start: int) -> int:
+    sessions = await get_sessions({"userId": USER_ID}, start, start + PAGE, include_speech_analysis=True)
+    rows = [ListOfSessionOut(**session.model_dump()) for session in sessions]
+    return len(rows)
+
+
+async def _summaries(start: int) -> int:
+    return len(await get_session_summaries({"userId": USER_ID}, start, start + PAGE))
+
+
+async def _time(fn) -> float:
+    started = time.perf_counter()
+    for start in range(0, SESSIONS, PAGE):
+        await fn(start)
+    return (time.perf_counter() - started) * 1000 / (SESSIONS // PAGE)
+
+
+async def main() -> None:
+    rng = random.Random(7)
+    docs = [synthetic_session_doc(rng) for _ in range(SESSIONS)]
+    await db.sessions.delete_many({"userId": USER_ID})
+    await db.sessions.insert_many(docs)
+    try:
+        full_bytes = sum(len(bson.encode(doc)) for doc in await db.sessions.find({"userId": USER_ID}).to_list(None))
+        pipeline = [{"$match": {"userId": USER_ID}}, {"$project": _SUMMARY_PROJECTION}]
+        slim = await db.sessions.aggregate(pipeline).to_list(None)
+        print(f"sessions={SESSIONS} turns={TURNS}")
+        print(f"avg document bytes={full_bytes // SESSIONS}")
+        print(f"avg summary row bytes={sum(len(bson.encode(doc)) for doc in slim) // SESSIONS}")
+        before = after = float("inf")
+        for _ in range(5):
+            before = min(before, await _time(_full_documents))
+            after = min(after, await _time(_summaries))
+        print(f"ms per {PAGE}-row page: full={before:.1f} projection={after:.1f} speedup={before / after:.1f}x")
+    finally:
+        await client.drop_database(os.environ["DB_NAME"])
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
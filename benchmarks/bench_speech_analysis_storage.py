@@ -0,0 +1,68 @@
+"""Session document size and read cost: full vs compact speech analysis.
+
+Builds graded 41-turn sessions in memory (no database needed) and compares,
+per session, the BSON size and the time to decode the BSON and parse it into
+SessionOut, which is what every get_session does. "skipped" is the same
+session read with include_speech_analysis=False.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_speech_analysis_storage
+"""
+import random
+import time
+
+import bson
+
+from benchmarks.bench_session_summaries import synthetic_session_doc
+from schemas.imports import Turn
+from schemas.session import SessionOut
+from schemas.speech_analysis_codec import encode_speech_analysis
+
+SESSIONS = 200
+
+
+def _compact(doc: dict) -> dict:
+    turns = []
+    for turn in doc["script"]["turns"]:
+        if turn.get("speech_analysis"):
+            turn = {**turn, "speech_analysis": encode_speech_analysis(Turn(**turn).speech_analysis)}
+        turns.append(turn)
+    return {**doc, "script": {**doc["script"], "turns": turns}}
+
+
+def _without_analysis(doc: dict) -> dict:
+    turns = [{k: v for k, v in turn.items() if k != "speech_analysis"} for turn in doc["script"]["turns"]]
+    return {**doc, "script": {**doc["script"], "turns": turns}}
+
+
+def _read_ms(payloads) -> float:
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for payload in payloads:
+            SessionOut(**bson.decode(payload))
+        best = min(best, time.perf_counter() - started)
+    return best * 1000 / len(payloads)
+
+
+def main() -> None:
+    rng = random.Random(7)
+    docs = [synthetic_session_doc(rng) for _ in range(SESSIONS)]
+    started = time.perf_counter()
+    compact_docs = [_compact(doc) for doc in docs]
+    encode_ms = (time.perf_counter() - started) * 1000 / SESSIONS
+    full = [bson.encode(doc) for doc in docs]
+    compact = [bson.encode(doc) for doc in compact_docs]
+    full_bytes = sum(map(len, full)) // SESSIONS
+    compact_bytes = sum(map(len, compact)) // SESSIONS
+    print(f"sessions={SESSIONS}")
+    print(f"avg document bytes: full={full_bytes} compact={compact_bytes} ratio={full_bytes / compact_bytes:.1f}x")
+    print(f"encode ms per session={encode_ms:.2f}")
+    skipped = [bson.encode(_without_analysis(doc)) for doc in compact_docs]
+    full_ms, compact_ms, skipped_ms = _read_ms(full), _read_ms(compact), _read_ms(skipped)
+    print(f"read ms per session: full={full_ms:.2f} compact={compact_ms:.2f} skipped={skipped_ms:.2f}")
+
+
+if __name__ == "__main__":
+    main()
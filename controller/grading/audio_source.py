@@ -0,0 +1,101 @@
+import hashlib
+import io
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional, Union
+
+from fastapi import UploadFile
+
+AUDIO_READ_CHUNK_BYTES = 256 * 1024
+
+
+class SpooledAudio:
+    """Uploaded turn audio held in memory when small, on disk when large.
+
+    Every consumer (ASR, R2 upload) opens its own reader, so they can run
+    concurrently without sharing a file position.
+    """
+
+    def __init__(
+        self,
+        data: Optional[bytes] = None,
+        path: Optional[str] = None,
+        size: int = 0,
+        sha256: str = "",
+    ):
+        self._data = data
+        self._path = path
+        self.size = size
+        self.sha256 = sha256
+
+    @classmethod
+    async def from_upload(
+        cls,
+        audio: Union[bytes, bytearray, UploadFile],
+        max_memory_bytes: Optional[int] = None,
+    ) -> "SpooledAudio":
+        if isinstance(audio, (bytes, bytearray)):
+            return cls(
+                data=bytes(audio),
+                size=len(audio),
+                sha256=hashlib.sha256(audio).hexdigest(),
+            )
+        if max_memory_bytes is None:
+            max_memory_bytes = int(os.getenv("AUDIO_SPOOL_MAX_MEMORY_BYTES", str(2 * 1024 * 1024)))
+
+        digest = hashlib.sha256()
+        buffer = bytearray()
+        spool_file = None
+        size = 0
+        try:
+            while True:
+                chunk = await audio.read(AUDIO_READ_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                digest.update(chunk)
+                if spool_file is None and size > max_memory_bytes:
+                    spool_file = tempfile.NamedTemporaryFile(
+                        prefix="turn-audio-", suffix=".mp3", delete=False
+                    )
+                    spool_file.write(buffer)
+                    buffer = bytearray()
+                if spool_file is not None:
+                    spool_file.write(chunk)
+                else:
+                    buffer.extend(chunk)
+        except Exception:
+            if spool_file is not None:
+                spool_file.close()
+                os.unlink(spool_file.name)
+            raise
+        if spool_file is not None:
+            spool_file.close()
+            return cls(path=spool_file.name, size=size, sha256=digest.hexdigest())
+        return cls(data=bytes(buffer), size=size, sha256=digest.hexdigest())
+
+    @property
+    def on_disk(self) -> bool:
+        return self._path is not None
+
+    @contextmanager
+    def open(self, name: str = "user_audio.mp3") -> Iterator[BinaryIO]:
+        if self._path is not None:
+            handle = open(self._path, "rb")
+        else:
+            handle = io.BytesIO(self._data or b"")
+            handle.name = name
+        try:
+            yield handle
+        finally:
+            handle.close()
+
+    def cleanup(self) -> None:
+        if self._path is not None:
+            try:
+                os.unlink(self._path)
+            except FileNotFoundError:
+                pass
+            self._path = None
+        self._data = None
@@ -1,53 +1,109 @@
-import io
+import asyncio
+import logging
 import os
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Optional, Set, Union
 
 from bson import ObjectId
 from fastapi import HTTPException, UploadFile
 
-from controller.grading.scoring import MISPRONOUNCED_THRESHOLD, compute_scores
-from controller.grading.text_align import tokenize
-from controller.grading.speech_analysis_builder import build_speech_analysis
-from controller.script_generation.audio import upload_audio_bytes
+from controller.grading.audio_source import SpooledAudio
+from controller.grading.executor import GradingJob, run_grading
+from controller.grading.transcript_cache import get_or_transcribe
+from controller.script_generation.audio import upload_audio_file
 from controller.script_generation.clients import (
     get_openai_client,
     openai_request_with_retries,
 )
 from repositories.session import get_session, update_session
-from schemas.imports import TurnScore
 from schemas.session import ScriptTurnsUpdate, SessionUpdate, TurnUpdate
 
 
-async def _audio_to_bytes(audio: Union[bytes, UploadFile]) -> bytes:
-    if isinstance(audio, (bytes, bytearray)):
-        return bytes(audio)
-    return await audio.read()
+logger = logging.getLogger(__name__)
 
+_background_uploads: Set[asyncio.Task] = set()
 
-async def _run_asr(audio_bytes: bytes) -> tuple[str, Dict[str, Any]]:
+
+def _pipeline_enabled() -> bool:
+    return os.getenv("TURN_SCORING_PIPELINE", "0").strip().lower() in {"1", "true", "yes"}
+
+
+async def _run_asr(audio: SpooledAudio, user_id: Optional[str] = None) -> tuple[str, Dict[str, Any]]:
     client = get_openai_client()
     model_name = os.getenv("OPENAI_ASR_MODEL", "gpt-4o-mini-transcribe")
-    audio_file = io.BytesIO(audio_bytes)
-    audio_file.name = "user_audio.mp3"
     estimated_tokens = int(os.getenv("OPENAI_ASR_TOKEN_ESTIMATE", "200"))
-    response = await openai_request_with_retries(
-        lambda: client.audio.transcriptions.create(
+
+    async def transcribe_once():
+        # A fresh reader per attempt so retries start from the first byte.
+        with audio.open() as audio_file:
+            return await client.audio.transcriptions.create(
+                model=model_name,
+                file=audio_file,
+                response_format="json",
+            )
+
+    async def transcribe() -> str:
+        response = await openai_request_with_retries(
+            transcribe_once,
+            estimated_tokens=estimated_tokens,
+            lane="interactive",
+            user_id=user_id,
             model=model_name,
-            file=audio_file,
-            response_format="json",
-        ),
-        estimated_tokens=estimated_tokens,
-    )
-    transcript = getattr(response, "text", None)
-    if not transcript:
-        transcript = response.get("text") if isinstance(response, dict) else None
-    if not transcript:
-        raise HTTPException(status_code=500, detail="ASR failed to return transcript text.")
+            # The token estimate is fixed; transcription time follows audio length.
+            work_units=audio.size,
+        )
+        transcript = getattr(response, "text", None)
+        if not transcript:
+            transcript = response.get("text") if isinstance(response, dict) else None
+        if not transcript:
+            raise HTTPException(status_code=500, detail="ASR failed to return transcript text.")
+        return str(transcript).strip()
+
+    transcript, cache_hit = await get_or_transcribe(audio.sha256, model_name, transcribe)
     meta: Dict[str, Any] = {
         "model": model_name,
         "estimated_tokens": estimated_tokens,
+        "transcript_cache_hit": cache_hit,
     }
-    return str(transcript).strip(), meta
+    return transcript, meta
+
+
+async def _upload_turn_audio(audio: SpooledAudio, key: str) -> str:
+    with audio.open() as audio_file:
+        return await upload_audio_file(audio_file, key)
+
+
+def _discard_upload(task: "asyncio.Task[str]", audio: SpooledAudio) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Turn audio upload failed after grading was aborted: %s", task.exception())
+    audio.cleanup()
+
+
+async def _finalize_turn_audio(
+    upload_task: "asyncio.Task[str]",
+    audio: SpooledAudio,
+    session_id: str,
+    turn_index: int,
+) -> None:
+    try:
+        user_audio_url = await upload_task
+        # Setting the same deterministic URL on the same turn is idempotent, so
+        # this is safe to race with the score update or a client retry.
+        await update_session(
+            {"_id": ObjectId(session_id)},
+            SessionUpdate(
+                script=ScriptTurnsUpdate(
+                    turns=[TurnUpdate(index=turn_index, user_audio_url=user_audio_url)]
+                )
+            ),
+        )
+    except Exception:
+        logger.exception(
+            "Background upload of turn audio failed for session %s turn %s",
+            session_id,
+            turn_index,
+        )
+    finally:
+        audio.cleanup()
 
 
 def _get_session_turn(session: Any, turn_index: int):
@@ -91,47 +147,55 @@ async def calculate_turn_score(
     if not expected_text:
         raise HTTPException(status_code=500, detail="Expected text missing for turn.")
 
-    audio_bytes = await _audio_to_bytes(audio)
-    if not audio_bytes:
+    spooled = await SpooledAudio.from_upload(audio)
+    if not spooled.size:
         raise HTTPException(status_code=400, detail="Audio upload is empty.")
-    transcript_text, asr_meta = await _run_asr(audio_bytes)
-
-    expected_tokens = tokenize(expected_text)
-    actual_tokens = tokenize(transcript_text)
-    (
-        confidence,
-        fluency,
-        hesitation,
-        wer,
-        filler_count,
-        total_tokens,
-        _alignment,
-        mispronounced_words,
-    ) = compute_scores(expected_tokens, actual_tokens, leniency)
-
-    speech_analysis = build_speech_analysis(
-        expected_text=expected_text,
-        asr_text=transcript_text,
-        expected_tokens=expected_tokens,
-        actual_tokens=actual_tokens,
-        alignment=_alignment,
-        mispronounced_words=mispronounced_words,
-        threshold=MISPRONOUNCED_THRESHOLD,
-        asr_model=asr_meta.get("model"),
-        asr_parameters=asr_meta,
-    )
+
+    key = f"user-audio/{user_id}/{session_id}/turn-{turn_index}.mp3"
+    upload_task: Optional["asyncio.Task[str]"] = None
+    try:
+        if _pipeline_enabled():
+            upload_task = asyncio.create_task(_upload_turn_audio(spooled, key))
+        transcript_text, asr_meta = await _run_asr(spooled, user_id)
+
+        grading = await run_grading(
+            GradingJob(
+                expected_text=expected_text,
+                transcript_text=transcript_text,
+                leniency=leniency,
+                asr_model=asr_meta.get("model"),
+                asr_parameters=asr_meta,
+            )
+        )
+    except BaseException:
+        if upload_task is None:
+            spooled.cleanup()
+        else:
+            # The upload still owns the spooled audio; drop it once it settles.
+            upload_task.add_done_callback(lambda task: _discard_upload(task, spooled))
+        raise
+    mispronounced_words = grading.mispronounced_words
+    speech_analysis = grading.speech_analysis
 
     user_audio_url: Optional[str] = None
-    if audio_bytes:
-        key_prefix = f"user-audio/{user_id}/{session_id}"
-        key = f"{key_prefix}/turn-{turn_index}.mp3"
-        user_audio_url = await upload_audio_bytes(audio_bytes, key)
-
-    scores = TurnScore(
-        confidence=confidence,
-        fluency=fluency,
-        hesitation=hesitation,
-    )
+    if upload_task is None:
+        try:
+            user_audio_url = await _upload_turn_audio(spooled, key)
+        finally:
+            spooled.cleanup()
+    elif upload_task.done():
+        try:
+            user_audio_url = upload_task.result()
+        finally:
+            spooled.cleanup()
+    else:
+        finalizer = asyncio.create_task(
+            _finalize_turn_audio(upload_task, spooled, session_id, turn_index)
+        )
+        _background_uploads.add(finalizer)
+        finalizer.add_done_callback(_background_uploads.discard)
+
+    scores = grading.score
 
     update_payload = SessionUpdate(
         script=ScriptTurnsUpdate(
@@ -161,9 +225,9 @@ async def calculate_turn_score(
         
         response.update(
             {
-                "wer": wer,
-                "filler_count": filler_count,
-                "total_tokens": total_tokens,
+                "wer": grading.wer,
+                "filler_count": grading.filler_count,
+                "total_tokens": grading.total_tokens,
                 "speech_analysis": speech_analysis.model_dump(),
             }
         )
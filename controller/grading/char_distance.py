@@ -0,0 +1,83 @@
+import os
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+BIT_PARALLEL_MAX_LEN = 64
+CHAR_DISTANCE_CACHE_SIZE = int(os.getenv("CHAR_DISTANCE_CACHE_SIZE", "4096"))
+
+
+def _bit_parallel_distance(a: str, b: str) -> int:
+    # Myers/Hyyro bit-vector Levenshtein: one machine-word update per char of b.
+    m = len(a)
+    full = (1 << m) - 1
+    high = 1 << (m - 1)
+    peq: Dict[str, int] = {}
+    for i, char in enumerate(a):
+        peq[char] = peq.get(char, 0) | (1 << i)
+
+    pv = full
+    mv = 0
+    score = m
+    for char in b:
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = ((((eq & pv) + pv) & full) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+    return score
+
+
+def _dp_distance(a: str, b: str) -> int:
+    prev = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        curr = [i] + [0] * len(b)
+        for j, char_b in enumerate(b, start=1):
+            cost = 0 if char_a == char_b else 1
+            curr[j] = min(prev[j] + 1, curr[j - 1] + 1, prev[j - 1] + cost)
+        prev = curr
+    return prev[-1]
+
+
+@lru_cache(maxsize=CHAR_DISTANCE_CACHE_SIZE)
+def char_edit_distance(a: str, b: str) -> int:
+    if a == b:
+        return 0
+    if not a:
+        return len(b)
+    if not b:
+        return len(a)
+    if len(a) <= BIT_PARALLEL_MAX_LEN:
+        return _bit_parallel_distance(a, b)
+    if len(b) <= BIT_PARALLEL_MAX_LEN:
+        return _bit_parallel_distance(b, a)
+    return _dp_distance(a, b)
+
+
+def normalize_distance(distance: int, a: str, b: str) -> float:
+    if not a and not b:
+        return 0.0
+    return distance / max(1, len(a), len(b))
+
+
+def char_distances(pairs: Iterable[Tuple[str, str]]) -> List[Tuple[int, float]]:
+    results: List[Tuple[int, float]] = []
+    for expected, actual in pairs:
+        distance = char_edit_distance(expected, actual)
+        results.append((distance, normalize_distance(distance, expected, actual)))
+    return results
+
+
+def char_distance_cache_info():
+    return char_edit_distance.cache_info()
+
+
+def clear_char_distance_cache() -> None:
+    char_edit_distance.cache_clear()
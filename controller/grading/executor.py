@@ -0,0 +1,160 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from controller.grading.scoring import grade_turn
+from controller.grading.speech_analysis_builder import project_speech_analysis
+from controller.grading.text_align import tokenize
+from schemas.imports import TurnScore
+from schemas.speech_analysis import TurnSpeechAnalysis
+
+GRADING_EXECUTOR_MODES = ("inline", "thread", "process")
+
+_executor: Optional[Executor] = None
+_executor_mode: Optional[str] = None
+_metrics: Dict[str, Any] = {
+    "submitted": 0,
+    "completed": 0,
+    "failed": 0,
+    "queue_depth": 0,
+    "max_queue_depth": 0,
+    "exec_ms_total": 0.0,
+    "exec_ms_max": 0.0,
+    "wait_ms_total": 0.0,
+    "wait_ms_max": 0.0,
+}
+
+
+@dataclass
+class GradingJob:
+    expected_text: str
+    transcript_text: str
+    leniency: float = 1.0
+    asr_model: Optional[str] = None
+    asr_parameters: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class GradingOutput:
+    score: TurnScore
+    mispronounced_words: List[str]
+    speech_analysis: TurnSpeechAnalysis
+    wer: float
+    filler_count: int
+    total_tokens: int
+    exec_ms: float = 0.0
+
+
+def run_grading_job(job: GradingJob) -> GradingOutput:
+    # Top-level so process pools can pickle it; inputs and outputs are plain
+    # dataclasses and Pydantic models, which both pickle without revalidation.
+    started = time.perf_counter()
+    result = grade_turn(tokenize(job.expected_text), tokenize(job.transcript_text), job.leniency)
+    speech_analysis = project_speech_analysis(
+        result,
+        expected_text=job.expected_text,
+        asr_text=job.transcript_text,
+        asr_model=job.asr_model,
+        asr_parameters=job.asr_parameters,
+    )
+    return GradingOutput(
+        score=result.turn_score(),
+        mispronounced_words=result.mispronounced_words,
+        speech_analysis=speech_analysis,
+        wer=result.wer,
+        filler_count=result.filler_count,
+        total_tokens=result.total_tokens,
+        exec_ms=(time.perf_counter() - started) * 1000,
+    )
+
+
+def _warm_grading_worker() -> None:
+    run_grading_job(GradingJob(expected_text="warm up the grader", transcript_text="warm up grader"))
+
+
+def _start_grading_worker() -> None:
+    # The initializer already warms each worker; this job only makes it start.
+    pass
+
+
+def get_grading_executor_mode() -> str:
+    mode = os.getenv("GRADING_EXECUTOR", "inline").strip().lower()
+    return mode if mode in GRADING_EXECUTOR_MODES else "inline"
+
+
+def start_grading_executor() -> Optional[Executor]:
+    global _executor, _executor_mode
+    mode = get_grading_executor_mode()
+    if _executor is not None and _executor_mode == mode:
+        return _executor
+    shutdown_grading_executor()
+    _executor_mode = mode
+    workers = max(1, int(os.getenv("GRADING_EXECUTOR_WORKERS", "2")))
+    if mode == "thread":
+        _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="grading")
+    elif mode == "process":
+        context = multiprocessing.get_context(os.getenv("GRADING_MP_START_METHOD", "spawn"))
+        _executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_warm_grading_worker,
+        )
+        # Workers start lazily; one no-op per worker starts them (and runs the
+        # warm-up initializer) now instead of on the first graded turns.
+        for _ in range(workers):
+            _executor.submit(_start_grading_worker)
+    return _executor
+
+
+def shutdown_grading_executor() -> None:
+    global _executor, _executor_mode
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+    _executor_mode = None
+
+
+def _record(wait_ms: float, exec_ms: float, failed: bool) -> None:
+    _metrics["queue_depth"] -= 1
+    if failed:
+        _metrics["failed"] += 1
+        return
+    _metrics["completed"] += 1
+    _metrics["exec_ms_total"] += exec_ms
+    _metrics["exec_ms_max"] = max(_metrics["exec_ms_max"], exec_ms)
+    _metrics["wait_ms_total"] += wait_ms
+    _metrics["wait_ms_max"] = max(_metrics["wait_ms_max"], wait_ms)
+
+
+async def run_grading(job: GradingJob) -> GradingOutput:
+    _metrics["submitted"] += 1
+    _metrics["queue_depth"] += 1
+    _metrics["max_queue_depth"] = max(_metrics["max_queue_depth"], _metrics["queue_depth"])
+    submitted_at = time.perf_counter()
+    try:
+        if get_grading_executor_mode() == "inline":
+            output = run_grading_job(job)
+        else:
+            executor = start_grading_executor()
+            loop = asyncio.get_running_loop()
+            output = await loop.run_in_executor(executor, run_grading_job, job)
+    except Exception:
+        _record(0.0, 0.0, failed=True)
+        raise
+    total_ms = (time.perf_counter() - submitted_at) * 1000
+    _record(max(0.0, total_ms - output.exec_ms), output.exec_ms, failed=False)
+    return output
+
+
+def grading_executor_metrics() -> Dict[str, Any]:
+    completed = _metrics["completed"]
+    return {
+        "mode": get_grading_executor_mode(),
+        **_metrics,
+        "exec_ms_avg": _metrics["exec_ms_total"] / completed if completed else 0.0,
+        "wait_ms_avg": _metrics["wait_ms_total"] / completed if completed else 0.0,
+    }
@@ -1,10 +1,9 @@
-from typing import Iterable, List, Set, Tuple
+from dataclasses import dataclass
+from typing import List, Optional, Set, Tuple
 
-from controller.grading.text_align import (
-    AlignmentResult,
-    align_words,
-    normalized_edit_distance,
-)
+from controller.grading.char_distance import char_distances
+from controller.grading.text_align import AlignmentResult, align_words
+from schemas.imports import TurnScore
 
 MISPRONOUNCED_THRESHOLD = 0.4
 
@@ -35,38 +34,112 @@ def count_fillers(tokens: List[str]) -> Tuple[int, int]:
     return filler_count, len(tokens)
 
 
-def build_mispronounced_words(
+@dataclass
+class GradedPair:
+    op: str
+    expected: str
+    actual: str
+    expected_idx: Optional[int]
+    actual_idx: Optional[int]
+    edit_distance: int
+    normalized_edit_distance: float
+    decision: str
+
+
+@dataclass
+class GradingResult:
+    expected_tokens: List[str]
+    actual_tokens: List[str]
+    alignment: AlignmentResult
+    pairs: List[GradedPair]
+    mispronounced_words: List[str]
+    threshold: float
+    wer: float
+    filler_count: int
+    total_tokens: int
+    confidence: int
+    fluency: int
+    hesitation: int
+
+    def turn_score(self) -> TurnScore:
+        return TurnScore(
+            confidence=self.confidence,
+            fluency=self.fluency,
+            hesitation=self.hesitation,
+        )
+
+
+def _classify_op(expected: str, actual: str) -> str:
+    if expected and actual:
+        return "match" if expected == actual else "substitute"
+    if expected and not actual:
+        return "delete"
+    if actual and not expected:
+        return "insert"
+    return "match"
+
+
+def grade_pairs(
     alignment: AlignmentResult,
-) -> List[str]:
+    threshold: float = MISPRONOUNCED_THRESHOLD,
+) -> Tuple[List[GradedPair], List[str]]:
+    pairs: List[GradedPair] = []
     mispronounced: List[str] = []
-    seen = set()
-    for expected_word, actual_word in alignment.aligned_pairs:
-        if not expected_word or not actual_word:
-            continue
-        if expected_word == actual_word:
-            continue
-        if normalized_edit_distance(expected_word, actual_word) <= MISPRONOUNCED_THRESHOLD:
-            if expected_word not in seen:
-                seen.add(expected_word)
-                mispronounced.append(expected_word)
-    return mispronounced
+    seen: Set[str] = set()
+    exp_cursor = -1
+    act_cursor = -1
 
+    distances = char_distances(alignment.aligned_pairs)
+    for (expected_word, actual_word), (ed, norm_ed) in zip(
+        alignment.aligned_pairs, distances
+    ):
+        expected_idx = None
+        actual_idx = None
+        if expected_word:
+            exp_cursor += 1
+            expected_idx = exp_cursor
+        if actual_word:
+            act_cursor += 1
+            actual_idx = act_cursor
 
-def compute_scores(
-    expected_tokens: List[str],
-    actual_tokens: List[str],
+        op = _classify_op(expected_word, actual_word)
+        if op == "insert":
+            decision = "insertion"
+        elif op == "delete":
+            decision = "deletion"
+        elif op == "match":
+            decision = "exact_match"
+        elif norm_ed > threshold:
+            decision = "too_far_from_expected"
+        elif expected_word in seen:
+            decision = "deduped"
+        else:
+            decision = "near_miss"
+            seen.add(expected_word)
+            mispronounced.append(expected_word)
+
+        pairs.append(
+            GradedPair(
+                op=op,
+                expected=expected_word,
+                actual=actual_word,
+                expected_idx=expected_idx,
+                actual_idx=actual_idx,
+                edit_distance=ed,
+                normalized_edit_distance=norm_ed,
+                decision=decision,
+            )
+        )
+    return pairs, mispronounced
+
+
+def _score_turn(
+    filler_ratio: float,
+    wer: float,
+    mispronounced_ratio: float,
     leniency: float,
-) -> Tuple[int, int, int, float, int, int, AlignmentResult, List[str]]:
+) -> Tuple[int, int, int]:
     strictness = 1 / clamp_leniency(leniency)
-    filler_count, total_tokens = count_fillers(actual_tokens)
-    filler_ratio = filler_count / max(1, total_tokens)
-    alignment = align_words(expected_tokens, actual_tokens)
-    wer = (alignment.substitutions + alignment.insertions + alignment.deletions) / max(
-        1, len(expected_tokens)
-    )
-    mispronounced_words = build_mispronounced_words(alignment)
-    mispronounced_ratio = len(mispronounced_words) / max(1, len(expected_tokens))
-
     hesitation = clamp(round(100 - (filler_ratio * 140 * strictness)))
     confidence = clamp(round(100 - (wer * 110 * strictness)))
     fluency = clamp(
@@ -77,14 +150,56 @@ def compute_scores(
             - (wer * 40 * strictness)
         )
     )
+    return confidence, fluency, hesitation
 
-    return (
-        confidence,
-        fluency,
-        hesitation,
+
+def grade_turn(
+    expected_tokens: List[str],
+    actual_tokens: List[str],
+    leniency: float,
+    threshold: float = MISPRONOUNCED_THRESHOLD,
+) -> GradingResult:
+    filler_count, total_tokens = count_fillers(actual_tokens)
+    alignment = align_words(expected_tokens, actual_tokens)
+    pairs, mispronounced_words = grade_pairs(alignment, threshold)
+    wer = (alignment.substitutions + alignment.insertions + alignment.deletions) / max(
+        1, len(expected_tokens)
+    )
+    confidence, fluency, hesitation = _score_turn(
+        filler_count / max(1, total_tokens),
         wer,
-        filler_count,
-        total_tokens,
-        alignment,
-        mispronounced_words,
+        len(mispronounced_words) / max(1, len(expected_tokens)),
+        leniency,
+    )
+    return GradingResult(
+        expected_tokens=expected_tokens,
+        actual_tokens=actual_tokens,
+        alignment=alignment,
+        pairs=pairs,
+        mispronounced_words=mispronounced_words,
+        threshold=threshold,
+        wer=wer,
+        filler_count=filler_count,
+        total_tokens=total_tokens,
+        confidence=confidence,
+        fluency=fluency,
+        hesitation=hesitation,
+    )
+
+
+def compute_scores(
+    expected_tokens: List[str],
+    actual_tokens: List[str],
+    leniency: float,
+) -> Tuple[int, int, int, float, int, int, AlignmentResult, List[str]]:
+    result = grade_turn(expected_tokens, actual_tokens, leniency)
+    return (
+        result.confidence,
+        result.fluency,
+        result.hesitation,
+        result.wer,
+        result.filler_count,
+        result.total_tokens,
+        result.alignment,
+        result.mispronounced_words,
     )
@@ -1,12 +1,9 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional
 
-from controller.grading.text_align import (
-    AlignmentResult,
-    edit_distance,
-    normalized_edit_distance,
-)
+from controller.grading.scoring import GradedPair, GradingResult, grade_pairs
+from controller.grading.text_align import AlignmentResult
 from schemas.speech_analysis import (
     ASRMeta,
     AlignmentMeta,
@@ -21,27 +18,19 @@ from schemas.speech_analysis import (
 )
 
 
-def _classify_op(expected: str, actual: str) -> str:
-    if expected and actual:
-        return "match" if expected == actual else "substitute"
-    if expected and not actual:
-        return "delete"
-    if actual and not expected:
-        return "insert"
-    return "match"
-
-
-def build_speech_analysis(
+def _assemble_speech_analysis(
     *,
     expected_text: str,
     asr_text: str,
     expected_tokens: List[str],
     actual_tokens: List[str],
     alignment: AlignmentResult,
+    pairs: List[GradedPair],
     mispronounced_words: List[str],
     threshold: float,
-    asr_model: Optional[str] = None,
-    asr_parameters: Optional[Dict[str, Any]] = None,
+    wer: float,
+    asr_model: Optional[str],
+    asr_parameters: Optional[Dict[str, Any]],
 ) -> TurnSpeechAnalysis:
     asr_meta = ASRMeta(
         model=asr_model,
@@ -61,114 +50,43 @@ def build_speech_analysis(
     ignored_differences: List[IgnoredDifference] = []
     mispronounced_entries: List[MispronouncedWord] = []
 
-    seen_mispronounced: Set[str] = set()
-    exp_cursor = -1
-    act_cursor = -1
-
-    for expected_word, actual_word in alignment.aligned_pairs:
-        expected_idx = None
-        actual_idx = None
-        if expected_word:
-            exp_cursor += 1
-            expected_idx = exp_cursor
-        if actual_word:
-            act_cursor += 1
-            actual_idx = act_cursor
-
-        op = _classify_op(expected_word, actual_word)
-        norm_ed = normalized_edit_distance(expected_word, actual_word)
-        ed = edit_distance(expected_word, actual_word)
-
+    for pair in pairs:
         aligned_pairs.append(
             AlignedPair(
-                op=op,
-                expected_idx=expected_idx,
-                actual_idx=actual_idx,
-                expected=expected_word,
-                actual=actual_word,
-                edit_distance=ed,
-                normalized_edit_distance=norm_ed,
+                op=pair.op,
+                expected_idx=pair.expected_idx,
+                actual_idx=pair.actual_idx,
+                expected=pair.expected,
+                actual=pair.actual,
+                edit_distance=pair.edit_distance,
+                normalized_edit_distance=pair.normalized_edit_distance,
             )
         )
 
-        if op == "insert":
-            ignored_differences.append(
-                IgnoredDifference(
-                    op="insert",
-                    ignored_because="insertion",
-                    expected=expected_word,
-                    actual=actual_word,
-                    expected_idx=expected_idx,
-                    actual_idx=actual_idx,
-                    normalized_edit_distance=norm_ed,
-                )
-            )
-            continue
-        if op == "delete":
-            ignored_differences.append(
-                IgnoredDifference(
-                    op="delete",
-                    ignored_because="deletion",
-                    expected=expected_word,
-                    actual=actual_word,
-                    expected_idx=expected_idx,
-                    actual_idx=actual_idx,
-                    normalized_edit_distance=norm_ed,
-                )
-            )
-            continue
-        if op == "match":
-            ignored_differences.append(
-                IgnoredDifference(
-                    op="match",
-                    ignored_because="exact_match",
-                    expected=expected_word,
-                    actual=actual_word,
-                    expected_idx=expected_idx,
-                    actual_idx=actual_idx,
-                    normalized_edit_distance=norm_ed,
+        if pair.decision == "near_miss":
+            mispronounced_entries.append(
+                MispronouncedWord(
+                    expected=pair.expected,
+                    actual=pair.actual,
+                    expected_idx=pair.expected_idx,
+                    actual_idx=pair.actual_idx,
+                    normalized_edit_distance=pair.normalized_edit_distance,
+                    reason="near_miss",
+                    deduped=False,
                 )
             )
             continue
-
-        if norm_ed <= threshold:
-            if expected_word not in seen_mispronounced:
-                seen_mispronounced.add(expected_word)
-                mispronounced_entries.append(
-                    MispronouncedWord(
-                        expected=expected_word,
-                        actual=actual_word,
-                        expected_idx=expected_idx,
-                        actual_idx=actual_idx,
-                        normalized_edit_distance=norm_ed,
-                        reason="near_miss",
-                        deduped=False,
-                    )
-                )
-            else:
-                ignored_differences.append(
-                    IgnoredDifference(
-                        op="substitute",
-                        ignored_because="deduped",
-                        expected=expected_word,
-                        actual=actual_word,
-                        expected_idx=expected_idx,
-                        actual_idx=actual_idx,
-                        normalized_edit_distance=norm_ed,
-                    )
-                )
-        else:
-            ignored_differences.append(
-                IgnoredDifference(
-                    op="substitute",
-                    ignored_because="too_far_from_expected",
-                    expected=expected_word,
-                    actual=actual_word,
-                    expected_idx=expected_idx,
-                    actual_idx=actual_idx,
-                    normalized_edit_distance=norm_ed,
-                )
+        ignored_differences.append(
+            IgnoredDifference(
+                op=pair.op,
+                ignored_because=pair.decision,
+                expected=pair.expected,
+                actual=pair.actual,
+                expected_idx=pair.expected_idx,
+                actual_idx=pair.actual_idx,
+                normalized_edit_distance=pair.normalized_edit_distance,
             )
+        )
 
     expected_order_map = {word: i for i, word in enumerate(mispronounced_words)}
     mispronounced_entries.sort(
@@ -176,9 +94,6 @@ def build_speech_analysis(
     )
 
     correct = max(0, len(expected_tokens) - alignment.substitutions - alignment.deletions)
-    wer = (alignment.substitutions + alignment.insertions + alignment.deletions) / max(
-        1, len(expected_tokens)
-    )
     alignment_summary = AlignmentSummary(
         substitutions=alignment.substitutions,
         insertions=alignment.insertions,
@@ -202,3 +117,57 @@ def build_speech_analysis(
         ignored_differences=ignored_differences,
         extra={},
     )
+
+
+def project_speech_analysis(
+    result: GradingResult,
+    *,
+    expected_text: str,
+    asr_text: str,
+    asr_model: Optional[str] = None,
+    asr_parameters: Optional[Dict[str, Any]] = None,
+) -> TurnSpeechAnalysis:
+    return _assemble_speech_analysis(
+        expected_text=expected_text,
+        asr_text=asr_text,
+        expected_tokens=result.expected_tokens,
+        actual_tokens=result.actual_tokens,
+        alignment=result.alignment,
+        pairs=result.pairs,
+        mispronounced_words=result.mispronounced_words,
+        threshold=result.threshold,
+        wer=result.wer,
+        asr_model=asr_model,
+        asr_parameters=asr_parameters,
+    )
+
+
+def build_speech_analysis(
+    *,
+    expected_text: str,
+    asr_text: str,
+    expected_tokens: List[str],
+    actual_tokens: List[str],
+    alignment: AlignmentResult,
+    mispronounced_words: List[str],
+    threshold: float,
+    asr_model: Optional[str] = None,
+    asr_parameters: Optional[Dict[str, Any]] = None,
+) -> TurnSpeechAnalysis:
+    pairs, _ = grade_pairs(alignment, threshold)
+    wer = (alignment.substitutions + alignment.insertions + alignment.deletions) / max(
+        1, len(expected_tokens)
+    )
+    return _assemble_speech_analysis(
+        expected_text=expected_text,
+        asr_text=asr_text,
+        expected_tokens=expected_tokens,
+        actual_tokens=actual_tokens,
+        alignment=alignment,
+        pairs=pairs,
+        mispronounced_words=mispronounced_words,
+        threshold=threshold,
+        wer=wer,
+        asr_model=asr_model,
+        asr_parameters=asr_parameters,
+    )
@@ -1,6 +1,8 @@
 import re
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Dict, List, Tuple
+
+from controller.grading.char_distance import char_edit_distance, normalize_distance
 
 
 _PUNCT_RE = re.compile(r"[^\w\s']")
@@ -12,32 +14,11 @@ def tokenize(text: str) -> List[str]:
 
 
 def edit_distance(a: str, b: str) -> int:
-    if a == b:
-        return 0
-    if not a:
-        return len(b)
-    if not b:
-        return len(a)
-    dp = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
-    for i in range(len(a) + 1):
-        dp[i][0] = i
-    for j in range(len(b) + 1):
-        dp[0][j] = j
-    for i in range(1, len(a) + 1):
-        for j in range(1, len(b) + 1):
-            cost = 0 if a[i - 1] == b[j - 1] else 1
-            dp[i][j] = min(
-                dp[i - 1][j] + 1,
-                dp[i][j - 1] + 1,
-                dp[i - 1][j - 1] + cost,
-            )
-    return dp[-1][-1]
+    return char_edit_distance(a, b)
 
 
 def normalized_edit_distance(a: str, b: str) -> float:
-    if not a and not b:
-        return 0.0
-    return edit_distance(a, b) / max(1, len(a), len(b))
+    return normalize_distance(char_edit_distance(a, b), a, b)
 
 
 @dataclass
@@ -48,50 +29,111 @@ class AlignmentResult:
     aligned_pairs: List[Tuple[str, str]]
 
 
-def align_words(expected: List[str], actual: List[str]) -> AlignmentResult:
-    rows = len(expected) + 1
-    cols = len(actual) + 1
-    dp = [[0] * cols for _ in range(rows)]
-    back = [[None] * cols for _ in range(rows)]
+_OP_EQ = 0
+_OP_SUB = 1
+_OP_DEL = 2
+_OP_INS = 3
+_OP_NONE = 4
+
+
+def _intern_tokens(expected: List[str], actual: List[str]) -> Tuple[List[int], List[int]]:
+    ids: Dict[str, int] = {}
+    expected_ids = [ids.setdefault(token, len(ids)) for token in expected]
+    actual_ids = [ids.setdefault(token, len(ids)) for token in actual]
+    return expected_ids, actual_ids
+
+
+def _banded_alignment(
+    expected_ids: List[int],
+    actual_ids: List[int],
+    band: int,
+) -> Tuple[int, List[bytearray], List[int]]:
+    # Cells outside |i - j| <= band are unreachable; backpointer rows only
+    # cover the band and are indexed with the per-row column offset.
+    rows = len(expected_ids) + 1
+    cols = len(actual_ids) + 1
+    inf = rows + cols
+
+    prev = [inf] * cols
+    first_hi = min(cols - 1, band)
+    for j in range(first_hi + 1):
+        prev[j] = j
+    first_back = bytearray([_OP_INS]) * (first_hi + 1)
+    first_back[0] = _OP_NONE
+    back_rows = [first_back]
+    offsets = [0]
 
     for i in range(1, rows):
-        dp[i][0] = i
-        back[i][0] = "del"
-    for j in range(1, cols):
-        dp[0][j] = j
-        back[0][j] = "ins"
+        lo = max(0, i - band)
+        hi = min(cols - 1, i + band)
+        curr = [inf] * cols
+        back = bytearray(hi - lo + 1)
+        token = expected_ids[i - 1]
+        j = lo
+        if j == 0:
+            curr[0] = i
+            back[0] = _OP_DEL
+            j = 1
+        left = curr[j - 1]
+        for j in range(j, hi + 1):
+            best = prev[j] + 1
+            op = _OP_DEL
+            cost = left + 1
+            if cost < best:
+                best = cost
+                op = _OP_INS
+            if token == actual_ids[j - 1]:
+                cost = prev[j - 1]
+                if cost < best:
+                    best = cost
+                    op = _OP_EQ
+            else:
+                cost = prev[j - 1] + 1
+                if cost < best:
+                    best = cost
+                    op = _OP_SUB
+            curr[j] = best
+            back[j - lo] = op
+            left = best
+        back_rows.append(back)
+        offsets.append(lo)
+        prev = curr
+
+    return prev[cols - 1], back_rows, offsets
 
-    for i in range(1, rows):
-        for j in range(1, cols):
-            cost = 0 if expected[i - 1] == actual[j - 1] else 1
-            options = [
-                (dp[i - 1][j] + 1, "del"),
-                (dp[i][j - 1] + 1, "ins"),
-                (dp[i - 1][j - 1] + cost, "sub" if cost else "eq"),
-            ]
-            best_cost, best_op = min(options, key=lambda x: x[0])
-            dp[i][j] = best_cost
-            back[i][j] = best_op
+
+def align_words(expected: List[str], actual: List[str]) -> AlignmentResult:
+    # Ties prefer deletion, then insertion, then the diagonal move. The band
+    # doubles until the cost fits inside it; every optimal path stays within
+    # |i - j| <= cost, so the backtrace matches the full table.
+    expected_ids, actual_ids = _intern_tokens(expected, actual)
+    longest = max(len(expected), len(actual))
+    band = max(abs(len(expected) - len(actual)), min(longest, 8))
+    while True:
+        distance, back_rows, offsets = _banded_alignment(expected_ids, actual_ids, band)
+        if distance <= band or band >= longest:
+            break
+        band = min(longest, band * 2)
 
     i, j = len(expected), len(actual)
     subs = ins = dels = 0
     aligned: List[Tuple[str, str]] = []
     while i > 0 or j > 0:
-        op = back[i][j]
-        if op == "eq":
+        op = back_rows[i][j - offsets[i]]
+        if op == _OP_EQ:
             aligned.append((expected[i - 1], actual[j - 1]))
             i -= 1
             j -= 1
-        elif op == "sub":
+        elif op == _OP_SUB:
             subs += 1
             aligned.append((expected[i - 1], actual[j - 1]))
             i -= 1
             j -= 1
-        elif op == "del":
+        elif op == _OP_DEL:
             dels += 1
             aligned.append((expected[i - 1], ""))
             i -= 1
-        elif op == "ins":
+        elif op == _OP_INS:
             ins += 1
             aligned.append(("", actual[j - 1]))
             j -= 1
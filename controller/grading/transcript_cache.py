@@ -0,0 +1,155 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from core.redis_cache import cache_get_json, cache_set_json
+
+TRANSCRIPT_CACHE_PREFIX = "asr_transcript"
+
+_local: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+_inflight: Dict[str, "asyncio.Future[str]"] = {}
+_counters: Dict[str, int] = {
+    "local_hits": 0,
+    "redis_hits": 0,
+    "coalesced": 0,
+    "misses": 0,
+    "stores": 0,
+    "redis_errors": 0,
+}
+
+
+class _LeaderFailed(Exception):
+    """Set on the shared future when the transcribing request is cancelled."""
+
+
+def _ttl_seconds() -> int:
+    return int(os.getenv("TRANSCRIPT_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+
+def _local_max_entries() -> int:
+    return int(os.getenv("TRANSCRIPT_CACHE_LOCAL_SIZE", "512"))
+
+
+def transcript_cache_key(audio_sha256: str, model_name: str) -> str:
+    return f"{TRANSCRIPT_CACHE_PREFIX}:{model_name}:{audio_sha256}"
+
+
+def _local_get(key: str) -> Optional[str]:
+    entry = _local.get(key)
+    if entry is None:
+        return None
+    expires_at, transcript = entry
+    if expires_at < time.monotonic():
+        _local.pop(key, None)
+        return None
+    _local.move_to_end(key)
+    return transcript
+
+
+def _local_put(key: str, transcript: str, ttl_seconds: int) -> None:
+    _local[key] = (time.monotonic() + ttl_seconds, transcript)
+    _local.move_to_end(key)
+    while len(_local) > max(0, _local_max_entries()):
+        _local.popitem(last=False)
+
+
+async def get_cached_transcript(audio_sha256: str, model_name: str) -> Optional[str]:
+    key = transcript_cache_key(audio_sha256, model_name)
+    transcript = _local_get(key)
+    if transcript is not None:
+        _counters["local_hits"] += 1
+        return transcript
+    try:
+        cached = await cache_get_json(key)
+    except Exception:
+        _counters["redis_errors"] += 1
+        cached = None
+    if cached and isinstance(cached.get("text"), str):
+        _counters["redis_hits"] += 1
+        _local_put(key, cached["text"], _ttl_seconds())
+        return cached["text"]
+    return None
+
+
+async def store_transcript(audio_sha256: str, model_name: str, transcript: str) -> None:
+    key = transcript_cache_key(audio_sha256, model_name)
+    ttl_seconds = _ttl_seconds()
+    _local_put(key, transcript, ttl_seconds)
+    _counters["stores"] += 1
+    try:
+        await cache_set_json(key, {"text": transcript, "model": model_name}, ttl_seconds)
+    except Exception:
+        _counters["redis_errors"] += 1
+
+
+async def get_or_transcribe(
+    audio_sha256: str,
+    model_name: str,
+    transcribe: Callable[[], Awaitable[str]],
+) -> Tuple[str, bool]:
+    """Return ``(transcript, cache_hit)`` for audio identified by its SHA-256.
+
+    Concurrent requests for the same audio in this worker share one
+    transcription instead of each queueing for the OpenAI rate limiter.
+    """
+    if not audio_sha256:
+        return await transcribe(), False
+    cached = await get_cached_transcript(audio_sha256, model_name)
+    if cached is not None:
+        return cached, True
+
+    key = transcript_cache_key(audio_sha256, model_name)
+    pending = _inflight.get(key)
+    while pending is not None:
+        try:
+            transcript = await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            if not pending.cancelled():
+                raise
+        except Exception:
+            pass
+        else:
+            _counters["coalesced"] += 1
+            return transcript, True
+        # The leading request failed or went away; the next caller in line
+        # transcribes and the rest wait on it.
+        cached = await get_cached_transcript(audio_sha256, model_name)
+        if cached is not None:
+            return cached, True
+        pending = _inflight.get(key)
+
+    _counters["misses"] += 1
+    future: "asyncio.Future[str]" = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        transcript = await transcribe()
+    except BaseException as exc:
+        # Never cancel the shared future: followers must not inherit one
+        # client's disconnect.
+        future.set_exception(_LeaderFailed() if isinstance(exc, asyncio.CancelledError) else exc)
+        # Mark the exception as retrieved when nobody else was waiting.
+        future.exception()
+        raise
+    else:
+        future.set_result(transcript)
+        await store_transcript(audio_sha256, model_name, transcript)
+        return transcript, False
+    finally:
+        _inflight.pop(key, None)
+
+
+def transcript_cache_metrics() -> Dict[str, Any]:
+    hits = _counters["local_hits"] + _counters["redis_hits"] + _counters["coalesced"]
+    lookups = hits + _counters["misses"]
+    return {
+        **_counters,
+        "local_entries": len(_local),
+        "inflight": len(_inflight),
+        "hit_ratio": hits / lookups if lookups else 0.0,
+    }
+
+
+def clear_local_transcript_cache() -> None:
+    _local.clear()
@@ -1,3 +1,13 @@
-from controller.script_generation.generate import generate_script
+from controller.script_generation.generate import (
+    build_script_config,
+    generate_script,
+    generate_script_turns,
+    synthesize_script_audio,
+)
 
-__all__ = ["generate_script"]
+__all__ = [
+    "build_script_config",
+    "generate_script",
+    "generate_script_turns",
+    "synthesize_script_audio",
+]
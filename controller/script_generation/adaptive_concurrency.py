@@ -0,0 +1,124 @@
+import math
+import os
+import time
+from typing import Any, Dict, Mapping, Optional
+
+
+# Below this, latency differences are scheduling noise rather than load.
+MIN_BASELINE_MS = 50.0
+
+
+def adaptive_concurrency_enabled() -> bool:
+    return os.getenv("OPENAI_ADAPTIVE_CONCURRENCY", "1").strip().lower() in {"1", "true", "yes"}
+
+
+def _size_bucket(work_units: float) -> int:
+    # Half-octave buckets: calls in one bucket differ in size by under 1.5x.
+    return int(round(2 * math.log2(max(1.0, work_units))))
+
+
+def _header_ratio(headers: Mapping[str, str], kind: str) -> Optional[float]:
+    try:
+        remaining = float(headers[f"x-ratelimit-remaining-{kind}"])
+        limit = float(headers[f"x-ratelimit-limit-{kind}"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return remaining / limit if limit > 0 else None
+
+
+class AdaptiveConcurrency:
+    """AIMD concurrency limit for one OpenAI model.
+
+    Healthy responses add ``1 / limit`` (about +1 per round of calls). A 429
+    halves the limit and pauses growth for the retry-after period. Latency
+    well above the baseline, or nearly exhausted ``x-ratelimit-remaining-*``
+    headers, shrink it gently before OpenAI starts rejecting calls.
+
+    TTS and ASR take longer for longer text or audio, so baselines are kept
+    per payload size bucket (``work_units``: tokens, audio bytes) and a batch
+    of long turns is not read as congestion.
+    """
+
+    def __init__(self, model: str, initial: int, min_limit: int, max_limit: int):
+        self.model = model
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(self.max_limit, max(self.min_limit, initial)))
+        self.latency_ewma_ms: Optional[float] = None
+        self.baselines_ms: Dict[int, float] = {}
+        # Latency relative to the size bucket's baseline; 1.0 is uncongested.
+        self.slowdown_ewma: Optional[float] = None
+        self.remaining_ratio: Optional[float] = None
+        self.cooldown_until = 0.0
+        self.counters = {"successes": 0, "rate_limited": 0, "increases": 0, "decreases": 0}
+
+    @property
+    def current(self) -> int:
+        return int(self.limit)
+
+    def _decrease(self, factor: float, cooldown_s: float) -> None:
+        self.limit = max(float(self.min_limit), self.limit * factor)
+        self.cooldown_until = max(self.cooldown_until, time.monotonic() + cooldown_s)
+        self.counters["decreases"] += 1
+
+    def on_success(self, latency_ms: float, work_units: float = 1.0) -> None:
+        self.counters["successes"] += 1
+        if self.latency_ewma_ms is None:
+            self.latency_ewma_ms = latency_ms
+        else:
+            self.latency_ewma_ms += 0.2 * (latency_ms - self.latency_ewma_ms)
+        bucket = _size_bucket(work_units)
+        baseline = self.baselines_ms.get(bucket)
+        if baseline is None or latency_ms < baseline:
+            baseline = latency_ms
+        else:
+            # Drift up slowly so one unusually fast call is not the baseline forever.
+            baseline += 0.01 * (latency_ms - baseline)
+        self.baselines_ms[bucket] = baseline
+        slowdown = latency_ms / max(baseline, MIN_BASELINE_MS)
+        if self.slowdown_ewma is None:
+            self.slowdown_ewma = slowdown
+        else:
+            self.slowdown_ewma += 0.2 * (slowdown - self.slowdown_ewma)
+
+        if time.monotonic() < self.cooldown_until:
+            return
+        tolerance = float(os.getenv("OPENAI_AIMD_LATENCY_TOLERANCE", "2.0"))
+        if self.slowdown_ewma > tolerance:
+            self._decrease(0.9, cooldown_s=1.0)
+            return
+        if self.remaining_ratio is not None and self.remaining_ratio < 0.25:
+            return
+        if self.limit < self.max_limit:
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+            self.counters["increases"] += 1
+
+    def on_rate_limited(self, retry_after_s: Optional[float] = None) -> None:
+        self.counters["rate_limited"] += 1
+        self._decrease(0.5, cooldown_s=max(1.0, retry_after_s or 0.0))
+
+    def on_headers(self, headers: Mapping[str, str]) -> None:
+        ratios = [
+            ratio
+            for ratio in (_header_ratio(headers, "requests"), _header_ratio(headers, "tokens"))
+            if ratio is not None
+        ]
+        if not ratios:
+            return
+        self.remaining_ratio = min(ratios)
+        if self.remaining_ratio < 0.1 and time.monotonic() >= self.cooldown_until:
+            self._decrease(0.75, cooldown_s=1.0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limit": self.current,
+            "limit_exact": round(self.limit, 3),
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "latency_ewma_ms": self.latency_ewma_ms,
+            "slowdown_ewma": self.slowdown_ewma,
+            "baselines_ms": {str(bucket): ms for bucket, ms in sorted(self.baselines_ms.items())},
+            "remaining_ratio": self.remaining_ratio,
+            "cooling_down": time.monotonic() < self.cooldown_until,
+            **self.counters,
+        }
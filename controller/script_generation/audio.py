@@ -1,7 +1,11 @@
 import asyncio
+import hashlib
+import logging
 import os
+import time
 import uuid
-from typing import List, Optional
+from collections import Counter
+from typing import BinaryIO, List, Optional, Set, Tuple
 from urllib.parse import unquote, urlparse
 
 from fastapi import HTTPException
@@ -10,10 +14,30 @@ from openai import AsyncOpenAI
 from controller.script_generation.clients import (
     build_public_r2_url,
     estimate_tokens_from_texts,
-    get_r2_client,
+    get_r2_store,
     openai_request_with_retries,
 )
+from controller.script_generation.audio_proxy import invalidate_object_meta
 from controller.script_generation.model_config import TTS_MODEL
+from controller.script_generation.r2_store import DeleteFailure, DeleteResult
+from repositories.tts_audio import (
+    acquire_tts_synthesis,
+    claim_tts_audio,
+    get_tts_audio,
+    mark_tts_audio_ready,
+    release_tts_audio,
+    release_tts_synthesis,
+)
+
+TTS_SHARED_PREFIX = "tts"
+# Per-user objects are keyed under these prefixes, so an account wipe can purge
+# them without reading every session.
+USER_AUDIO_PREFIXES = ("user-audio/{user_id}/", "scripts/{user_id}/")
+_RELEASE_CONCURRENCY = 16
+# First poll interval while another caller synthesizes a shared clip; doubles up to 2s.
+_CLIP_POLL_S = 0.2
+
+logger = logging.getLogger(__name__)
 
 
 async def response_to_bytes(response: object) -> bytes:
@@ -39,14 +63,22 @@ async def upload_audio_bytes(audio_bytes: bytes, key: str) -> str:
             status_code=500,
             detail="Missing CLOUDFLARE_R2_BUCKET environment variable.",
         )
-    client = get_r2_client()
-    await asyncio.to_thread(
-        client.put_object,
-        Bucket=bucket,
-        Key=key,
-        Body=audio_bytes,
-        ContentType="audio/mpeg",
-    )
+    await get_r2_store().put_object(key, audio_bytes, content_type="audio/mpeg")
+    invalidate_object_meta(key)
+    return build_public_r2_url(bucket, key)
+
+
+async def upload_audio_file(audio_file: BinaryIO, key: str) -> str:
+    bucket = os.getenv("CLOUDFLARE_R2_BUCKET")
+    if not bucket:
+        raise HTTPException(
+            status_code=500,
+            detail="Missing CLOUDFLARE_R2_BUCKET environment variable.",
+        )
+    # upload_fileobj streams from the handle and switches to multipart for
+    # large bodies, so the audio never has to be materialised as one bytes.
+    await get_r2_store().upload_fileobj(audio_file, key, content_type="audio/mpeg")
+    invalidate_object_meta(key)
     return build_public_r2_url(bucket, key)
 
 
@@ -88,34 +120,110 @@ def extract_r2_key(audio_url: str) -> Optional[str]:
     return _extract_r2_key(audio_url)
 
 
+async def _release_shared_clips(references: Counter) -> Tuple[Set[str], Counter]:
+    """Release shared clip references.
+
+    Returns the keys whose last reference went and the references that could
+    not be released.
+    """
+    semaphore = asyncio.Semaphore(_RELEASE_CONCURRENCY)
+    unreleased: Counter = Counter()
+
+    async def release(key: str, count: int) -> Optional[bool]:
+        async with semaphore:
+            try:
+                return await release_tts_audio(key, count)
+            except Exception as exc:
+                logger.warning("Failed to release %d references to %s: %s", count, key, exc)
+                unreleased[key] = count
+                return False
+
+    keys = list(references)
+    outcomes = await asyncio.gather(*(release(key, references[key]) for key in keys))
+    # ``None`` means the clip is untracked (pre-dedup), so it is ours to delete.
+    return {key for key, outcome in zip(keys, outcomes) if outcome is not False}, unreleased
+
+
+async def _delete_keys(keys: List[str]) -> DeleteResult:
+    """Delete ``keys``; each occurrence of a shared clip key drops one reference.
+
+    Shared clips are only deleted with their last reference. A reference that
+    could not be released comes back in ``failed`` once per occurrence, so
+    retrying the failed keys releases it then.
+    """
+    shared = Counter(key for key in keys if key.startswith(f"{TTS_SHARED_PREFIX}/"))
+    releasable, unreleased = await _release_shared_clips(shared) if shared else (set(), Counter())
+    keys = [key for key in dict.fromkeys(keys) if key not in shared or key in releasable]
+    result = await get_r2_store().delete_objects(keys) if keys else DeleteResult()
+    if result.failed:
+        logger.warning("Failed to delete %d of %d R2 objects", len(result.failed), len(keys))
+    for key, count in unreleased.items():
+        result.failed.extend(DeleteFailure(key, "ReleaseFailed", "reference not released") for _ in range(count))
+    return result
+
+
+async def delete_audio_objects(audio_urls: List[str]) -> DeleteResult:
+    """Delete the objects behind ``audio_urls`` in DeleteObjects batches.
+
+    Shared clips are reference counted, so each URL releases one reference and
+    the object is only deleted with the last one.
+    """
+    if not os.getenv("CLOUDFLARE_R2_BUCKET"):
+        return DeleteResult()
+    keys = [key for key in (_extract_r2_key(audio_url) for audio_url in audio_urls) if key]
+    return await _delete_keys(keys)
+
+
 async def delete_audio_by_urls(audio_urls: List[str]) -> int:
-    bucket = os.getenv("CLOUDFLARE_R2_BUCKET")
-    if not bucket:
-        return 0
-    client = get_r2_client()
-    deleted = 0
-    for audio_url in audio_urls:
-        key = _extract_r2_key(audio_url)
-        if not key:
-            continue
-        await asyncio.to_thread(
-            client.delete_object,
-            Bucket=bucket,
-            Key=key,
-        )
-        deleted += 1
-    return deleted
+    result = await delete_audio_objects(audio_urls)
+    return len(result.deleted)
 
 
-async def generate_audio_url(
+def user_audio_prefixes(user_id: str) -> List[str]:
+    return [prefix.format(user_id=user_id) for prefix in USER_AUDIO_PREFIXES]
+
+
+async def delete_audio_keys(keys: List[str], prefixes: List[str]) -> DeleteResult:
+    """Batch-delete ``keys`` and purge ``prefixes``.
+
+    Shared clip keys drop one reference each, as in delete_audio_objects.
+    Never raises for a failed listing; the prefix lands in ``failed_prefixes``.
+    """
+    if not os.getenv("CLOUDFLARE_R2_BUCKET"):
+        return DeleteResult()
+    store = get_r2_store()
+    result = await _delete_keys(keys) if keys else DeleteResult()
+    for prefix in prefixes:
+        try:
+            result.merge(await store.purge_prefix(prefix))
+        except Exception as exc:
+            logger.warning("Failed to purge R2 prefix %s: %s", prefix, exc)
+            result.failed_prefixes.append(prefix)
+    return result
+
+
+def _tts_dedup_enabled() -> bool:
+    return os.getenv("TTS_DEDUP_ENABLED", "1").strip().lower() in {"1", "true", "yes"}
+
+
+def normalize_tts_text(text: str) -> str:
+    return " ".join((text or "").split())
+
+
+def tts_content_hash(tts_model: str, voice: str, text: str) -> str:
+    material = "\x1f".join([tts_model, voice, normalize_tts_text(text)])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+async def _synthesize_speech(
     client: AsyncOpenAI,
-    text: str,
+    tts_model: str,
     voice: str,
-    key_prefix: str,
-) -> str:
-    tts_model = os.getenv("OPENAI_TTS_MODEL", TTS_MODEL)
+    text: str,
+    user_id: Optional[str] = None,
+):
     estimated_tokens = estimate_tokens_from_texts([text])
-    response = await openai_request_with_retries(
+    return await openai_request_with_retries(
         lambda: client.audio.speech.create(
             model=tts_model,
             voice=voice,
@@ -123,7 +231,97 @@ async def generate_audio_url(
             response_format="mp3",
         ), # pyright: ignore[reportUnknownLambdaType]
         estimated_tokens=estimated_tokens,
+        lane="batch",
+        user_id=user_id,
+        model=tts_model,
     )
+
+
+async def _wait_for_shared_clip(content_hash: str, key: str, owner: str) -> bool:
+    """``True`` once another caller has made the clip ready, ``False`` when this
+    caller should synthesize it.
+
+    Only the holder of the synthesis lease calls OpenAI; everyone else polls
+    until the clip is ready, the holder gives up or its lease runs out, or
+    TTS_DEDUP_WAIT_S passes.
+    """
+    lease_s = float(os.getenv("TTS_DEDUP_LEASE_S", "60"))
+    deadline = time.monotonic() + float(os.getenv("TTS_DEDUP_WAIT_S", "90"))
+    delay = _CLIP_POLL_S
+    while True:
+        if await acquire_tts_synthesis(content_hash, key, owner, lease_s):
+            return False
+        current = await get_tts_audio(content_hash)
+        if current is None or current.get("key") != key:
+            return False
+        if current.get("ready"):
+            return True
+        if time.monotonic() >= deadline:
+            logger.warning("Timed out waiting for shared clip %s, synthesizing it here", key)
+            return False
+        await asyncio.sleep(delay)
+        delay = min(2.0, delay * 2)
+
+
+async def _generate_shared_audio_url(
+    client: AsyncOpenAI,
+    tts_model: str,
+    text: str,
+    voice: str,
+    user_id: Optional[str] = None,
+) -> str:
+    bucket = os.getenv("CLOUDFLARE_R2_BUCKET")
+    if not bucket:
+        raise HTTPException(
+            status_code=500,
+            detail="Missing CLOUDFLARE_R2_BUCKET environment variable.",
+        )
+    content_hash = tts_content_hash(tts_model, voice, text)
+    # The suffix makes each incarnation of a clip unique, so deleting an old
+    # object can never remove one re-created after its last reference went away.
+    candidate_key = f"{TTS_SHARED_PREFIX}/{content_hash}-{uuid.uuid4().hex[:12]}.mp3"
+    entry = await claim_tts_audio(
+        content_hash,
+        candidate_key,
+        build_public_r2_url(bucket, candidate_key),
+        tts_model=tts_model,
+        voice=voice,
+    )
+    if entry.get("ready"):
+        return entry["url"]
+
+    key = entry["key"]
+    owner = uuid.uuid4().hex
+    try:
+        if await _wait_for_shared_clip(content_hash, key, owner):
+            return entry["url"]
+        response = await _synthesize_speech(client, tts_model, voice, text, user_id)
+        response_url = getattr(response, "url", None)
+        if isinstance(response_url, str) and response_url.startswith("http"):
+            await release_tts_synthesis(content_hash, owner)
+            await release_tts_audio(key)
+            return response_url
+        audio_bytes = await response_to_bytes(response)
+        await upload_audio_bytes(audio_bytes, key)
+    except BaseException:
+        await release_tts_synthesis(content_hash, owner)
+        await release_tts_audio(key)
+        raise
+    await mark_tts_audio_ready(content_hash, key)
+    return entry["url"]
+
+
+async def generate_audio_url(
+    client: AsyncOpenAI,
+    text: str,
+    voice: str,
+    key_prefix: str,
+    user_id: Optional[str] = None,
+) -> str:
+    tts_model = os.getenv("OPENAI_TTS_MODEL", TTS_MODEL)
+    if _tts_dedup_enabled():
+        return await _generate_shared_audio_url(client, tts_model, text, voice, user_id)
+    response = await _synthesize_speech(client, tts_model, voice, text, user_id)
     response_url = getattr(response, "url", None)
     if isinstance(response_url, str) and response_url.startswith("http"):
         return response_url
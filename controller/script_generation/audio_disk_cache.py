@@ -0,0 +1,261 @@
+import asyncio
+import hashlib
+import os
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from controller.script_generation.clients import get_r2_store
+from controller.script_generation.r2_store import ObjectMeta
+
+# A population lock older than this belongs to a worker that died mid-download.
+_STALE_LOCK_S = 120.0
+# Files touched this recently are never evicted, so a response that just
+# looked a file up does not lose it before opening it.
+_EVICTION_GRACE_S = 10.0
+
+
+class AudioDiskCache:
+    """Bounded on-disk copy of hot R2 audio, shared by every worker on the host.
+
+    Files are content addressed by ``sha256(key + etag)``, so a replaced object
+    is simply a different file. A key is only cached once it has been played
+    ``admit_after`` times (a decayed per-worker counter), so one-off plays do
+    not churn the disk. Population writes to a temp file and ``os.replace``s
+    it into place; an ``O_EXCL`` lock file stops workers downloading the same
+    object twice. Hits bump the file's mtime and eviction removes the oldest
+    files until the directory is back under ``max_bytes``.
+
+    Each worker only counts the bytes it wrote itself, so ``max_bytes`` is a
+    soft limit: the directory is rescanned on the first population and then
+    every ``rescan_s``, and can overshoot by what the other workers wrote in
+    between.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        max_bytes: int,
+        admit_after: int = 2,
+        max_object_bytes: int = 16 * 1024 * 1024,
+        max_tracked: int = 10000,
+        rescan_s: float = 300.0,
+    ):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.admit_after = max(1, admit_after)
+        self.max_object_bytes = max_object_bytes
+        self.max_tracked = max(1, max_tracked)
+        self.rescan_s = rescan_s
+        self._last_scan: Optional[float] = None
+        self._frequency: Dict[str, int] = {}
+        self._increments = 0
+        self._inflight: Set[str] = set()
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self._bytes = 0
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "admitted": 0,
+            "populated": 0,
+            "rejected": 0,
+            "too_large": 0,
+            "lock_busy": 0,
+            "errors": 0,
+            "evictions": 0,
+            "evicted_bytes": 0,
+        }
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, key: str, etag: str) -> str:
+        digest = hashlib.sha256(f"{key}\n{etag}".encode("utf-8")).hexdigest()
+        return os.path.join(self.root, digest[:2], digest + ".mp3")
+
+    def lookup(self, key: str, etag: str) -> Optional[Tuple[str, os.stat_result]]:
+        path = self.path_for(key, etag)
+        try:
+            os.utime(path)
+            stat_result = os.stat(path)
+        except FileNotFoundError:
+            self._counters["misses"] += 1
+            return None
+        self._counters["hits"] += 1
+        return path, stat_result
+
+    def _touch_frequency(self, content_id: str) -> int:
+        count = self._frequency.get(content_id, 0) + 1
+        self._frequency[content_id] = count
+        self._increments += 1
+        if self._increments >= self.max_tracked * 10 or len(self._frequency) > self.max_tracked:
+            # Age the counts so old popularity fades and the table stays bounded.
+            self._frequency = {k: v // 2 for k, v in self._frequency.items() if v // 2}
+            self._increments = 0
+        return count
+
+    def consider(self, key: str, meta: ObjectMeta, playback_start: bool = True) -> bool:
+        """Record a miss; start populating in the background once the key is hot."""
+        if not meta.etag:
+            return False
+        if meta.size > self.max_object_bytes:
+            self._counters["too_large"] += 1
+            return False
+        content_id = f"{key}\n{meta.etag}"
+        # Players fetch one clip as many ranges; only count the start of a play.
+        count = self._touch_frequency(content_id) if playback_start else self._frequency.get(content_id, 0)
+        if count < self.admit_after:
+            self._counters["rejected"] += 1
+            return False
+        if content_id in self._inflight:
+            return False
+        self._inflight.add(content_id)
+        self._counters["admitted"] += 1
+        task = asyncio.create_task(self._populate(key, meta, content_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    def _acquire_lock(self, lock_path: str) -> bool:
+        os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+        for _ in range(2):
+            try:
+                os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return True
+            except FileExistsError:
+                try:
+                    if time.time() - os.stat(lock_path).st_mtime < _STALE_LOCK_S:
+                        return False
+                    os.unlink(lock_path)
+                except FileNotFoundError:
+                    pass
+        return False
+
+    async def _populate(self, key: str, meta: ObjectMeta, content_id: str) -> None:
+        path = self.path_for(key, meta.etag or "")
+        lock_path = path + ".lock"
+        tmp_path = f"{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        locked = False
+        try:
+            if os.path.exists(path):
+                return
+            locked = await asyncio.to_thread(self._acquire_lock, lock_path)
+            if not locked:
+                self._counters["lock_busy"] += 1
+                return
+            stream = await get_r2_store().get_object_stream(key)
+            if stream.headers.get("etag") != meta.etag:
+                await stream.aclose()
+                return
+            written = 0
+            handle = await asyncio.to_thread(open, tmp_path, "wb")
+            try:
+                async for chunk in stream.iter_chunks():
+                    written += len(chunk)
+                    await asyncio.to_thread(handle.write, chunk)
+            finally:
+                await asyncio.to_thread(handle.close)
+            if written != meta.size:
+                return
+            await asyncio.to_thread(os.replace, tmp_path, path)
+            self._counters["populated"] += 1
+            self._bytes += written
+            if self._bytes > self.max_bytes or self._scan_due():
+                await asyncio.to_thread(self.evict)
+        except Exception:
+            self._counters["errors"] += 1
+        finally:
+            self._inflight.discard(content_id)
+            for leftover in ([tmp_path, lock_path] if locked else [tmp_path]):
+                try:
+                    os.unlink(leftover)
+                except FileNotFoundError:
+                    pass
+
+    def _scan(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        now = time.time()
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    stat_result = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if entry.name.endswith(".mp3"):
+                    entries.append((stat_result.st_mtime, stat_result.st_size, entry.path))
+                elif now - stat_result.st_mtime > 3600:
+                    # Temp or lock files left behind by a crashed worker.
+                    try:
+                        os.unlink(entry.path)
+                    except FileNotFoundError:
+                        pass
+        return entries
+
+    def _scan_due(self) -> bool:
+        return self._last_scan is None or time.monotonic() - self._last_scan >= self.rescan_s
+
+    def evict(self) -> None:
+        """Drop least recently used files until the cache is back under ``max_bytes``.
+
+        Blocking directory walk; call it through ``asyncio.to_thread``.
+        """
+        self._last_scan = time.monotonic()
+        entries = self._scan()
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        cutoff = time.time() - _EVICTION_GRACE_S
+        for mtime, size, path in sorted(entries):
+            if total <= target or mtime > cutoff:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                continue
+            total -= size
+            self._counters["evictions"] += 1
+            self._counters["evicted_bytes"] += size
+        self._bytes = total
+
+    async def drain(self) -> None:
+        """Wait for in-flight populations (tests and shutdown)."""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "root": self.root,
+            "max_bytes": self.max_bytes,
+            "bytes_estimate": self._bytes,
+            "last_scan_age_s": time.monotonic() - self._last_scan if self._last_scan is not None else None,
+            "tracked_keys": len(self._frequency),
+            "populating": len(self._inflight),
+            **self._counters,
+        }
+
+
+_disk_cache: Optional[AudioDiskCache] = None
+
+
+def get_audio_disk_cache() -> Optional[AudioDiskCache]:
+    """The host's audio cache, or ``None`` when AUDIO_DISK_CACHE_DIR is unset."""
+    global _disk_cache
+    root = os.getenv("AUDIO_DISK_CACHE_DIR")
+    if not root:
+        return None
+    if _disk_cache is None or _disk_cache.root != root:
+        _disk_cache = AudioDiskCache(
+            root,
+            max_bytes=int(os.getenv("AUDIO_DISK_CACHE_MAX_BYTES", str(2 * 1024 ** 3))),
+            admit_after=int(os.getenv("AUDIO_DISK_CACHE_ADMIT_AFTER", "2")),
+            max_object_bytes=int(os.getenv("AUDIO_DISK_CACHE_MAX_OBJECT_BYTES", str(16 * 1024 * 1024))),
+            rescan_s=float(os.getenv("AUDIO_DISK_CACHE_RESCAN_S", "300")),
+        )
+    # No scan here: this runs on the event loop inside a request. The first
+    # population scans (in a thread) and picks up what other workers or a
+    # previous run already cached.
+    return _disk_cache
+
+
+def audio_disk_cache_metrics() -> Optional[Dict[str, Any]]:
+    cache = get_audio_disk_cache()
+    return cache.metrics() if cache is not None else None
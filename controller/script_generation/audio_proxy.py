@@ -0,0 +1,209 @@
+import os
+import secrets
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Tuple
+
+from controller.script_generation.clients import get_r2_store
+from controller.script_generation.r2_store import ObjectMeta
+
+# Past this many ranges a request is served whole rather than as a multipart body.
+MAX_RANGES = 16
+
+ByteRange = Tuple[int, int]
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+class ObjectMetaCache:
+    """Short-lived LRU of HEAD results so each Range request skips the round trip."""
+
+    def __init__(self, ttl_s: float = 60.0, max_entries: int = 4096):
+        self.ttl_s = ttl_s
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, Tuple[ObjectMeta, float]]" = OrderedDict()
+        self._counters = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def get(self, key: str) -> Optional[ObjectMeta]:
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() >= entry[1]:
+            self._counters["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self._counters["hits"] += 1
+        return entry[0]
+
+    def put(self, meta: ObjectMeta) -> None:
+        self._entries[meta.key] = (meta, time.monotonic() + self.ttl_s)
+        self._entries.move_to_end(meta.key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        if self._entries.pop(key, None) is not None:
+            self._counters["invalidations"] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "ttl_s": self.ttl_s, **self._counters}
+
+
+_meta_cache: Optional[ObjectMetaCache] = None
+
+
+def get_object_meta_cache() -> ObjectMetaCache:
+    global _meta_cache
+    if _meta_cache is None:
+        _meta_cache = ObjectMetaCache(
+            ttl_s=float(os.getenv("AUDIO_META_CACHE_TTL_S", "60")),
+            max_entries=int(os.getenv("AUDIO_META_CACHE_SIZE", "4096")),
+        )
+    return _meta_cache
+
+
+async def get_object_meta(key: str) -> ObjectMeta:
+    cache = get_object_meta_cache()
+    meta = cache.get(key)
+    if meta is None:
+        meta = await get_r2_store().head_object(key)
+        cache.put(meta)
+    return meta
+
+
+def invalidate_object_meta(key: str) -> None:
+    if _meta_cache is not None:
+        _meta_cache.invalidate(key)
+
+
+def object_meta_metrics() -> Dict[str, Any]:
+    return get_object_meta_cache().metrics()
+
+
+def _opaque_tag(value: str) -> str:
+    return value.strip().removeprefix("W/")
+
+
+def _etag_matches(header: str, etag: Optional[str]) -> bool:
+    if not etag:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison.
+    return _opaque_tag(etag) in {_opaque_tag(candidate) for candidate in header.split(",")}
+
+
+def _not_after(header: str, last_modified: Optional[str]) -> bool:
+    if not last_modified:
+        return False
+    try:
+        return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+
+
+def is_not_modified(headers: Mapping[str, str], meta: ObjectMeta) -> bool:
+    """RFC 9110 13.2.2: If-None-Match wins; If-Modified-Since only applies without it."""
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, meta.etag)
+    if_modified_since = headers.get("if-modified-since")
+    return bool(if_modified_since) and _not_after(if_modified_since, meta.last_modified)
+
+
+def range_applies(headers: Mapping[str, str], meta: ObjectMeta) -> bool:
+    """If-Range: serve the ranges only when the validator still matches the object."""
+    if_range = headers.get("if-range")
+    if not if_range:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        # Strong comparison; a weak tag never matches.
+        return not if_range.startswith("W/") and if_range == meta.etag
+    return bool(meta.last_modified) and if_range == meta.last_modified
+
+
+def parse_ranges(header: Optional[str], size: int) -> Optional[List[ByteRange]]:
+    """Parse a ``bytes=`` Range header into sorted, merged inclusive ranges.
+
+    Returns ``None`` when the header should be ignored and the whole object
+    served; raises ``RangeNotSatisfiable`` when no range overlaps the object.
+    """
+    if not header or not header.strip().lower().startswith("bytes="):
+        return None
+    ranges: List[ByteRange] = []
+    for spec in header.split("=", 1)[1].split(","):
+        spec = spec.strip()
+        start_s, sep, end_s = spec.partition("-")
+        if not sep:
+            return None
+        try:
+            if start_s:
+                start = int(start_s)
+                end = int(end_s) if end_s else size - 1
+                if end_s and end < start:
+                    return None
+            else:
+                suffix = int(end_s)
+                if suffix == 0:
+                    continue
+                start, end = max(0, size - suffix), size - 1
+        except ValueError:
+            return None
+        if start >= size:
+            continue
+        ranges.append((start, min(end, size - 1)))
+    if not ranges:
+        raise RangeNotSatisfiable()
+    ranges.sort()
+    merged = [ranges[0]]
+    for start, end in ranges[1:]:
+        last_start, last_end = merged[-1]
+        if start <= last_end + 1:
+            merged[-1] = (last_start, max(last_end, end))
+        else:
+            merged.append((start, end))
+    if len(merged) > MAX_RANGES:
+        return None
+    return merged
+
+
+def multipart_boundary() -> str:
+    return secrets.token_hex(16)
+
+
+def _part_header(boundary: str, content_type: str, byte_range: ByteRange, size: int) -> bytes:
+    start, end = byte_range
+    return (
+        f"--{boundary}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+    ).encode("latin-1")
+
+
+def multipart_length(boundary: str, content_type: str, ranges: List[ByteRange], size: int) -> int:
+    length = sum(
+        len(_part_header(boundary, content_type, byte_range, size)) + byte_range[1] - byte_range[0] + 1 + 2
+        for byte_range in ranges
+    )
+    return length + len(f"--{boundary}--\r\n")
+
+
+async def iter_multipart_ranges(
+    key: str,
+    meta: ObjectMeta,
+    ranges: List[ByteRange],
+    boundary: str,
+    content_type: str,
+) -> AsyncIterator[bytes]:
+    """``multipart/byteranges`` body, one ranged GET per part, fetched as it is sent."""
+    store = get_r2_store()
+    for byte_range in ranges:
+        start, end = byte_range
+        part = await store.get_object_stream(key, range_header=f"bytes={start}-{end}")
+        yield _part_header(boundary, content_type, byte_range, meta.size)
+        async for chunk in part.iter_chunks():
+            yield chunk
+        yield b"\r\n"
+    yield f"--{boundary}--\r\n".encode("latin-1")
@@ -0,0 +1,128 @@
+import base64
+import datetime
+import hashlib
+import hmac
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import quote
+
+from fastapi import HTTPException
+
+from controller.script_generation.clients import get_r2_store
+
+# "proxy" streams through /sessions/audio; "presigned" hands out SigV4 query
+# URLs for the bucket; "hmac" signs public-bucket URLs for a Cloudflare
+# ``is_timed_hmac_valid_v0`` rule in front of CLOUDFLARE_R2_PUBLIC_URL.
+AUDIO_URL_MODES = ("proxy", "presigned", "hmac")
+
+_Slot = Tuple[str, int, str]
+
+
+def audio_url_mode() -> str:
+    mode = os.getenv("AUDIO_URL_MODE", "proxy").strip().lower()
+    return mode if mode in AUDIO_URL_MODES else "proxy"
+
+
+def _ttl_s() -> int:
+    return max(60, int(os.getenv("AUDIO_SIGNED_URL_TTL_S", "900")))
+
+
+class SignedUrlCache:
+    """LRU of signed URLs per (session, turn, audio type).
+
+    Signing times are aligned to a quarter of the TTL, so every worker issues
+    the same URL for an object within that window and CDNs see one cache key.
+    An entry is reused until the window rolls over, which leaves the client at
+    least three quarters of the TTL.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[_Slot, Tuple[str, str, float]]" = OrderedDict()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, slot: _Slot, key: str, now: float) -> Optional[str]:
+        entry = self._entries.get(slot)
+        if entry is None or entry[0] != key or now >= entry[2]:
+            self._counters["misses"] += 1
+            return None
+        self._entries.move_to_end(slot)
+        self._counters["hits"] += 1
+        return entry[1]
+
+    def put(self, slot: _Slot, key: str, url: str, refresh_at: float) -> None:
+        self._entries[slot] = (key, url, refresh_at)
+        self._entries.move_to_end(slot)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "max_entries": self.max_entries, **self._counters}
+
+
+_cache: Optional[SignedUrlCache] = None
+
+
+def get_signed_url_cache() -> SignedUrlCache:
+    global _cache
+    if _cache is None:
+        _cache = SignedUrlCache(int(os.getenv("AUDIO_SIGNED_URL_CACHE_SIZE", "10000")))
+    return _cache
+
+
+def _hmac_public_url(key: str, signed_at: int) -> Optional[str]:
+    public_base = os.getenv("CLOUDFLARE_R2_PUBLIC_URL", "").rstrip("/")
+    secret = os.getenv("AUDIO_URL_HMAC_SECRET", "")
+    if not public_base or not secret:
+        return None
+    path = "/" + quote(key, safe="/-_.~")
+    digest = hmac.new(secret.encode("utf-8"), f"{path}{signed_at}".encode("utf-8"), hashlib.sha256).digest()
+    token = f"{signed_at}-{base64.b64encode(digest).decode('ascii')}"
+    return f"{public_base}{path}?verify={quote(token, safe='')}"
+
+
+def _sign(mode: str, key: str, signed_at: int, ttl: int) -> Optional[str]:
+    if mode == "hmac":
+        return _hmac_public_url(key, signed_at)
+    try:
+        store = get_r2_store()
+    except HTTPException:
+        return None
+    return store.presign_get(
+        key,
+        ttl,
+        now=datetime.datetime.fromtimestamp(signed_at, tz=datetime.timezone.utc),
+    )
+
+
+def signed_audio_url(
+    session_id: str,
+    turn_index: int,
+    audio_type: str,
+    key: Optional[str],
+    now: Optional[float] = None,
+) -> Optional[str]:
+    """Direct-to-storage URL for a turn's audio, or ``None`` to use the proxy."""
+    mode = audio_url_mode()
+    if mode == "proxy" or not key:
+        return None
+    now = time.time() if now is None else now
+    slot = (session_id, turn_index, audio_type)
+    cache = get_signed_url_cache()
+    url = cache.get(slot, key, now)
+    if url is not None:
+        return url
+    ttl = _ttl_s()
+    step = ttl // 4
+    signed_at = int(now) - int(now) % step
+    url = _sign(mode, key, signed_at, ttl)
+    if url is not None:
+        cache.put(slot, key, url, refresh_at=signed_at + step)
+    return url
+
+
+def signed_url_metrics() -> Dict[str, Any]:
+    return {"mode": audio_url_mode(), "ttl_s": _ttl_s(), **get_signed_url_cache().metrics()}
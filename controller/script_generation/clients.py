@@ -2,35 +2,108 @@ import asyncio
 import os
 import random
 import time
-from collections import deque
-from typing import Optional
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
 
 from fastapi import HTTPException
-from openai import APIError, AsyncOpenAI, RateLimitError
+from openai import APIError, AsyncOpenAI, DefaultAsyncHttpxClient, RateLimitError
+
+from controller.script_generation.adaptive_concurrency import (
+    AdaptiveConcurrency,
+    adaptive_concurrency_enabled,
+)
+from controller.script_generation.openai_limiter import (
+    acquire_distributed_quota,
+    distributed_limiter_enabled,
+    note_local_fallback,
+    reconcile_distributed_tokens,
+    release_distributed_quota,
+    response_token_usage,
+)
+from controller.script_generation.openai_scheduler import OpenAIScheduler, normalize_lane
+from controller.script_generation.quota_gate import QuotaGate, QuotaTicket
+from controller.script_generation.r2_store import R2ObjectStore
 
 _openai_client: Optional[AsyncOpenAI] = None
-_r2_client = None
-_openai_semaphore: Optional[asyncio.Semaphore] = None
-_openai_rate_lock = asyncio.Lock()
+_r2_store: Optional[R2ObjectStore] = None
+_openai_schedulers: Dict[str, OpenAIScheduler] = {}
+_openai_concurrency: Dict[str, AdaptiveConcurrency] = {}
+# Model of the OpenAI call running in the current task, for the response hook.
+_current_openai_model: ContextVar[Optional[str]] = ContextVar("current_openai_model", default=None)
 _openai_last_call = 0.0
-_openai_window_lock = asyncio.Lock()
-_openai_request_window = deque()
-_openai_token_window = deque()
+_openai_quota_gate: Optional[QuotaGate] = None
+
+
+async def _observe_rate_limit_headers(response) -> None:
+    model = _current_openai_model.get()
+    if model is not None and adaptive_concurrency_enabled():
+        get_model_concurrency(model).on_headers(response.headers)
+        get_openai_scheduler(model).set_slots(get_model_concurrency(model).current)
 
 
 def get_openai_client() -> AsyncOpenAI:
     global _openai_client
     if _openai_client is None:
-        _openai_client = AsyncOpenAI()
+        _openai_client = AsyncOpenAI(
+            http_client=DefaultAsyncHttpxClient(
+                event_hooks={"response": [_observe_rate_limit_headers]}
+            )
+        )
     return _openai_client
 
 
-def get_openai_semaphore() -> asyncio.Semaphore:
-    global _openai_semaphore
-    if _openai_semaphore is None:
-        max_concurrency = int(os.getenv("OPENAI_MAX_CONCURRENCY", "1"))
-        _openai_semaphore = asyncio.Semaphore(max(1, max_concurrency))
-    return _openai_semaphore
+def get_model_concurrency(model: Optional[str] = None) -> AdaptiveConcurrency:
+    key = model or "default"
+    controller = _openai_concurrency.get(key)
+    if controller is None:
+        controller = AdaptiveConcurrency(
+            key,
+            initial=int(os.getenv("OPENAI_MAX_CONCURRENCY", "1")),
+            min_limit=int(os.getenv("OPENAI_MIN_CONCURRENCY", "1")),
+            max_limit=int(os.getenv("OPENAI_ADAPTIVE_MAX_CONCURRENCY", "16")),
+        )
+        _openai_concurrency[key] = controller
+    return controller
+
+
+def get_openai_scheduler(model: Optional[str] = None) -> OpenAIScheduler:
+    """Per-model scheduler; OpenAI rate limits are per model, so are our slots."""
+    key = model or "default"
+    scheduler = _openai_schedulers.get(key)
+    if scheduler is None:
+        if adaptive_concurrency_enabled():
+            slots = get_model_concurrency(key).current
+        else:
+            slots = int(os.getenv("OPENAI_MAX_CONCURRENCY", "1"))
+        scheduler = OpenAIScheduler(slots)
+        _openai_schedulers[key] = scheduler
+    return scheduler
+
+
+def openai_scheduler_metrics() -> Dict[str, Any]:
+    data = {}
+    for model, scheduler in _openai_schedulers.items():
+        data[model] = scheduler.metrics()
+        if model in _openai_concurrency:
+            data[model]["concurrency"] = _openai_concurrency[model].snapshot()
+    return data
+
+
+def _record_outcome(
+    model: Optional[str],
+    latency_ms: Optional[float] = None,
+    retry_after: Optional[float] = None,
+    rate_limited: bool = False,
+    work_units: float = 1.0,
+) -> None:
+    if not adaptive_concurrency_enabled():
+        return
+    controller = get_model_concurrency(model)
+    if rate_limited:
+        controller.on_rate_limited(retry_after)
+    elif latency_ms is not None:
+        controller.on_success(latency_ms, work_units)
+    get_openai_scheduler(model).set_slots(controller.current)
 
 
 async def apply_openai_rate_limit() -> None:
@@ -38,12 +111,13 @@ async def apply_openai_rate_limit() -> None:
     if min_interval_ms <= 0:
         return
     global _openai_last_call
-    async with _openai_rate_lock:
-        now = time.monotonic()
-        wait_s = (min_interval_ms / 1000) - (now - _openai_last_call)
-        if wait_s > 0:
-            await asyncio.sleep(wait_s)
-        _openai_last_call = time.monotonic()
+    # Reserve the next start time, then sleep without holding anything so
+    # later callers can reserve theirs in the meantime.
+    now = time.monotonic()
+    start_at = max(now, _openai_last_call + min_interval_ms / 1000)
+    _openai_last_call = start_at
+    if start_at > now:
+        await asyncio.sleep(start_at - now)
 
 
 def estimate_tokens_from_texts(texts: list[str]) -> int:
@@ -51,38 +125,82 @@ def estimate_tokens_from_texts(texts: list[str]) -> int:
     return max(1, total_chars // 4)
 
 
-async def _wait_for_quota(estimated_tokens: int) -> None:
+def get_quota_gate() -> QuotaGate:
+    global _openai_quota_gate
+    if _openai_quota_gate is None:
+        _openai_quota_gate = QuotaGate()
+    return _openai_quota_gate
+
+
+async def _wait_for_quota(estimated_tokens: int) -> QuotaTicket:
     rpm_limit = int(os.getenv("OPENAI_RPM_LIMIT", "60"))
     tpm_limit = int(os.getenv("OPENAI_TPM_LIMIT", "20000"))
-    now = time.monotonic()
-    async with _openai_window_lock:
-        while _openai_request_window and now - _openai_request_window[0] > 60:
-            _openai_request_window.popleft()
-        while _openai_token_window and now - _openai_token_window[0][0] > 60:
-            _openai_token_window.popleft()
-        req_count = len(_openai_request_window)
-        token_count = sum(tokens for _, tokens in _openai_token_window)
-        if req_count >= rpm_limit or token_count + estimated_tokens > tpm_limit:
-            oldest_req = _openai_request_window[0] if _openai_request_window else now
-            oldest_tok = _openai_token_window[0][0] if _openai_token_window else now
-            wait_s = max(0.0, 60 - min(now - oldest_req, now - oldest_tok))
-            await asyncio.sleep(wait_s + 0.05)
-            return await _wait_for_quota(estimated_tokens)
-        _openai_request_window.append(now)
-        _openai_token_window.append((now, estimated_tokens))
-
-
-async def openai_request_with_retries(coro_factory, estimated_tokens: int = 0):
+    return await get_quota_gate().acquire(estimated_tokens, rpm_limit, tpm_limit)
+
+
+async def _acquire_quota(estimated_tokens: int, lane: str) -> tuple[Optional[str], Optional[QuotaTicket]]:
+    """Returns the Redis lease or the local ticket, whichever admitted the call."""
+    if distributed_limiter_enabled():
+        try:
+            return await acquire_distributed_quota(estimated_tokens, lane), None
+        except Exception:
+            note_local_fallback()
+    return None, await _wait_for_quota(estimated_tokens)
+
+
+async def _reconcile_usage(ticket: Optional[QuotaTicket], estimated_tokens: int, response) -> None:
+    actual_tokens = response_token_usage(response)
+    if actual_tokens is None:
+        return
+    if ticket is not None:
+        get_quota_gate().reconcile(ticket, actual_tokens)
+        return
+    await reconcile_distributed_tokens(actual_tokens - estimated_tokens)
+
+
+async def openai_request_with_retries(
+    coro_factory,
+    estimated_tokens: int = 0,
+    lane: str = "chat",
+    user_id: Optional[str] = None,
+    model: Optional[str] = None,
+    work_units: Optional[float] = None,
+):
+    """Run an OpenAI call through the scheduler, rate limits and 429 retries.
+
+    ``lane`` is ``interactive`` (a user is waiting, e.g. ASR), ``chat`` or
+    ``batch`` (bulk TTS); ``user_id`` spreads slots fairly between users.
+    ``model`` picks the scheduler whose concurrency adapts to that model's
+    latency and 429s. ``work_units`` is the payload size the latency is
+    compared against (defaults to ``estimated_tokens``).
+    """
+    lane = normalize_lane(lane)
+    adaptive = adaptive_concurrency_enabled()
     max_retries = int(os.getenv("OPENAI_MAX_RETRIES", "5"))
     base_delay = float(os.getenv("OPENAI_RETRY_BASE_DELAY", "0.8"))
     max_delay = float(os.getenv("OPENAI_RETRY_MAX_DELAY", "10"))
     attempt = 0
     while True:
         try:
-            async with get_openai_semaphore():
-                await apply_openai_rate_limit()
-                await _wait_for_quota(max(0, estimated_tokens))
-                return await coro_factory()
+            async with get_openai_scheduler(model).slot(lane, user_id):
+                if not adaptive:
+                    # Fixed spacing only when concurrency is not adapting.
+                    await apply_openai_rate_limit()
+                lease_id, ticket = await _acquire_quota(max(0, estimated_tokens), lane)
+                token = _current_openai_model.set(model or "default")
+                started = time.monotonic()
+                try:
+                    response = await coro_factory()
+                finally:
+                    _current_openai_model.reset(token)
+                    await release_distributed_quota(lease_id)
+                _record_outcome(
+                    model,
+                    latency_ms=(time.monotonic() - started) * 1000,
+                    work_units=work_units if work_units is not None else max(1, estimated_tokens),
+                )
+                await _reconcile_usage(ticket, max(0, estimated_tokens), response)
+                return response
         except RateLimitError as exc:
             attempt += 1
             if attempt > max_retries:
@@ -90,6 +208,7 @@ async def openai_request_with_retries(coro_factory, estimated_tokens: int = 0):
             retry_after = None
             if hasattr(exc, "response") and exc.response is not None:
                 retry_after = exc.response.headers.get("retry-after")
+            _record_outcome(model, retry_after=float(retry_after) if retry_after else None, rate_limited=True)
             delay = float(retry_after) if retry_after else min(
                 max_delay, base_delay * (2 ** (attempt - 1))
             )
@@ -105,6 +224,7 @@ async def openai_request_with_retries(coro_factory, estimated_tokens: int = 0):
             retry_after = None
             if hasattr(exc, "response") and exc.response is not None:
                 retry_after = exc.response.headers.get("retry-after")
+            _record_outcome(model, retry_after=float(retry_after) if retry_after else None, rate_limited=True)
             delay = float(retry_after) if retry_after else min(
                 max_delay, base_delay * (2 ** (attempt - 1))
             )
@@ -112,16 +232,9 @@ async def openai_request_with_retries(coro_factory, estimated_tokens: int = 0):
             await asyncio.sleep(delay)
 
 
-def get_r2_client():
-    global _r2_client
-    if _r2_client is None:
-        try:
-            import boto3
-        except ImportError as exc:
-            raise HTTPException(
-                status_code=500,
-                detail="boto3 is required for Cloudflare R2 uploads but is not installed.",
-            ) from exc
+def get_r2_store() -> R2ObjectStore:
+    global _r2_store
+    if _r2_store is None:
         endpoint = os.getenv("CLOUDFLARE_R2_ENDPOINT")
         access_key = os.getenv("CLOUDFLARE_R2_ACCESS_KEY_ID") or os.getenv(
             "AWS_ACCESS_KEY_ID"
@@ -129,19 +242,26 @@ def get_r2_client():
         secret_key = os.getenv("CLOUDFLARE_R2_SECRET_ACCESS_KEY") or os.getenv(
             "AWS_SECRET_ACCESS_KEY"
         )
+        bucket = os.getenv("CLOUDFLARE_R2_BUCKET")
         if not endpoint or not access_key or not secret_key:
             raise HTTPException(
                 status_code=500,
                 detail="Missing Cloudflare R2 credentials in environment variables.",
             )
-        _r2_client = boto3.client(
-            "s3",
-            endpoint_url=endpoint,
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            region_name=os.getenv("CLOUDFLARE_R2_REGION", "auto"),
-        )
-    return _r2_client
+        if not bucket:
+            raise HTTPException(
+                status_code=500,
+                detail="Missing CLOUDFLARE_R2_BUCKET environment variable.",
+            )
+        _r2_store = R2ObjectStore.from_env()
+    return _r2_store
+
+
+async def close_r2_store() -> None:
+    global _r2_store
+    if _r2_store is not None:
+        await _r2_store.aclose()
+    _r2_store = None
 
 
 def build_public_r2_url(bucket: str, key: str) -> str:
@@ -1,15 +1,17 @@
 import asyncio
+import logging
 import os
-from typing import List, Optional
+from collections import deque
+from typing import Awaitable, Callable, List, Optional
 
 from bson import ObjectId
 from fastapi import HTTPException
 
-from controller.script_generation.audio import generate_audio_url
+from controller.script_generation.audio import delete_audio_objects, generate_audio_url
 from controller.script_generation.clients import (
-    apply_openai_rate_limit,
+    estimate_tokens_from_texts,
     get_openai_client,
-    get_openai_semaphore,
+    openai_request_with_retries,
 )
 from controller.script_generation.parsing import (
     is_strictly_alternating,
@@ -32,8 +34,10 @@ from repositories.user_repo import get_user
 from schemas.imports import AIGeneratedTurns, FluencyScript, Turn
 from schemas.user_schema import UserPersonalProfilingData
 
+logger = logging.getLogger(__name__)
 
-async def generate_script(user_id: str, scenario_name: str) -> FluencyScript:
+
+async def build_script_config(user_id: str, scenario_name: str) -> ScriptConfig:
     if not ObjectId.is_valid(user_id):
         raise HTTPException(status_code=400, detail="Invalid user ID format")
 
@@ -65,7 +69,7 @@ async def generate_script(user_id: str, scenario_name: str) -> FluencyScript:
     locale = os.getenv("USER_LOCALE", "en-US")
     scenario_context = default_scenario_context(scenario_name)
     end_state = default_end_state(scenario_name)
-    config = ScriptConfig(
+    return ScriptConfig(
         user_name=user_name,
         coach_name=coach_name,
         locale=locale,
@@ -81,6 +85,16 @@ async def generate_script(user_id: str, scenario_name: str) -> FluencyScript:
         end_state=end_state,
     )
 
+
+async def generate_script_turns(
+    user_id: str,
+    scenario_name: str,
+    config: Optional[ScriptConfig] = None,
+) -> List[AIGeneratedTurns]:
+    if config is None:
+        config = await build_script_config(user_id, scenario_name)
+    target_turns = config.target_turns
+
     system_prompt = build_system_prompt(config)
     user_prompt = build_user_prompt(config)
 
@@ -116,9 +130,11 @@ async def generate_script(user_id: str, scenario_name: str) -> FluencyScript:
     }
 
     async def request_script() -> str:
-        async with get_openai_semaphore():
-            await apply_openai_rate_limit()
-            response = await client.chat.completions.create(
+        # Prompt plus roughly the same again for the generated turns; the
+        # limiter corrects this with the reported usage afterwards.
+        estimated_tokens = 2 * estimate_tokens_from_texts([system_prompt, user_prompt])
+        response = await openai_request_with_retries(
+            lambda: client.chat.completions.create(
                 model=model_name,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -126,7 +142,12 @@ async def generate_script(user_id: str, scenario_name: str) -> FluencyScript:
                 ],
                 temperature=0.6,
                 response_format=response_format,
-            )
+            ), # pyright: ignore[reportUnknownLambdaType]
+            estimated_tokens=estimated_tokens,
+            lane="chat",
+            user_id=user_id,
+            model=model_name,
+        )
         return (response.choices[0].message.content or "").strip()
 
     def validate_or_raise(raw_content: str) -> List[AIGeneratedTurns]:
@@ -150,31 +171,74 @@ async def generate_script(user_id: str, scenario_name: str) -> FluencyScript:
             status_code=500,
             detail=f"Failed to generate a valid script. Output snippet: {snippet}",
         ) from exc
+    return turns
+
 
+async def synthesize_script_audio(
+    turns: List[AIGeneratedTurns],
+    user_id: str,
+    scenario_name: str,
+    on_turn_ready: Optional[Callable[[Turn], Awaitable[None]]] = None,
+) -> List[Turn]:
+    client = get_openai_client()
     ai_voice = os.getenv("OPENAI_TTS_VOICE_AI", "alloy")
     user_voice = os.getenv("OPENAI_TTS_VOICE_USER", "nova")
     key_prefix = f"scripts/{user_id}/{scenario_name}"
-    audio_concurrency = int(os.getenv("AUDIO_GEN_CONCURRENCY", "20"))
-    semaphore = asyncio.Semaphore(audio_concurrency)
+    audio_concurrency = max(1, int(os.getenv("AUDIO_GEN_CONCURRENCY", "20")))
+    produced: List[str] = []
 
     async def build_turn(index: int, turn: AIGeneratedTurns) -> Turn:
         voice = ai_voice if turn.role == "ai" else user_voice
-        async with semaphore:
-            audio_url = await generate_audio_url(
-                client=client,
-                text=turn.text,
-                voice=voice,
-                key_prefix=key_prefix,
-            )
-        return Turn(
+        audio_url = await generate_audio_url(
+            client=client,
+            text=turn.text,
+            voice=voice,
+            key_prefix=key_prefix,
+            user_id=user_id,
+        )
+        produced.append(audio_url)
+        script_turn = Turn(
             index=index,
             role=turn.role,
             text=turn.text,
             model_audio_url=audio_url,
         )
+        if on_turn_ready is not None:
+            await on_turn_ready(script_turn)
+        return script_turn
+
+    # Workers always take the earliest outstanding turn, so turn 0 is
+    # synthesized first and playback can start before the tail is done.
+    pending = deque(range(len(turns)))
+    script_turns: List[Optional[Turn]] = [None] * len(turns)
+
+    async def worker() -> None:
+        while pending:
+            index = pending.popleft()
+            script_turns[index] = await build_turn(index, turns[index])
+
+    workers = [
+        asyncio.create_task(worker())
+        for _ in range(min(audio_concurrency, len(turns)))
+    ]
+    try:
+        await asyncio.gather(*workers)
+    except BaseException:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        # The script is discarded, so drop the clips (and shared clip
+        # references) it already took; callers clear any URLs they stored.
+        if produced:
+            try:
+                await delete_audio_objects(produced)
+            except Exception:
+                logger.warning("Failed to release %d clips of a failed script", len(produced), exc_info=True)
+        raise
+    return script_turns
 
-    script_turns = await asyncio.gather(
-        *[build_turn(i, turn) for i, turn in enumerate(turns)]
-    )
 
+async def generate_script(user_id: str, scenario_name: str) -> FluencyScript:
+    turns = await generate_script_turns(user_id, scenario_name)
+    script_turns = await synthesize_script_audio(turns, user_id, scenario_name)
     return FluencyScript(totalNumberOfTurns=len(script_turns), turns=script_turns)
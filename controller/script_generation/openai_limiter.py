@@ -0,0 +1,232 @@
+import asyncio
+import logging
+import os
+import random
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from core.redis_cache import cache_db
+
+logger = logging.getLogger(__name__)
+
+LIMITER_PERIOD_MS = 60_000
+
+# GCRA for RPM and TPM plus a lease set for global concurrency, checked and
+# committed atomically so every web and Celery worker shares one budget.
+# Time comes from the Redis server so worker clocks do not matter.
+_ACQUIRE_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local rpm = tonumber(ARGV[1])
+local tpm = tonumber(ARGV[2])
+local tokens = tonumber(ARGV[3])
+local max_inflight = tonumber(ARGV[4])
+local lease_id = ARGV[5]
+local lease_ttl = tonumber(ARGV[6])
+local period = tonumber(ARGV[7])
+-- Lower lanes may only use this share of each window, leaving headroom
+-- for interactive calls.
+local allowance = period * tonumber(ARGV[8])
+
+if max_inflight > 0 then
+  redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', now)
+  if redis.call('ZCARD', KEYS[3]) >= max_inflight then
+    return {0, -1}
+  end
+end
+
+local wait = 0
+local rpm_tat = nil
+local tpm_tat = nil
+if rpm > 0 then
+  local tat = tonumber(redis.call('GET', KEYS[1])) or now
+  rpm_tat = math.max(tat, now) + period / rpm
+  wait = math.max(wait, rpm_tat - now - allowance)
+end
+if tpm > 0 and tokens > 0 then
+  local tat = tonumber(redis.call('GET', KEYS[2])) or now
+  tpm_tat = math.max(tat, now) + math.min(tokens, tpm) * period / tpm
+  wait = math.max(wait, tpm_tat - now - allowance)
+end
+if wait > 0 then
+  return {0, math.ceil(wait)}
+end
+
+if rpm_tat then
+  redis.call('SET', KEYS[1], tostring(rpm_tat), 'PX', math.ceil(rpm_tat - now) + 1)
+end
+if tpm_tat then
+  redis.call('SET', KEYS[2], tostring(tpm_tat), 'PX', math.ceil(tpm_tat - now) + 1)
+end
+if max_inflight > 0 then
+  redis.call('ZADD', KEYS[3], now + lease_ttl, lease_id)
+  redis.call('PEXPIRE', KEYS[3], lease_ttl)
+end
+return {1, 0}
+"""
+
+# Moves the TPM schedule by the difference between estimated and reported
+# tokens; refunds never push it behind the current time.
+_RECONCILE_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local tpm = tonumber(ARGV[1])
+local delta = tonumber(ARGV[2])
+local period = tonumber(ARGV[3])
+if tpm <= 0 or delta == 0 then
+  return 0
+end
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+tat = math.max(tat + delta * period / tpm, now)
+if tat > now then
+  redis.call('SET', KEYS[1], tostring(tat), 'PX', math.ceil(tat - now) + 1)
+else
+  redis.call('DEL', KEYS[1])
+end
+return 1
+"""
+
+_acquire_script = cache_db.register_script(_ACQUIRE_LUA)
+_reconcile_script = cache_db.register_script(_RECONCILE_LUA)
+
+_metrics: Dict[str, Any] = {
+    "admitted": 0,
+    "throttled": 0,
+    "concurrency_waits": 0,
+    "wait_ms_total": 0.0,
+    "wait_ms_max": 0.0,
+    "reconciled_tokens": 0,
+    "redis_errors": 0,
+    "local_fallbacks": 0,
+}
+
+
+def distributed_limiter_enabled() -> bool:
+    return os.getenv("OPENAI_RATE_LIMITER", "redis").strip().lower() == "redis"
+
+
+def _limiter_keys() -> list[str]:
+    # One hash tag so the script's keys land in the same cluster slot.
+    scope = os.getenv("OPENAI_LIMITER_SCOPE", "default")
+    base = f"{{openai_limiter:{scope}}}"
+    return [f"{base}:rpm", f"{base}:tpm", f"{base}:inflight"]
+
+
+def _lane_allowance(lane: str, max_inflight: int) -> tuple[float, int]:
+    """Share of the RPM/TPM window and of the global in-flight cap ``lane`` may use."""
+    if lane == "interactive":
+        return 1.0, max_inflight
+    default_fraction = "0.9" if lane == "chat" else "0.75"
+    fraction = float(os.getenv(f"OPENAI_QUOTA_FRACTION_{lane.upper()}", default_fraction))
+    reserved = int(os.getenv("OPENAI_INTERACTIVE_RESERVED_SLOTS", "1"))
+    if max_inflight > 0:
+        max_inflight = max(1, max_inflight - reserved)
+    return min(1.0, max(0.05, fraction)), max_inflight
+
+
+def _limits() -> tuple[int, int, int]:
+    return (
+        int(os.getenv("OPENAI_RPM_LIMIT", "60")),
+        int(os.getenv("OPENAI_TPM_LIMIT", "20000")),
+        int(os.getenv("OPENAI_GLOBAL_MAX_CONCURRENCY", "8")),
+    )
+
+
+async def acquire_distributed_quota(estimated_tokens: int, lane: str = "chat") -> str:
+    """Block until the shared RPM/TPM/concurrency budget admits this call.
+
+    Returns a lease id for ``release_distributed_quota``. Redis errors are
+    raised so the caller can fall back to the per-process limiter.
+    """
+    rpm_limit, tpm_limit, max_inflight = _limits()
+    lease_ttl_ms = int(os.getenv("OPENAI_LEASE_TTL_MS", "120000"))
+    lease_id = uuid.uuid4().hex
+    keys = _limiter_keys()
+    fraction, max_inflight = _lane_allowance(lane, max_inflight)
+    args = [
+        rpm_limit,
+        tpm_limit,
+        max(0, estimated_tokens),
+        max_inflight,
+        lease_id,
+        lease_ttl_ms,
+        LIMITER_PERIOD_MS,
+        fraction,
+    ]
+    started = time.monotonic()
+    while True:
+        try:
+            allowed, wait_ms = await asyncio.to_thread(_acquire_script, keys=keys, args=args)
+        except Exception:
+            _metrics["redis_errors"] += 1
+            raise
+        if int(allowed):
+            waited_ms = (time.monotonic() - started) * 1000
+            _metrics["admitted"] += 1
+            _metrics["wait_ms_total"] += waited_ms
+            _metrics["wait_ms_max"] = max(_metrics["wait_ms_max"], waited_ms)
+            return lease_id
+        wait_ms = int(wait_ms)
+        if wait_ms < 0:
+            # Concurrency cap: leases free up on their own schedule, so poll.
+            _metrics["concurrency_waits"] += 1
+            delay = random.uniform(0.02, 0.1)
+        else:
+            _metrics["throttled"] += 1
+            delay = min(wait_ms, 1000) / 1000 + random.uniform(0, 0.05)
+        await asyncio.sleep(delay)
+
+
+async def release_distributed_quota(lease_id: Optional[str]) -> None:
+    if not lease_id:
+        return
+    try:
+        await asyncio.to_thread(cache_db.zrem, _limiter_keys()[2], lease_id)
+    except Exception:
+        # The lease expires on its own after OPENAI_LEASE_TTL_MS.
+        _metrics["redis_errors"] += 1
+
+
+async def reconcile_distributed_tokens(delta_tokens: int) -> None:
+    if not delta_tokens:
+        return
+    _, tpm_limit, _ = _limits()
+    try:
+        await asyncio.to_thread(
+            _reconcile_script,
+            keys=[_limiter_keys()[1]],
+            args=[tpm_limit, delta_tokens, LIMITER_PERIOD_MS],
+        )
+        _metrics["reconciled_tokens"] += delta_tokens
+    except Exception:
+        _metrics["redis_errors"] += 1
+
+
+def note_local_fallback() -> None:
+    if not _metrics["local_fallbacks"]:
+        logger.warning("Redis OpenAI limiter unavailable, using per-process limits")
+    _metrics["local_fallbacks"] += 1
+
+
+def response_token_usage(response: Any) -> Optional[int]:
+    usage = getattr(response, "usage", None)
+    if usage is None and isinstance(response, dict):
+        usage = response.get("usage")
+    if usage is None:
+        return None
+    total = usage.get("total_tokens") if isinstance(usage, dict) else getattr(usage, "total_tokens", None)
+    return int(total) if isinstance(total, (int, float)) else None
+
+
+def openai_limiter_metrics() -> Dict[str, Any]:
+    admitted = _metrics["admitted"]
+    rpm_limit, tpm_limit, max_inflight = _limits()
+    return {
+        "backend": "redis" if distributed_limiter_enabled() else "local",
+        "rpm_limit": rpm_limit,
+        "tpm_limit": tpm_limit,
+        "max_inflight": max_inflight,
+        **_metrics,
+        "wait_ms_avg": _metrics["wait_ms_total"] / admitted if admitted else 0.0,
+    }
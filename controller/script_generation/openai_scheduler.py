@@ -0,0 +1,170 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from fastapi import HTTPException
+
+# Highest priority first.
+OPENAI_LANES = ("interactive", "chat", "batch")
+_DEFAULT_QUEUE_BUDGET_MS = {"interactive": 20000, "chat": 60000, "batch": 0}
+
+
+def lane_queue_budget_ms(lane: str) -> int:
+    """How long a call in ``lane`` may wait for a slot before it is shed; 0 waits forever."""
+    return int(os.getenv(f"OPENAI_QUEUE_BUDGET_MS_{lane.upper()}", str(_DEFAULT_QUEUE_BUDGET_MS[lane])))
+
+
+def normalize_lane(lane: Optional[str]) -> str:
+    return lane if lane in OPENAI_LANES else "chat"
+
+
+@dataclass
+class _Waiter:
+    future: "asyncio.Future[None]"
+    lane: str
+    user_key: str
+    enqueued_at: float
+
+
+class OpenAIScheduler:
+    """Per-process admission for OpenAI calls to one model.
+
+    A freed slot goes to the highest-priority lane with waiters; inside a lane,
+    users take turns so one user's batch cannot starve everyone else's calls.
+    """
+
+    def __init__(self, slots: int):
+        self.slots = max(1, slots)
+        self._in_use = 0
+        self._lanes: Dict[str, "OrderedDict[str, Deque[_Waiter]]"] = {
+            lane: OrderedDict() for lane in OPENAI_LANES
+        }
+        self._service_ms = 1000.0
+        self._metrics: Dict[str, Dict[str, Any]] = {
+            lane: {"admitted": 0, "shed": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0}
+            for lane in OPENAI_LANES
+        }
+
+    def _queued(self, lanes=OPENAI_LANES) -> int:
+        return sum(len(waiters) for lane in lanes for waiters in self._lanes[lane].values())
+
+    def _estimated_wait_ms(self, lane: str) -> float:
+        # Only lanes at or above this one are served before it.
+        ahead = self._queued(OPENAI_LANES[: OPENAI_LANES.index(lane) + 1])
+        return (ahead + 1) * self._service_ms / self.slots
+
+    def _shed(self, lane: str) -> HTTPException:
+        self._metrics[lane]["shed"] += 1
+        return HTTPException(status_code=503, detail="OpenAI queue is saturated, please retry.")
+
+    def _admitted(self, lane: str, enqueued_at: float) -> None:
+        wait_ms = (time.monotonic() - enqueued_at) * 1000
+        stats = self._metrics[lane]
+        stats["admitted"] += 1
+        stats["wait_ms_total"] += wait_ms
+        stats["wait_ms_max"] = max(stats["wait_ms_max"], wait_ms)
+
+    def _remove(self, waiter: _Waiter) -> None:
+        users = self._lanes[waiter.lane]
+        waiters = users.get(waiter.user_key)
+        if waiters is None:
+            return
+        try:
+            waiters.remove(waiter)
+        except ValueError:
+            return
+        if not waiters:
+            del users[waiter.user_key]
+
+    async def acquire(self, lane: str, user_key: str, budget_ms: Optional[int] = None) -> None:
+        lane = normalize_lane(lane)
+        enqueued_at = time.monotonic()
+        if self._in_use < self.slots and not self._queued():
+            self._in_use += 1
+            self._admitted(lane, enqueued_at)
+            return
+        if budget_ms is None:
+            budget_ms = lane_queue_budget_ms(lane)
+        if budget_ms > 0 and self._estimated_wait_ms(lane) > budget_ms:
+            raise self._shed(lane)
+
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), lane, user_key, enqueued_at)
+        self._lanes[lane].setdefault(user_key, deque()).append(waiter)
+        try:
+            if budget_ms > 0:
+                await asyncio.wait_for(waiter.future, timeout=budget_ms / 1000)
+            else:
+                await waiter.future
+        except asyncio.TimeoutError:
+            self._remove(waiter)
+            if not (waiter.future.done() and not waiter.future.cancelled()):
+                raise self._shed(lane) from None
+            # The slot was handed over just as the budget ran out; use it
+            # rather than shed the call and leak the slot.
+        except asyncio.CancelledError:
+            self._remove(waiter)
+            if waiter.future.done() and not waiter.future.cancelled():
+                # The slot was handed over just before cancellation.
+                self.release()
+            raise
+        self._admitted(lane, enqueued_at)
+
+    def _wake_next(self) -> bool:
+        for lane in OPENAI_LANES:
+            users = self._lanes[lane]
+            while users:
+                user_key, waiters = users.popitem(last=False)
+                waiter = waiters.popleft()
+                if waiters:
+                    # Back of the line for this user's next call.
+                    users[user_key] = waiters
+                if not waiter.future.done():
+                    waiter.future.set_result(None)
+                    return True
+        return False
+
+    def set_slots(self, slots: int) -> None:
+        """Resize the pool; extra slots go to waiters now, removed ones as calls finish."""
+        self.slots = max(1, slots)
+        while self._in_use < self.slots and self._wake_next():
+            self._in_use += 1
+
+    def release(self, service_ms: Optional[float] = None) -> None:
+        if service_ms is not None:
+            self._service_ms = 0.8 * self._service_ms + 0.2 * service_ms
+        if self._in_use > self.slots or not self._wake_next():
+            self._in_use = max(0, self._in_use - 1)
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        lane: str,
+        user_id: Optional[str] = None,
+        budget_ms: Optional[int] = None,
+    ) -> AsyncIterator[None]:
+        await self.acquire(lane, user_id or "anonymous", budget_ms)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release((time.monotonic() - started) * 1000)
+
+    def metrics(self) -> Dict[str, Any]:
+        lanes = {}
+        for lane, stats in self._metrics.items():
+            admitted = stats["admitted"]
+            lanes[lane] = {
+                **stats,
+                "queued": self._queued((lane,)),
+                "wait_ms_avg": stats["wait_ms_total"] / admitted if admitted else 0.0,
+            }
+        return {
+            "slots": self.slots,
+            "in_use": self._in_use,
+            "service_ms_ewma": self._service_ms,
+            "lanes": lanes,
+        }
@@ -0,0 +1,132 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+
+class QuotaTicket:
+    __slots__ = ("admitted_at", "tokens")
+
+    def __init__(self, admitted_at: float, tokens: int):
+        self.admitted_at = admitted_at
+        self.tokens = tokens
+
+
+class QuotaGate:
+    """Per-process sliding-window gate for OpenAI requests and tokens.
+
+    Each admission is one ticket in the window, so the request count is the
+    window length and the token total is kept as a running sum, so admission is O(1) amortised.
+    Waiters queue in FIFO order and only the head one sleeps on a timer; each
+    admission hands the turn to the next waiter, so a burst of callers costs
+    one wakeup per admission instead of a thundering herd per expiry.
+    """
+
+    def __init__(self, window_s: float = 60.0):
+        self.window_s = window_s
+        self._tickets: Deque[QuotaTicket] = deque()
+        self._token_total = 0
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+        self._capacity = asyncio.Event()
+        self._metrics: Dict[str, Any] = {
+            "admitted": 0,
+            "admitted_tokens": 0,
+            "queued_admissions": 0,
+            "max_queue_depth": 0,
+            "wait_ms_total": 0.0,
+            "wait_ms_max": 0.0,
+        }
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.window_s
+        while self._tickets and self._tickets[0].admitted_at <= cutoff:
+            self._token_total -= self._tickets.popleft().tokens
+
+    def _try_admit(self, now: float, tokens: int, rpm_limit: int, tpm_limit: int) -> Optional[QuotaTicket]:
+        self._expire(now)
+        if rpm_limit > 0 and len(self._tickets) >= rpm_limit:
+            return None
+        if tpm_limit > 0 and self._tickets and self._token_total + tokens > tpm_limit:
+            return None
+        ticket = QuotaTicket(now, tokens)
+        self._tickets.append(ticket)
+        self._token_total += tokens
+        return ticket
+
+    def _delay(self, now: float) -> float:
+        # Capacity only grows when the oldest entry leaves the window or a
+        # reconcile refunds tokens (which sets ``_capacity``).
+        oldest = self._tickets[0].admitted_at if self._tickets else now
+        return max(0.001, oldest + self.window_s - now)
+
+    def _admitted(self, ticket: QuotaTicket, started: float, queued: bool) -> QuotaTicket:
+        wait_ms = (time.monotonic() - started) * 1000
+        self._metrics["admitted"] += 1
+        self._metrics["admitted_tokens"] += ticket.tokens
+        self._metrics["wait_ms_total"] += wait_ms
+        self._metrics["wait_ms_max"] = max(self._metrics["wait_ms_max"], wait_ms)
+        if queued:
+            self._metrics["queued_admissions"] += 1
+        return ticket
+
+    async def acquire(self, tokens: int, rpm_limit: int, tpm_limit: int) -> QuotaTicket:
+        tokens = max(0, tokens)
+        if tpm_limit > 0:
+            # A single call larger than the window would otherwise never fit.
+            tokens = min(tokens, tpm_limit)
+        started = time.monotonic()
+        if not self._waiters:
+            ticket = self._try_admit(started, tokens, rpm_limit, tpm_limit)
+            if ticket is not None:
+                return self._admitted(ticket, started, queued=False)
+
+        turn: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        self._waiters.append(turn)
+        self._metrics["max_queue_depth"] = max(self._metrics["max_queue_depth"], len(self._waiters))
+        if len(self._waiters) == 1:
+            turn.set_result(None)
+        try:
+            await turn
+            while True:
+                now = time.monotonic()
+                ticket = self._try_admit(now, tokens, rpm_limit, tpm_limit)
+                if ticket is not None:
+                    break
+                self._capacity.clear()
+                try:
+                    await asyncio.wait_for(self._capacity.wait(), timeout=self._delay(now))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            was_head = bool(self._waiters) and self._waiters[0] is turn
+            if was_head:
+                self._waiters.popleft()
+            else:
+                self._waiters.remove(turn)
+            if was_head and self._waiters and not self._waiters[0].done():
+                self._waiters[0].set_result(None)
+        return self._admitted(ticket, started, queued=True)
+
+    def reconcile(self, ticket: QuotaTicket, actual_tokens: int) -> None:
+        """Replace the estimate on ``ticket`` with the tokens the API reported."""
+        actual_tokens = max(0, actual_tokens)
+        delta = actual_tokens - ticket.tokens
+        if not delta:
+            return
+        if self._tickets and ticket.admitted_at >= self._tickets[0].admitted_at:
+            # Still inside the window, so it counts towards the running total.
+            self._token_total += delta
+        ticket.tokens = actual_tokens
+        if delta < 0:
+            self._capacity.set()
+
+    def metrics(self) -> Dict[str, Any]:
+        self._expire(time.monotonic())
+        admitted = self._metrics["admitted"]
+        return {
+            **self._metrics,
+            "queue_depth": len(self._waiters),
+            "window_requests": len(self._tickets),
+            "window_tokens": self._token_total,
+            "wait_ms_avg": self._metrics["wait_ms_total"] / admitted if admitted else 0.0,
+        }
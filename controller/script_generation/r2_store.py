@@ -0,0 +1,502 @@
+import asyncio
+import base64
+import datetime
+import hashlib
+import hmac
+import os
+import random
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, BinaryIO, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import quote, urlparse
+
+import httpx
+
+EMPTY_SHA256 = hashlib.sha256(b"").hexdigest()
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+# S3 rejects multipart parts under 5 MiB except the last one.
+MIN_PART_BYTES = 5 * 1024 * 1024
+# DeleteObjects accepts at most this many keys per request.
+MAX_DELETE_KEYS = 1000
+
+
+class R2Error(Exception):
+    def __init__(self, status_code: int, code: str = "", message: str = ""):
+        super().__init__(f"R2 request failed ({status_code} {code}): {message}".strip())
+        self.status_code = status_code
+        self.code = code
+        self.message = message
+
+
+class R2NotFound(R2Error):
+    pass
+
+
+@dataclass
+class ObjectMeta:
+    key: str
+    size: int
+    etag: Optional[str]
+    content_type: Optional[str]
+    last_modified: Optional[str]
+
+
+@dataclass
+class DeleteFailure:
+    key: str
+    code: str
+    message: str
+
+
+@dataclass
+class DeleteResult:
+    deleted: List[str] = field(default_factory=list)
+    failed: List[DeleteFailure] = field(default_factory=list)
+    failed_prefixes: List[str] = field(default_factory=list)
+
+    @property
+    def failed_keys(self) -> List[str]:
+        return [failure.key for failure in self.failed]
+
+    def merge(self, other: "DeleteResult") -> "DeleteResult":
+        self.deleted.extend(other.deleted)
+        self.failed.extend(other.failed)
+        self.failed_prefixes.extend(other.failed_prefixes)
+        return self
+
+
+class R2ObjectStream:
+    """An open GET response; iterate ``iter_chunks`` once or call ``aclose``."""
+
+    def __init__(self, response: httpx.Response):
+        self._response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+
+    async def iter_chunks(self, chunk_size: int = 256 * 1024) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in self._response.aiter_bytes(chunk_size):
+                if chunk:
+                    yield chunk
+        finally:
+            await self._response.aclose()
+
+    async def read(self) -> bytes:
+        try:
+            return await self._response.aread()
+        finally:
+            await self._response.aclose()
+
+    async def aclose(self) -> None:
+        await self._response.aclose()
+
+
+def _xml_text(root: ET.Element, name: str) -> Optional[str]:
+    for element in root.iter():
+        if element.tag == name or element.tag.endswith("}" + name):
+            return element.text
+    return None
+
+
+def _xml_escape(value: str) -> str:
+    return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _local_name(element: ET.Element) -> str:
+    return element.tag.rsplit("}", 1)[-1]
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode("utf-8"), hashlib.sha256).digest()
+
+
+def _uri_encode(value: str, safe: str = "-_.~") -> str:
+    return quote(value, safe=safe)
+
+
+class R2ObjectStore:
+    """Async S3-compatible client for one R2 bucket, signed with SigV4 over httpx.
+
+    One pooled ``httpx.AsyncClient`` keeps connections alive across requests;
+    retryable failures (transport errors, 429, 5xx) are retried with jittered
+    backoff. Pass ``transport`` to run against an in-memory stand-in, or point
+    ``endpoint`` at MinIO for integration tests.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        access_key: str,
+        secret_key: str,
+        bucket: str,
+        region: str = "auto",
+        *,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        max_connections: int = 64,
+        max_keepalive_connections: int = 32,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 30.0,
+        max_retries: int = 3,
+        multipart_threshold: int = 8 * 1024 * 1024,
+        part_size: int = 8 * 1024 * 1024,
+        part_concurrency: int = 4,
+        delete_concurrency: int = 4,
+    ):
+        self.endpoint = endpoint.rstrip("/")
+        self.host = urlparse(self.endpoint).netloc
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.bucket = bucket
+        self.region = region
+        self.max_retries = max(0, max_retries)
+        self.multipart_threshold = multipart_threshold
+        self.part_size = max(MIN_PART_BYTES, part_size)
+        self.part_concurrency = max(1, part_concurrency)
+        self.delete_concurrency = max(1, delete_concurrency)
+        self._client = httpx.AsyncClient(
+            transport=transport,
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+        )
+
+    @classmethod
+    def from_env(cls, **overrides: Any) -> "R2ObjectStore":
+        settings = dict(
+            endpoint=os.getenv("CLOUDFLARE_R2_ENDPOINT", ""),
+            access_key=os.getenv("CLOUDFLARE_R2_ACCESS_KEY_ID") or os.getenv("AWS_ACCESS_KEY_ID", ""),
+            secret_key=os.getenv("CLOUDFLARE_R2_SECRET_ACCESS_KEY") or os.getenv("AWS_SECRET_ACCESS_KEY", ""),
+            bucket=os.getenv("CLOUDFLARE_R2_BUCKET", ""),
+            region=os.getenv("CLOUDFLARE_R2_REGION", "auto"),
+            max_connections=int(os.getenv("R2_MAX_CONNECTIONS", "64")),
+            max_keepalive_connections=int(os.getenv("R2_MAX_KEEPALIVE_CONNECTIONS", "32")),
+            keepalive_expiry=float(os.getenv("R2_KEEPALIVE_EXPIRY_S", "30")),
+            timeout=float(os.getenv("R2_TIMEOUT_S", "30")),
+            max_retries=int(os.getenv("R2_MAX_RETRIES", "3")),
+            multipart_threshold=int(os.getenv("R2_MULTIPART_THRESHOLD_BYTES", str(8 * 1024 * 1024))),
+            part_size=int(os.getenv("R2_MULTIPART_PART_BYTES", str(8 * 1024 * 1024))),
+            part_concurrency=int(os.getenv("R2_MULTIPART_CONCURRENCY", "4")),
+            delete_concurrency=int(os.getenv("R2_DELETE_CONCURRENCY", "4")),
+        )
+        settings.update(overrides)
+        return cls(**settings)
+
+    def object_path(self, key: str) -> str:
+        return f"/{self.bucket}/{_uri_encode(key, safe='/-_.~')}"
+
+    def _signing_key(self, datestamp: str) -> bytes:
+        key = _hmac(("AWS4" + self.secret_key).encode("utf-8"), datestamp)
+        for part in (self.region, "s3", "aws4_request"):
+            key = _hmac(key, part)
+        return key
+
+    def _signature(self, amz_date: str, canonical_request: str) -> Tuple[str, str]:
+        datestamp = amz_date[:8]
+        scope = f"{datestamp}/{self.region}/s3/aws4_request"
+        string_to_sign = "\n".join(
+            [
+                "AWS4-HMAC-SHA256",
+                amz_date,
+                scope,
+                hashlib.sha256(canonical_request.encode("utf-8")).hexdigest(),
+            ]
+        )
+        signature = hmac.new(
+            self._signing_key(datestamp), string_to_sign.encode("utf-8"), hashlib.sha256
+        ).hexdigest()
+        return scope, signature
+
+    def sign(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Mapping[str, str]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        payload_hash: str = EMPTY_SHA256,
+        now: Optional[datetime.datetime] = None,
+    ) -> Dict[str, str]:
+        """Return ``headers`` plus the SigV4 ``Authorization`` for this request."""
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        signed = {k.lower(): str(v).strip() for k, v in (headers or {}).items()}
+        signed.update({"host": self.host, "x-amz-date": amz_date, "x-amz-content-sha256": payload_hash})
+        signed_names = ";".join(sorted(signed))
+        canonical_headers = "".join(f"{name}:{signed[name]}\n" for name in sorted(signed))
+        canonical_query = "&".join(
+            f"{_uri_encode(k)}={_uri_encode(v)}" for k, v in sorted((params or {}).items())
+        )
+        canonical_request = "\n".join(
+            [method, path, canonical_query, canonical_headers, signed_names, payload_hash]
+        )
+        scope, signature = self._signature(amz_date, canonical_request)
+        signed["authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key}/{scope}, "
+            f"SignedHeaders={signed_names}, Signature={signature}"
+        )
+        return signed
+
+    def presign_get(
+        self,
+        key: str,
+        expires_in: int,
+        now: Optional[datetime.datetime] = None,
+    ) -> str:
+        """Query-string SigV4 URL for GET ``key``; only ``host`` is signed, so Range works."""
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        path = self.object_path(key)
+        query = {
+            "X-Amz-Algorithm": "AWS4-HMAC-SHA256",
+            "X-Amz-Credential": f"{self.access_key}/{amz_date[:8]}/{self.region}/s3/aws4_request",
+            "X-Amz-Date": amz_date,
+            "X-Amz-Expires": str(int(expires_in)),
+            "X-Amz-SignedHeaders": "host",
+        }
+        canonical_query = "&".join(f"{_uri_encode(k)}={_uri_encode(v)}" for k, v in sorted(query.items()))
+        canonical_request = "\n".join(
+            ["GET", path, canonical_query, f"host:{self.host}\n", "host", UNSIGNED_PAYLOAD]
+        )
+        _, signature = self._signature(amz_date, canonical_request)
+        return f"{self.endpoint}{path}?{canonical_query}&X-Amz-Signature={signature}"
+
+    async def _send(
+        self,
+        method: str,
+        key: Optional[str] = None,
+        *,
+        params: Optional[Mapping[str, str]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        content: bytes = b"",
+        stream: bool = False,
+        ok: Tuple[int, ...] = (200,),
+    ) -> httpx.Response:
+        path = self.object_path(key) if key is not None else f"/{self.bucket}"
+        payload_hash = hashlib.sha256(content).hexdigest() if content else EMPTY_SHA256
+        attempt = 0
+        while True:
+            signed = self.sign(method, path, params, headers, payload_hash)
+            request = self._client.build_request(
+                method,
+                self.endpoint + path,
+                params=params,
+                headers=signed,
+                content=content or None,
+            )
+            try:
+                response = await self._client.send(request, stream=stream)
+            except httpx.TransportError:
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                if response.status_code in ok:
+                    return response
+                if response.status_code not in _RETRY_STATUSES or attempt >= self.max_retries:
+                    await self._raise_for(response)
+                await response.aclose()
+            attempt += 1
+            await asyncio.sleep(min(2.0, 0.1 * 2 ** (attempt - 1)) + random.uniform(0, 0.05))
+
+    async def _raise_for(self, response: httpx.Response) -> None:
+        body = await response.aread()
+        await response.aclose()
+        code = message = ""
+        if body:
+            try:
+                root = ET.fromstring(body)
+                code = _xml_text(root, "Code") or ""
+                message = _xml_text(root, "Message") or ""
+            except ET.ParseError:
+                message = body[:200].decode("utf-8", "replace")
+        error_cls = R2NotFound if response.status_code == 404 else R2Error
+        raise error_cls(response.status_code, code, message)
+
+    async def put_object(self, key: str, data: bytes, content_type: str = "application/octet-stream") -> None:
+        await self._send("PUT", key, headers={"content-type": content_type}, content=data)
+
+    async def upload_fileobj(
+        self,
+        fileobj: BinaryIO,
+        key: str,
+        content_type: str = "application/octet-stream",
+    ) -> None:
+        """Upload from a file handle, switching to multipart above the threshold."""
+        first = await asyncio.to_thread(fileobj.read, self.multipart_threshold + 1)
+        if len(first) <= self.multipart_threshold:
+            await self.put_object(key, first, content_type)
+            return
+        await self._multipart_upload(fileobj, key, content_type, first)
+
+    async def _multipart_upload(self, fileobj: BinaryIO, key: str, content_type: str, head: bytes) -> None:
+        response = await self._send(
+            "POST", key, params={"uploads": ""}, headers={"content-type": content_type}
+        )
+        upload_id = _xml_text(ET.fromstring(response.content), "UploadId")
+        if not upload_id:
+            raise R2Error(response.status_code, "NoUploadId", "CreateMultipartUpload returned no UploadId")
+
+        semaphore = asyncio.Semaphore(self.part_concurrency)
+        etags: Dict[int, str] = {}
+
+        async def upload_part(number: int, data: bytes) -> None:
+            try:
+                part = await self._send(
+                    "PUT",
+                    key,
+                    params={"partNumber": str(number), "uploadId": upload_id},
+                    content=data,
+                )
+                etags[number] = part.headers.get("etag", "")
+            finally:
+                semaphore.release()
+
+        buffer = bytearray(head)
+        number = 0
+        tasks: List["asyncio.Task[None]"] = []
+        try:
+            eof = False
+            while buffer or not eof:
+                while len(buffer) < self.part_size and not eof:
+                    chunk = await asyncio.to_thread(fileobj.read, self.part_size)
+                    if not chunk:
+                        eof = True
+                    buffer.extend(chunk)
+                if not buffer:
+                    break
+                data, buffer = bytes(buffer[: self.part_size]), buffer[self.part_size :]
+                number += 1
+                # Bounded read-ahead: wait for a free slot before reading on.
+                await semaphore.acquire()
+                tasks.append(asyncio.create_task(upload_part(number, data)))
+            await asyncio.gather(*tasks)
+            parts = "".join(
+                f"<Part><PartNumber>{n}</PartNumber><ETag>{etags[n]}</ETag></Part>"
+                for n in sorted(etags)
+            )
+            body = f"<CompleteMultipartUpload>{parts}</CompleteMultipartUpload>".encode("utf-8")
+            completed = await self._send("POST", key, params={"uploadId": upload_id}, content=body)
+            # S3 can report a failed completion inside a 200 response.
+            if b"<Error>" in completed.content:
+                root = ET.fromstring(completed.content)
+                raise R2Error(200, _xml_text(root, "Code") or "", _xml_text(root, "Message") or "")
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                await self._send("DELETE", key, params={"uploadId": upload_id}, ok=(200, 204, 404))
+            except Exception:
+                pass
+            raise
+
+    async def head_object(self, key: str) -> ObjectMeta:
+        response = await self._send("HEAD", key)
+        return ObjectMeta(
+            key=key,
+            size=int(response.headers.get("content-length", "0")),
+            etag=response.headers.get("etag"),
+            content_type=response.headers.get("content-type"),
+            last_modified=response.headers.get("last-modified"),
+        )
+
+    async def get_object_stream(self, key: str, range_header: Optional[str] = None) -> R2ObjectStream:
+        headers = {"range": range_header} if range_header else None
+        response = await self._send("GET", key, headers=headers, stream=True, ok=(200, 206))
+        return R2ObjectStream(response)
+
+    async def get_object_bytes(self, key: str) -> bytes:
+        stream = await self.get_object_stream(key)
+        return await stream.read()
+
+    async def delete_object(self, key: str) -> None:
+        await self._send("DELETE", key, ok=(200, 204, 404))
+
+    async def _delete_batch(self, keys: List[str]) -> DeleteResult:
+        objects = "".join(f"<Object><Key>{_xml_escape(key)}</Key></Object>" for key in keys)
+        body = f"<Delete><Quiet>true</Quiet>{objects}</Delete>".encode("utf-8")
+        # DeleteObjects requires a body checksum.
+        headers = {
+            "content-md5": base64.b64encode(hashlib.md5(body).digest()).decode("ascii"),
+            "content-type": "application/xml",
+        }
+        try:
+            response = await self._send("POST", None, params={"delete": ""}, headers=headers, content=body)
+            root = ET.fromstring(response.content)
+        except (R2Error, httpx.HTTPError, ET.ParseError) as exc:
+            code = exc.code if isinstance(exc, R2Error) else type(exc).__name__
+            return DeleteResult(failed=[DeleteFailure(key, code, str(exc)) for key in keys])
+
+        failed = []
+        for element in root:
+            if _local_name(element) != "Error":
+                continue
+            key = _xml_text(element, "Key") or ""
+            failed.append(DeleteFailure(key, _xml_text(element, "Code") or "", _xml_text(element, "Message") or ""))
+        failed_keys = {failure.key for failure in failed}
+        # Quiet mode only lists errors; everything else was deleted.
+        return DeleteResult(deleted=[key for key in keys if key not in failed_keys], failed=failed)
+
+    async def delete_objects(self, keys: List[str]) -> DeleteResult:
+        """Delete ``keys`` with batched DeleteObjects calls, several batches at a time.
+
+        Never raises for per-key or per-batch failures; they are returned in
+        ``DeleteResult.failed`` so the caller can retry just those keys.
+        """
+        unique = list(dict.fromkeys(key for key in keys if key))
+        batches = [unique[i : i + MAX_DELETE_KEYS] for i in range(0, len(unique), MAX_DELETE_KEYS)]
+        semaphore = asyncio.Semaphore(self.delete_concurrency)
+
+        async def run(batch: List[str]) -> DeleteResult:
+            async with semaphore:
+                return await self._delete_batch(batch)
+
+        result = DeleteResult()
+        for batch_result in await asyncio.gather(*(run(batch) for batch in batches)):
+            result.merge(batch_result)
+        return result
+
+    async def list_keys(self, prefix: str, page_size: int = MAX_DELETE_KEYS) -> AsyncIterator[List[str]]:
+        """Yield the keys under ``prefix`` one ListObjectsV2 page at a time."""
+        token = None
+        while True:
+            params = {"list-type": "2", "prefix": prefix, "max-keys": str(page_size)}
+            if token:
+                params["continuation-token"] = token
+            response = await self._send("GET", None, params=params)
+            root = ET.fromstring(response.content)
+            keys = [
+                _xml_text(element, "Key") or ""
+                for element in root
+                if _local_name(element) == "Contents"
+            ]
+            if keys:
+                yield keys
+            token = _xml_text(root, "NextContinuationToken")
+            if (_xml_text(root, "IsTruncated") or "").lower() != "true" or not token:
+                return
+
+    async def purge_prefix(self, prefix: str) -> DeleteResult:
+        """Delete every object under ``prefix``; deletion of one page overlaps listing the next."""
+        if not prefix:
+            raise ValueError("Refusing to purge the whole bucket")
+        result = DeleteResult()
+        pending: List["asyncio.Task[DeleteResult]"] = []
+        try:
+            async for keys in self.list_keys(prefix):
+                pending.append(asyncio.create_task(self.delete_objects(keys)))
+                if len(pending) >= self.delete_concurrency:
+                    result.merge(await pending.pop(0))
+            for task in pending:
+                result.merge(await task)
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            raise
+        return result
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
@@ -3,7 +3,8 @@ from bson import ObjectId
 
 from core.redis_cache import cache_db
 from core.scheduler import scheduler
-from repositories.session import delete_session, get_session
+from repositories.session import get_session
+from schemas.session import SessionStatus
 
 
 async def cleanup_incomplete_session(session_id: str, user_id: str, date_created: int) -> None:
@@ -22,14 +23,25 @@ async def cleanup_incomplete_session(session_id: str, user_id: str, date_created
         script = getattr(session, "script", None)
         turns = getattr(script, "turns", None) if script else None
         if not turns:
+            # Background generation failed, or never wrote a script within the hour.
+            if session.status in (SessionStatus.failed, SessionStatus.generating):
+                await _delete_abandoned_session(session_id, user_id)
             return
         all_scores_null = all(getattr(turn, "score", None) is None for turn in turns)
         if all_scores_null:
-            await delete_session({"_id": ObjectId(session_id), "userId": user_id})
+            await _delete_abandoned_session(session_id, user_id)
     except Exception:
         return
 
 
+async def _delete_abandoned_session(session_id: str, user_id: str) -> None:
+    # remove_session also releases the turns' audio, including their
+    # references on shared TTS clips, which would otherwise never reach zero.
+    from services.session_service import remove_session
+
+    await remove_session(session_id, user_id)
+
+
 def schedule_cleanup_incomplete_session(session_id: str, user_id: str, date_created: int) -> None:
     if not session_id or not user_id or not date_created:
         return
@@ -1,4 +1,7 @@
+import logging
 import os
+from typing import Any, Dict, List, Optional
+
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -147,3 +150,117 @@ elif DB_TYPE == "mongodb":
 
 else:
     raise ValueError("Unsupported DB_TYPE. Must be either 'sqlite' or 'mongodb'.")
+
+
+logger = logging.getLogger(__name__)
+
+# Case-insensitive comparison for emails; queries must pass the same collation
+# to use the index.
+EMAIL_COLLATION = {"locale": "en", "strength": 2}
+
+
+def _index(keys, name: str, **options) -> Dict[str, Any]:
+    return {"keys": keys if isinstance(keys, list) else [(keys, 1)], "name": name, **options}
+
+
+# Every index the app relies on, per collection, matched to the queries in
+# repositories/. Created once at startup by ensure_indexes.
+INDEXES: Dict[str, List[Dict[str, Any]]] = {
+    # List endpoints page by keyset over (sort key desc, _id desc); see core/pagination.py.
+    "sessions": [
+        _index([("userId", 1), ("last_updated", -1), ("_id", -1)], "user_last_updated_idx"),
+        _index([("userId", 1), ("scenario", 1), ("last_updated", -1), ("_id", -1)], "user_scenario_last_updated_idx"),
+    ],
+    "users": [
+        _index("email", "email_idx"),
+        _index("email", "email_ci_idx", collation=EMAIL_COLLATION),
+        _index([("date_created", -1), ("_id", -1)], "date_created_idx"),
+    ],
+    "admins": [
+        _index("email", "email_idx"),
+        _index([("date_created", -1), ("_id", -1)], "date_created_idx"),
+    ],
+    # No TTL: refresh (get_access_tokens_no_date_check) still needs the
+    # document of an access token past its 10 days.
+    "accessToken": [
+        _index("userId", "user_id_idx"),
+    ],
+    "refreshToken": [
+        _index("userId", "user_id_idx"),
+    ],
+    "reset_tokens": [
+        _index("token", "token_idx"),
+        # Kept a day past expiry so a late click still reads "expired".
+        _index("expires_at", "expires_at_ttl", expireAfterSeconds=86400),
+    ],
+    "notification_devices": [
+        _index([("userId", 1), ("device_id", 1)], "uniq_user_device", unique=True),
+    ],
+    "coaching_tips": [
+        _index([("session_id", 1), ("user_id", 1)], "uniq_session_user", unique=True),
+        _index([("user_id", 1), ("created_at", -1), ("_id", -1)], "user_created_at_id_idx"),
+    ],
+    "tts_audio": [
+        _index("key", "uniq_key", unique=True),
+    ],
+    "turn_analyses": [
+        _index([("session_id", 1), ("turn_index", 1)], "uniq_session_turn", unique=True),
+        _index("user_id", "user_id_idx"),
+    ],
+}
+
+_index_report: Optional[Dict[str, Any]] = None
+
+
+async def ensure_indexes(collections: Optional[List[str]] = None) -> Dict[str, List[str]]:
+    """Create the declared indexes; returns the failures per collection.
+
+    A failing collection (e.g. duplicates blocking a unique index) is logged
+    and skipped so the others are still created.
+    """
+    if DB_TYPE != "mongodb":
+        return {}
+    from pymongo import IndexModel
+    from pymongo.errors import PyMongoError
+
+    failed: Dict[str, List[str]] = {}
+    for collection in collections or list(INDEXES):
+        for spec in INDEXES[collection]:
+            options = {k: v for k, v in spec.items() if k != "keys"}
+            try:
+                await db[collection].create_indexes([IndexModel(spec["keys"], **options)])
+            except PyMongoError as exc:
+                logger.warning("Could not create index %s.%s: %s", collection, spec["name"], exc)
+                failed.setdefault(collection, []).append(spec["name"])
+    return failed
+
+
+async def index_report() -> Dict[str, Any]:
+    """Declared indexes that are missing, and existing ones with no recorded use.
+
+    Usage comes from ``$indexStats``, which counts since the mongod (or the
+    index) last started, so read "unused" against ``since``.
+    """
+    global _index_report
+    report: Dict[str, Any] = {"missing": {}, "unused": {}}
+    if DB_TYPE != "mongodb":
+        return report
+    for collection, specs in INDEXES.items():
+        stats = await db[collection].aggregate([{"$indexStats": {}}]).to_list(None)
+        present = {stat["name"] for stat in stats}
+        missing = [spec["name"] for spec in specs if spec["name"] not in present]
+        unused = [
+            {"name": stat["name"], "since": stat["accesses"]["since"].isoformat()}
+            for stat in stats
+            if stat["name"] != "_id_" and stat["accesses"]["ops"] == 0
+        ]
+        if missing:
+            report["missing"][collection] = missing
+        if unused:
+            report["unused"][collection] = unused
+    _index_report = report
+    return report
+
+
+def last_index_report() -> Optional[Dict[str, Any]]:
+    return _index_report
@@ -0,0 +1,76 @@
+"""Keyset (cursor) pagination over ``(sort_key desc, _id desc)``.
+
+A cursor is the sort key and ``_id`` of the last row a client received,
+base64 encoded so clients treat it as opaque. The next page starts strictly
+after it, which costs the same at any depth (no ``skip``), and rows inserted
+ahead of the cursor do not shift later pages the way they shift offsets.
+It is not a snapshot, though: a row whose sort key changes mid-pagination
+moves. With ``last_updated`` as the key, a session updated (e.g. scored)
+while a client pages jumps ahead of the cursor and is not returned on later
+pages. Rows whose sort key is missing sort last and are paged by ``_id``.
+"""
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(sort_key: str, value: Any, doc_id: Any) -> str:
+    raw = json.dumps({"k": sort_key, "v": value, "id": str(doc_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_key: str) -> Tuple[Any, ObjectId]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        value, doc_id = data["v"], ObjectId(data["id"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if data.get("k") != sort_key or not (value is None or isinstance(value, (int, float, str))):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return value, doc_id
+
+
+def page_size(limit: Optional[int], default: int = 100) -> int:
+    return max(1, min(limit or default, MAX_PAGE_SIZE))
+
+
+def keyset_sort(sort_key: str) -> List[Tuple[str, int]]:
+    return [(sort_key, -1), ("_id", -1)]
+
+
+def keyset_filter(filter_dict: Dict[str, Any], sort_key: str, cursor: Optional[str]) -> Dict[str, Any]:
+    """``filter_dict`` narrowed to the rows after ``cursor``."""
+    if not cursor:
+        return dict(filter_dict)
+    value, doc_id = decode_cursor(cursor, sort_key)
+    if value is None:
+        after = {sort_key: None, "_id": {"$lt": doc_id}}
+    else:
+        # Missing keys sort below every value, so "$lt" alone would skip them.
+        after = {
+            "$or": [
+                {sort_key: {"$lt": value}},
+                {sort_key: None},
+                {sort_key: value, "_id": {"$lt": doc_id}},
+            ]
+        }
+    return {"$and": [filter_dict, after]} if filter_dict else after
+
+
+def next_cursor(docs: List[Dict[str, Any]], limit: int, sort_key: str, cursor_field: Optional[str] = None) -> Optional[str]:
+    """Trim the ``limit + 1`` fetched rows to ``limit``; cursor for the next page or ``None``.
+
+    ``cursor_field`` names where the raw sort key sits when a projection
+    reshapes it.
+    """
+    if len(docs) <= limit:
+        return None
+    del docs[limit:]
+    last = docs[-1]
+    return encode_cursor(sort_key, last.get(cursor_field or sort_key), last["_id"])
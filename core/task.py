@@ -1,7 +1,11 @@
  
 from controller.session import cleanup_incomplete_session
 from repositories.tokens_repo import delete_access_and_refresh_token_with_user_id
-from services.session_service import delete_sessions_for_user
+from services.session_service import (
+    delete_audio_with_retry,
+    delete_sessions_for_user,
+    generate_session_script,
+)
 from services.coaching_tips_service import delete_coaching_tips_for_user
 from repositories.device_state_repo import delete_device_states_for_user
 
@@ -11,7 +15,9 @@ ASYNC_TASK_REGISTRY = {
  
     "delete_tokens":delete_access_and_refresh_token_with_user_id,
     "cleanup_incomplete_session": cleanup_incomplete_session,
+    "generate_session_script": generate_session_script,
     "delete_user_sessions": delete_sessions_for_user,
+    "delete_audio_keys": delete_audio_with_retry,
     "delete_user_coaching_tips": delete_coaching_tips_for_user,
     "delete_user_device_states": delete_device_states_for_user
     
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, Request, HTTPException
+from fastapi import FastAPI, Request, HTTPException, Depends
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
@@ -21,6 +21,19 @@ from apscheduler.triggers.interval import IntervalTrigger
 from starlette.middleware.sessions import SessionMiddleware
 
 from security.encrypting_jwt import decode_jwt_token
+from security.auth import verify_admin_token
+from controller.grading.executor import (
+    grading_executor_metrics,
+    shutdown_grading_executor,
+    start_grading_executor,
+)
+from controller.grading.transcript_cache import transcript_cache_metrics
+from controller.script_generation.clients import close_r2_store, get_quota_gate, openai_scheduler_metrics
+from controller.script_generation.audio_disk_cache import audio_disk_cache_metrics
+from controller.script_generation.audio_proxy import object_meta_metrics
+from controller.script_generation.audio_urls import signed_url_metrics
+from controller.script_generation.openai_limiter import openai_limiter_metrics
+from core.database import ensure_indexes, index_report, last_index_report
 
 MONGO_URI = os.getenv("MONGO_URL")
 REDIS_URI = f"redis://{os.getenv('REDIS_HOST', '127.0.0.1')}:{os.getenv('REDIS_PORT', '6379')}/0"
@@ -45,9 +58,21 @@ async def lifespan(app:FastAPI):
     )
 
     scheduler.start()
+    start_grading_executor()
+    try:
+        failed = await ensure_indexes()
+        if failed:
+            print(f"Failed to create indexes: {failed}")
+        report = await index_report()
+        if report["missing"] or report["unused"]:
+            print(f"Mongo index report: {report}")
+    except Exception as exc:
+        print(f"Failed to ensure indexes: {exc}")
     try:
         yield
     finally:
+        shutdown_grading_executor()
+        await close_r2_store()
         scheduler.shutdown()
     
 
@@ -466,6 +491,29 @@ async def health_check():
         data=data  
     )
 
+# Admin only: the metrics include worker pids, cache paths and limiter state.
+@app.get(
+    "/health-metrics",
+    tags=["Health"],
+    summary="In-process runtime metrics for this worker",
+    dependencies=[Depends(verify_admin_token)],
+)
+async def runtime_metrics():
+    data = {
+        "pid": os.getpid(),
+        "grading_executor": grading_executor_metrics(),
+        "transcript_cache": transcript_cache_metrics(),
+        "openai_limiter": openai_limiter_metrics(),
+        "openai_scheduler": openai_scheduler_metrics(),
+        "openai_quota_gate": get_quota_gate().metrics(),
+        "signed_audio_urls": signed_url_metrics(),
+        "audio_object_meta": object_meta_metrics(),
+        "audio_disk_cache": audio_disk_cache_metrics(),
+        "mongo_indexes": last_index_report(),
+    }
+    return APIResponse(status_code=200, detail="Runtime metrics fetched", data=data)
+
+
 from api.v1.admin_route import router as v1_admin_route_router
 from api.v1.coaching_tips import router as v1_coaching_tips_router
 from api.v1.session import router as v1_session_router
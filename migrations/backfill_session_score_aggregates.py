@@ -0,0 +1,22 @@
+"""One-off: store average_score, completed, scored_user_turns and last_scored_at
+on sessions written before update_session maintained them.
+
+Safe to re-run; only sessions still missing the aggregates are touched, plus
+sessions without turns that an earlier run wrongly stored as completed.
+
+Run from the repository root:
+
+    python -m migrations.backfill_session_score_aggregates
+"""
+import asyncio
+
+from repositories.session import backfill_session_score_aggregates
+
+
+async def main() -> None:
+    updated = await backfill_session_score_aggregates()
+    print(f"backfilled score aggregates on {updated} sessions")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,28 @@
+"""One-off: drop the accessToken TTL index and the expires_at field it read.
+
+Refreshing with an expired access token needs the token document, which the
+TTL deleted 10 days after issue. Safe to re-run.
+
+Run from the repository root:
+
+    python -m migrations.drop_access_token_ttl
+"""
+import asyncio
+
+from pymongo.errors import OperationFailure
+
+from core.database import db
+
+
+async def main() -> None:
+    try:
+        await db.accessToken.drop_index("expires_at_ttl")
+        print("dropped accessToken.expires_at_ttl")
+    except OperationFailure:
+        print("accessToken.expires_at_ttl not present")
+    result = await db.accessToken.update_many({"expires_at": {"$exists": True}}, {"$unset": {"expires_at": ""}})
+    print(f"unset expires_at on {result.modified_count} access tokens")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,24 @@
+"""One-off: move speech analyses embedded in session turns into the
+turn_analyses collection, where update_session now writes them.
+
+Safe to re-run; analyses already in turn_analyses are never overwritten,
+and each session's embedded copies are unset once moved.
+
+Run from the repository root:
+
+    python -m migrations.move_speech_analysis
+"""
+import asyncio
+
+from core.database import ensure_indexes
+from repositories.turn_analysis import move_embedded_speech_analysis
+
+
+async def main() -> None:
+    await ensure_indexes(["turn_analyses"])
+    moved = await move_embedded_speech_analysis()
+    print(f"moved speech analysis out of {moved} sessions")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,8 +1,10 @@
 
+from bson import ObjectId
 from pymongo import ReturnDocument
 from core.database import db
 from fastapi import HTTPException,status
-from typing import List,Optional
+from typing import List,Optional,Tuple
+from core.pagination import keyset_filter, keyset_sort, next_cursor
 from schemas.admin_schema import AdminUpdate, AdminCreate, AdminOut
 import os
 from dotenv import load_dotenv
@@ -13,6 +15,15 @@ load_dotenv()
 SUPER_ADMIN_EMAIL=os.getenv("SUPER_ADMIN_EMAIL") 
 SUPER_ADMIN_PASSWORD=os.getenv("SUPER_ADMIN_PASSWORD")
 SUPER_ADMIN_HASHED_PASSWORD=hash_password(SUPER_ADMIN_PASSWORD)
+# The env-configured super admin has no document; this id stands in for it.
+SUPER_ADMIN_ID="656f7ac12b9d4f6c9e2b9f7d"
+
+
+def _listed_super_admin() -> AdminOut:
+    # Admin lists never carry password hashes, the super admin's included.
+    super_admin = AdminOut(_id=SUPER_ADMIN_ID,full_name="Super Admin",email=SUPER_ADMIN_EMAIL,password="")
+    super_admin.password = None
+    return super_admin
 
 
 async def create_admin(admin_data: AdminCreate) -> AdminOut:
@@ -33,8 +44,8 @@ async def get_admin(filter_dict: dict) -> Optional[AdminOut]:
                 filter_email = filter_dict.get("email",None)
                 filter_id = filter_dict.get("_id",None)
                 print(filter_id)
-                if filter_email==SUPER_ADMIN_EMAIL or str(filter_id)=="656f7ac12b9d4f6c9e2b9f7d" :
-                    return AdminOut(full_name="Super Admin",email=SUPER_ADMIN_EMAIL,password=SUPER_ADMIN_HASHED_PASSWORD,_id="656f7ac12b9d4f6c9e2b9f7d")
+                if filter_email==SUPER_ADMIN_EMAIL or str(filter_id)==SUPER_ADMIN_ID :
+                    return AdminOut(full_name="Super Admin",email=SUPER_ADMIN_EMAIL,password=SUPER_ADMIN_HASHED_PASSWORD,_id=SUPER_ADMIN_ID)
             except Exception as e:
                 print(e)
                 return None 
@@ -48,12 +59,22 @@ async def get_admin(filter_dict: dict) -> Optional[AdminOut]:
             detail=f"An error occurred while fetching admin: {str(e)}"
         )
     
+async def admin_exists(admin_id: str) -> bool:
+    """Existence check that reads only the ``_id``; the env-configured super admin always exists."""
+    if str(admin_id) == SUPER_ADMIN_ID:
+        return True
+    if not ObjectId.is_valid(admin_id):
+        return False
+    return await db.admins.find_one({"_id": ObjectId(admin_id)}, {"_id": 1}) is not None
+
+
 async def get_admins(filter_dict: dict = {},start=0,stop=100) -> List[AdminOut]:
     try:
         if filter_dict is None:
             filter_dict = {}
 
         cursor = (db.admins.find(filter_dict)
+        .sort(keyset_sort("date_created"))
         .skip(start)
         .limit(stop - start)
         )
@@ -63,8 +84,7 @@ async def get_admins(filter_dict: dict = {},start=0,stop=100) -> List[AdminOut]:
             adminObj =AdminOut(**doc)
             adminObj.password=None
             admin_list.append(adminObj)
-        super_admin= AdminOut(_id="656f7ac12b9d4f6c9e2b9f7d",full_name="Super Admin",email=SUPER_ADMIN_EMAIL,password=SUPER_ADMIN_HASHED_PASSWORD)
-        admin_list.append(super_admin)
+        admin_list.append(_listed_super_admin())
         return admin_list
 
     except Exception as e:
@@ -72,6 +92,29 @@ async def get_admins(filter_dict: dict = {},start=0,stop=100) -> List[AdminOut]:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An error occurred while fetching admins: {str(e)}"
         )
+
+
+async def get_admin_page(
+    filter_dict: dict, limit: int, cursor: Optional[str] = None
+) -> Tuple[List[AdminOut], Optional[str]]:
+    """Keyset page of admins, newest first; the super admin closes the last page."""
+    docs = await (
+        db.admins.find(keyset_filter(filter_dict or {}, "date_created", cursor))
+        .sort(keyset_sort("date_created"))
+        .limit(limit + 1)
+        .to_list(None)
+    )
+    following = next_cursor(docs, limit, "date_created")
+    admin_list = []
+    for doc in docs:
+        adminObj = AdminOut(**doc)
+        adminObj.password = None
+        admin_list.append(adminObj)
+    if following is None:
+        admin_list.append(_listed_super_admin())
+    return admin_list, following
+
+
 async def update_admin(filter_dict: dict, admin_data: AdminUpdate) -> AdminOut:
     result = await db.admins.find_one_and_update(
         filter_dict,
@@ -1,10 +1,11 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from bson import ObjectId
 from pymongo import ReturnDocument
 from pymongo.errors import DuplicateKeyError
 
 from core.database import db
+from core.pagination import keyset_filter, keyset_sort, next_cursor
 from schemas.coaching_tips import (
     CoachingTipCreate,
     CoachingTipListItem,
@@ -14,18 +15,6 @@ from schemas.coaching_tips import (
 COLLECTION_NAME = "coaching_tips"
 
 
-async def ensure_coaching_tip_indexes() -> None:
-    await db[COLLECTION_NAME].create_index(
-        [("session_id", 1), ("user_id", 1)],
-        unique=True,
-        name="uniq_session_user",
-    )
-    await db[COLLECTION_NAME].create_index(
-        [("user_id", 1), ("created_at", -1)],
-        name="user_created_at_idx",
-    )
-
-
 async def create_coaching_tip(
     tip_data: CoachingTipCreate,
 ) -> CoachingTipResponse:
@@ -59,21 +48,34 @@ async def list_coaching_tips(
         .find({"user_id": user_id})
         .skip(start)
         .limit(max(0, stop - start))
-        .sort("created_at", -1)
+        .sort(keyset_sort("created_at"))
+    )
+    return [_list_item(doc) async for doc in cursor]
+
+
+def _list_item(doc: dict) -> CoachingTipListItem:
+    preview = None
+    tip_text = doc.get("tip_text")
+    if tip_text:
+        preview = tip_text[:120]
+    return CoachingTipListItem(
+        **doc,
+        preview=preview,
+    )
+
+
+async def list_coaching_tip_page(
+    *, user_id: str, limit: int, cursor: Optional[str] = None
+) -> Tuple[List[CoachingTipListItem], Optional[str]]:
+    docs = await (
+        db[COLLECTION_NAME]
+        .find(keyset_filter({"user_id": user_id}, "created_at", cursor))
+        .sort(keyset_sort("created_at"))
+        .limit(limit + 1)
+        .to_list(None)
     )
-    items: List[CoachingTipListItem] = []
-    async for doc in cursor:
-        preview = None
-        tip_text = doc.get("tip_text")
-        if tip_text:
-            preview = tip_text[:120]
-        items.append(
-            CoachingTipListItem(
-                **doc,
-                preview=preview,
-            )
-        )
-    return items
+    following = next_cursor(docs, limit, "created_at")
+    return [_list_item(doc) for doc in docs], following
 
 
 async def update_coaching_tip_feedback(
@@ -102,11 +104,11 @@ async def delete_coaching_tip_by_id(
 
 __all__ = [
     "COLLECTION_NAME",
-    "ensure_coaching_tip_indexes",
     "create_coaching_tip",
     "get_coaching_tip_by_session",
     "get_coaching_tip_by_id",
     "list_coaching_tips",
+    "list_coaching_tip_page",
     "update_coaching_tip_feedback",
     "delete_coaching_tip_by_id",
     "DuplicateKeyError",
@@ -1,8 +1,13 @@
+import time
+
+from bson import ObjectId
 from pymongo import ReturnDocument
 from core.database import db
 from fastapi import HTTPException,status
-from typing import Any, Dict, List,Optional
-from schemas.session import SessionUpdate, SessionCreate, SessionOut
+from typing import Any, Dict, List,Optional,Tuple
+from core.pagination import keyset_filter, keyset_sort, next_cursor
+from schemas.session import ListOfSessionOut, SessionTurnAudio, SessionUpdate, SessionCreate, SessionOut
+from repositories.turn_analysis import TurnAnalyses, get_turn_analyses, save_turn_analyses
 
 async def create_session(session_data: SessionCreate) -> SessionOut:
     session_dict = session_data.model_dump()
@@ -11,14 +16,31 @@ async def create_session(session_data: SessionCreate) -> SessionOut:
     returnable_result = SessionOut(**result)
     return returnable_result
 
-async def get_session(filter_dict: dict) -> Optional[SessionOut]:
+# Speech analyses live in turn_analyses; sessions graded before that move
+# still embed them, and most reads do not want either.
+_WITHOUT_SPEECH_ANALYSIS = {"script.turns.speech_analysis": 0}
+
+
+def _attach_analyses(session: SessionOut, analyses: TurnAnalyses) -> SessionOut:
+    for turn in session.script.turns:
+        if turn.index in analyses:
+            turn.speech_analysis = analyses[turn.index]
+    return session
+
+
+async def get_session(filter_dict: dict, include_speech_analysis: bool = False) -> Optional[SessionOut]:
     try:
-        result = await db.sessions.find_one(filter_dict)
+        projection = None if include_speech_analysis else _WITHOUT_SPEECH_ANALYSIS
+        result = await db.sessions.find_one(filter_dict, projection)
 
         if result is None:
             return None
 
-        return SessionOut(**result)
+        session = SessionOut(**result)
+        if include_speech_analysis:
+            analyses = await get_turn_analyses([session.id])
+            _attach_analyses(session, analyses[session.id])
+        return session
 
     except Exception as e:
         raise HTTPException(
@@ -26,32 +48,239 @@ async def get_session(filter_dict: dict) -> Optional[SessionOut]:
             detail=f"An error occurred while fetching session: {str(e)}"
         )
     
-async def get_sessions(filter_dict: dict = {},start=0,stop=100) -> List[SessionOut]:
+# Listings page newest activity first; _id breaks ties so pages never overlap.
+SESSION_SORT_KEY = "last_updated"
+
+
+async def _load_sessions(docs: List[dict], include_speech_analysis: bool) -> List[SessionOut]:
+    session_list = [SessionOut(**doc) for doc in docs]
+    if include_speech_analysis and session_list:
+        analyses = await get_turn_analyses([session.id for session in session_list])
+        for session in session_list:
+            _attach_analyses(session, analyses[session.id])
+    return session_list
+
+
+async def get_sessions(filter_dict: dict = {},start=0,stop=100,include_speech_analysis: bool = False) -> List[SessionOut]:
     try:
         if filter_dict is None:
             filter_dict = {}
 
-        cursor = (db.sessions.find(filter_dict)
+        projection = None if include_speech_analysis else _WITHOUT_SPEECH_ANALYSIS
+        cursor = (db.sessions.find(filter_dict, projection)
+        .sort(keyset_sort(SESSION_SORT_KEY))
         .skip(start)
         .limit(stop - start)
         )
-        session_list = []
+        docs = await cursor.to_list(None)
+        return await _load_sessions(docs, include_speech_analysis)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while fetching sessions: {str(e)}"
+        )
+
+
+async def get_session_page(
+    filter_dict: dict, limit: int, cursor: Optional[str] = None, include_speech_analysis: bool = False
+) -> Tuple[List[SessionOut], Optional[str]]:
+    """One keyset page of sessions and the cursor for the next, ``None`` on the last page."""
+    projection = None if include_speech_analysis else _WITHOUT_SPEECH_ANALYSIS
+    # Outside the try: a bad cursor is the client's 400, not a 500.
+    page_filter = keyset_filter(filter_dict, SESSION_SORT_KEY, cursor)
+    try:
+        docs = await (
+            db.sessions.find(page_filter, projection)
+            .sort(keyset_sort(SESSION_SORT_KEY))
+            .limit(limit + 1)
+            .to_list(None)
+        )
+        following = next_cursor(docs, limit, SESSION_SORT_KEY)
+        return await _load_sessions(docs, include_speech_analysis), following
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while fetching sessions: {str(e)}"
+        )
+
+
+# Same rule as schemas.session._calculate_average_score: the mean of each scored
+# turn's mean sub-score. $avg skips nulls, so partially scored turns still count.
+_AVERAGE_SCORE_EXPR = {
+    "$avg": {
+        "$map": {
+            "input": {
+                "$filter": {
+                    "input": {"$ifNull": ["$script.turns", []]},
+                    "as": "turn",
+                    "cond": {"$ne": [{"$ifNull": ["$$turn.score", None]}, None]},
+                }
+            },
+            "as": "turn",
+            "in": {
+                "$avg": [
+                    "$$turn.score.confidence",
+                    "$$turn.score.fluency",
+                    "$$turn.score.hesitation",
+                ]
+            },
+        }
+    }
+}
 
-        async for doc in cursor:
-            session_list.append(SessionOut(**doc))
+_SUMMARY_PROJECTION = {
+    "scenario": 1,
+    "status": 1,
+    "last_updated": {"$ifNull": ["$last_updated", "$lastUpdated"]},
+    "totalNumberOfTurns": {
+        "$ifNull": ["$script.totalNumberOfTurns", {"$size": {"$ifNull": ["$script.turns", []]}}]
+    },
+    # Documents written before the score aggregates existed are averaged here.
+    "average_score": {"$ifNull": ["$average_score", _AVERAGE_SCORE_EXPR]},
+}
 
-        return session_list
 
+async def get_session_summaries(filter_dict: dict, start: int = 0, stop: int = 100) -> List[ListOfSessionOut]:
+    """List rows for sessions without shipping turns or speech analysis out of Mongo."""
+    pipeline = [
+        {"$match": filter_dict or {}},
+        {"$sort": dict(keyset_sort(SESSION_SORT_KEY))},
+        {"$skip": start},
+        {"$limit": stop - start},
+        {"$project": _SUMMARY_PROJECTION},
+    ]
+    try:
+        return [ListOfSessionOut(**doc) async for doc in db.sessions.aggregate(pipeline)]
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while fetching sessions: {str(e)}"
+        )
+
+
+async def get_session_summary_page(
+    filter_dict: dict, limit: int, cursor: Optional[str] = None
+) -> Tuple[List[ListOfSessionOut], Optional[str]]:
+    """Keyset-paged list rows; see get_session_summaries."""
+    pipeline = [
+        {"$match": keyset_filter(filter_dict or {}, SESSION_SORT_KEY, cursor)},
+        {"$sort": dict(keyset_sort(SESSION_SORT_KEY))},
+        {"$limit": limit + 1},
+        # The projected last_updated falls back to lastUpdated; the cursor needs the raw key.
+        {"$project": {**_SUMMARY_PROJECTION, "sort_key": f"${SESSION_SORT_KEY}"}},
+    ]
+    try:
+        docs = await db.sessions.aggregate(pipeline).to_list(None)
+        following = next_cursor(docs, limit, SESSION_SORT_KEY, cursor_field="sort_key")
+        return [ListOfSessionOut(**doc) for doc in docs], following
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An error occurred while fetching sessions: {str(e)}"
         )
+
+
+async def get_session_turn_audio(session_id: str, user_id: str, turn_index: int) -> Optional[SessionTurnAudio]:
+    """The audio URLs of one turn (by position), without loading the rest of the session.
+
+    ``None`` when the session does not exist; ``index`` is ``None`` when the
+    turn is out of range, with ``turn_count`` telling the two apart.
+    """
+    turn = {"$arrayElemAt": [{"$ifNull": ["$script.turns", []]}, turn_index]}
+    pipeline = [
+        {"$match": {"_id": ObjectId(session_id), "userId": user_id}},
+        {"$limit": 1},
+        {
+            "$project": {
+                "_id": 0,
+                "turn_count": {"$size": {"$ifNull": ["$script.turns", []]}},
+                "turn": {
+                    "$let": {
+                        "vars": {"t": turn},
+                        "in": {
+                            "index": "$$t.index",
+                            "role": "$$t.role",
+                            "model_audio_url": "$$t.model_audio_url",
+                            "user_audio_url": "$$t.user_audio_url",
+                        },
+                    }
+                },
+            }
+        },
+    ]
+    if turn_index < 0:
+        # $arrayElemAt counts negative positions from the end; the API does not.
+        pipeline[2]["$project"]["turn"] = {"$literal": {}}
+    docs = await db.sessions.aggregate(pipeline).to_list(1)
+    if not docs:
+        return None
+    return SessionTurnAudio(turn_count=docs[0]["turn_count"], **(docs[0].get("turn") or {}))
+
+
+_USER_TURNS_EXPR = {
+    "$filter": {
+        "input": {"$ifNull": ["$script.turns", []]},
+        "as": "turn",
+        "cond": {"$eq": ["$$turn.role", "user"]},
+    }
+}
+
+# Stored on every session update so reads, sorting and indexes need not walk
+# the turns. Mirrors _calculate_average_score / _calculate_completed.
+SCORE_AGGREGATES = {
+    "average_score": _AVERAGE_SCORE_EXPR,
+    # $allElementsTrue is true for an empty array; a session without turns
+    # (generating, failed) is not completed.
+    "completed": {
+        "$and": [
+            {"$gt": [{"$size": {"$ifNull": ["$script.turns", []]}}, 0]},
+            {
+                "$allElementsTrue": [
+                    {
+                        "$map": {
+                            "input": _USER_TURNS_EXPR,
+                            "as": "turn",
+                            "in": {"$ne": [{"$ifNull": ["$$turn.score", None]}, None]},
+                        }
+                    }
+                ]
+            },
+        ]
+    },
+    "scored_user_turns": {
+        "$size": {
+            "$filter": {
+                "input": _USER_TURNS_EXPR,
+                "as": "turn",
+                "cond": {"$ne": [{"$ifNull": ["$$turn.score", None]}, None]},
+            }
+        }
+    },
+}
+
+
+def _turn_update_expr(turns_updates: List[Dict[str, Any]]) -> Dict[str, Any]:
+    # Pipeline updates cannot use arrayFilters, so each matching user turn is
+    # merged with its update inside a $map. Values are $literal so stored text
+    # starting with "$" is never read as an expression.
+    merged: Any = "$$turn"
+    for tu in reversed(turns_updates):
+        fields = {k: v for k, v in tu.items() if k != "index"}
+        merged = {
+            "$cond": [
+                {"$and": [{"$eq": ["$$turn.index", tu["index"]]}, {"$eq": ["$$turn.role", "user"]}]},
+                {"$mergeObjects": ["$$turn", {"$literal": fields}]},
+                merged,
+            ]
+        }
+    return {"$map": {"input": {"$ifNull": ["$script.turns", []]}, "as": "turn", "in": merged}}
+
+
 async def update_session(filter_dict: dict, session_data: SessionUpdate) -> SessionOut:
     payload = session_data.model_dump(exclude_none=True)
 
-    update_doc: Dict[str, Any] = {"$set": {}}
-    array_filters = []
+    fields: Dict[str, Any] = {}
 
     script = payload.pop("script", None)
     turns_updates = None
@@ -59,48 +288,167 @@ async def update_session(filter_dict: dict, session_data: SessionUpdate) -> Sess
         turns_updates = script.pop("turns", None)
 
         for k, v in script.items():
-            update_doc["$set"][f"script.{k}"] = v
+            fields[f"script.{k}"] = {"$literal": v}
 
     for k, v in payload.items():
-        update_doc["$set"][k] = v
+        fields[k] = {"$literal": v}
 
+    analyses: TurnAnalyses = {}
     if turns_updates:
-        for i, tu in enumerate(turns_updates):
-            idx = tu.get("index")
-            if idx is None:
+        for tu in turns_updates:
+            if tu.get("index") is None:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Each turn update must include 'index'."
                 )
+        for tu, turn in zip(turns_updates, session_data.script.turns):
+            if turn.speech_analysis is not None:
+                analyses[turn.index] = turn.speech_analysis
+                # Clears a copy embedded before analyses moved to turn_analyses.
+                tu["speech_analysis"] = None
+        fields["script.turns"] = _turn_update_expr(turns_updates)
+        if any("score" in tu for tu in turns_updates):
+            fields["last_scored_at"] = int(time.time())
 
-            alias = f"t{i}"
-            array_filters.append({f"{alias}.index": idx, f"{alias}.role": "user"})
-
-            for field_name, field_value in tu.items():
-                if field_name == "index":
-                    continue
-                update_doc["$set"][f"script.turns.$[{alias}].{field_name}"] = field_value
-
-    if not update_doc["$set"]:
-        update_doc.pop("$set")
-
-    if not update_doc:
-        result = await db.sessions.find_one(filter_dict)
+    if not fields:
+        result = await db.sessions.find_one(filter_dict, _WITHOUT_SPEECH_ANALYSIS)
         if not result:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
         return SessionOut(**result)
 
+    # One atomic write: apply the turn updates, then recompute the aggregates
+    # from the updated turns.
     result = await db.sessions.find_one_and_update(
         filter_dict,
-        update_doc,
-        array_filters=array_filters if array_filters else None,
+        [{"$set": fields}, {"$set": SCORE_AGGREGATES}],
+        projection=_WITHOUT_SPEECH_ANALYSIS,
         return_document=ReturnDocument.AFTER
     )
 
     if not result:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
 
-    return SessionOut(**result)
+    session = SessionOut(**result)
+    if analyses:
+        await save_turn_analyses(session.id, session.userId, analyses)
+        # The caller just graded these turns; hand the analyses back without a re-read.
+        _attach_analyses(session, analyses)
+    return session
+
+
+async def backfill_session_score_aggregates(batch_size: int = 500) -> int:
+    """Store the score aggregates on sessions written before update_session kept them.
+
+    Also repairs sessions without turns that an earlier run marked completed.
+    """
+    updated = 0
+    missing = {
+        "$or": [
+            {"scored_user_turns": {"$exists": False}},
+            {
+                "completed": True,
+                "$or": [{"script.turns": {"$exists": False}}, {"script.turns": {"$size": 0}}],
+            },
+        ]
+    }
+    while True:
+        ids = [doc["_id"] async for doc in db.sessions.find(missing, {"_id": 1}).limit(batch_size)]
+        if not ids:
+            return updated
+        result = await db.sessions.update_many(
+            {"_id": {"$in": ids}, **missing},
+            [
+                {"$set": SCORE_AGGREGATES},
+                {
+                    "$set": {
+                        "last_scored_at": {
+                            "$cond": [
+                                {"$gt": ["$scored_user_turns", 0]},
+                                {"$ifNull": ["$last_updated", "$lastUpdated"]},
+                                None,
+                            ]
+                        }
+                    }
+                },
+            ],
+        )
+        updated += result.modified_count
+
 
 async def delete_session(filter_dict: dict):
     return await db.sessions.delete_one(filter_dict)
+
+
+_AUDIO_URL_PROJECTION = {
+    "script.turns.model_audio_url": 1,
+    "script.turns.user_audio_url": 1,
+}
+
+
+async def get_session_audio_refs(filter_dict: dict, limit: int = 100) -> List[Dict[str, Any]]:
+    """Session ids and turn audio URLs only, for bulk deletion."""
+    cursor = db.sessions.find(filter_dict, _AUDIO_URL_PROJECTION).limit(limit)
+    return [doc async for doc in cursor]
+
+
+async def delete_sessions(filter_dict: dict) -> int:
+    result = await db.sessions.delete_many(filter_dict)
+    return result.deleted_count
+
+
+async def set_session_script_turns(session_id: str, turns: List[dict]) -> bool:
+    result = await db.sessions.update_one(
+        {"_id": ObjectId(session_id)},
+        {
+            "$set": {
+                "script.turns": turns,
+                "script.totalNumberOfTurns": len(turns),
+                "generation.total_turns": len(turns),
+                "generation.ready_turns": 0,
+            },
+            # A new script invalidates any stored aggregates.
+            "$unset": {"average_score": "", "completed": "", "scored_user_turns": "", "last_scored_at": ""},
+        },
+    )
+    return bool(result.matched_count)
+
+
+async def set_session_turn_audio(
+    session_id: str,
+    turn_index: int,
+    audio_url: str,
+    first_turn_ms: Optional[int] = None,
+) -> bool:
+    # Only matches while the turn has no audio, so a retried job never counts a
+    # turn twice.
+    fields = {"script.turns.$.model_audio_url": audio_url}
+    if first_turn_ms is not None:
+        fields["generation.first_turn_ms"] = first_turn_ms
+    result = await db.sessions.update_one(
+        {
+            "_id": ObjectId(session_id),
+            "script.turns": {"$elemMatch": {"index": turn_index, "model_audio_url": None}},
+        },
+        {
+            "$set": fields,
+            "$inc": {"generation.ready_turns": 1},
+        },
+    )
+    return bool(result.modified_count)
+
+
+async def clear_session_turn_audio(session_id: str) -> bool:
+    """Unset every turn's model audio, e.g. after failed generation released it."""
+    result = await db.sessions.update_one(
+        {"_id": ObjectId(session_id)},
+        {"$set": {"script.turns.$[].model_audio_url": None, "generation.ready_turns": 0}},
+    )
+    return bool(result.matched_count)
+
+
+async def set_session_status(session_id: str, status: str, error: Optional[str] = None) -> bool:
+    result = await db.sessions.update_one(
+        {"_id": ObjectId(session_id)},
+        {"$set": {"status": status, "generation.error": error}},
+    )
+    return bool(result.matched_count)
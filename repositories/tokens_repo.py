@@ -6,7 +6,7 @@ from datetime import datetime, timezone, timedelta
 from dateutil import parser
 from bson import ObjectId,errors
 from fastapi import HTTPException
-from repositories.admin_repo import get_admin
+from repositories.admin_repo import admin_exists
 from security.encrypting_jwt import decode_jwt_token_without_expiration
 
 async def add_access_tokens(token_data:accessTokenCreate)->accessTokenOut:
@@ -106,7 +106,7 @@ async def get_admin_access_tokens(accessToken:str)->accessTokenOut:
         if is_older_than_days(date_value=token['dateCreated'])==False:
             if token.get("role",None)=="admin":
                 userId = token.get("userId")
-                if await get_admin(filter_dict={"_id":ObjectId(userId)}):
+                if await admin_exists(userId):
                 
                     tokn = accessTokenOut(**token)
                     return tokn
@@ -0,0 +1,114 @@
+import time
+from typing import Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from core.database import db
+
+COLLECTION_NAME = "tts_audio"
+
+
+async def claim_tts_audio(content_hash: str, key: str, url: str, **meta) -> dict:
+    """Take one reference on the clip for ``content_hash``, creating it if needed.
+
+    ``key``/``url`` are only used when the document is inserted; callers must
+    use the values on the returned document.
+    """
+    update = {
+        "$inc": {"ref_count": 1},
+        "$setOnInsert": {
+            "key": key,
+            "url": url,
+            "ready": False,
+            "created_at": int(time.time()),
+            **meta,
+        },
+    }
+    try:
+        return await db[COLLECTION_NAME].find_one_and_update(
+            {"_id": content_hash},
+            update,
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        # Lost an insert race; the document now exists so a plain update hits it.
+        return await db[COLLECTION_NAME].find_one_and_update(
+            {"_id": content_hash},
+            update,
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+
+
+async def get_tts_audio(content_hash: str) -> Optional[dict]:
+    return await db[COLLECTION_NAME].find_one({"_id": content_hash})
+
+
+async def acquire_tts_synthesis(content_hash: str, key: str, owner: str, lease_s: float) -> bool:
+    """Take the lease to synthesize a clip that is not ready yet.
+
+    ``False`` while another caller holds an unexpired lease (or the clip is
+    ready); a lease whose holder died simply runs out.
+    """
+    now = time.time()
+    result = await db[COLLECTION_NAME].update_one(
+        {
+            "_id": content_hash,
+            "key": key,
+            "ready": False,
+            "$or": [{"synthesizing_until": {"$exists": False}}, {"synthesizing_until": {"$lt": now}}],
+        },
+        {"$set": {"synthesizing_until": now + lease_s, "synthesizing_by": owner}},
+    )
+    return bool(result.modified_count)
+
+
+async def release_tts_synthesis(content_hash: str, owner: str) -> None:
+    """Give up the lease so a waiting caller takes over right away."""
+    await db[COLLECTION_NAME].update_one(
+        {"_id": content_hash, "synthesizing_by": owner},
+        {"$unset": {"synthesizing_until": "", "synthesizing_by": ""}},
+    )
+
+
+async def mark_tts_audio_ready(content_hash: str, key: str) -> None:
+    await db[COLLECTION_NAME].update_one(
+        {"_id": content_hash, "key": key},
+        {"$set": {"ready": True}, "$unset": {"synthesizing_until": "", "synthesizing_by": ""}},
+    )
+
+
+async def release_tts_audio(key: str, count: int = 1) -> Optional[bool]:
+    """Drop ``count`` references to the clip stored at ``key``.
+
+    Returns ``None`` when ``key`` is not a tracked clip, ``True`` when this was
+    the last reference and the object may be deleted, otherwise ``False``.
+    """
+    doc = await db[COLLECTION_NAME].find_one_and_update(
+        {"key": key},
+        {"$inc": {"ref_count": -count}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if doc is None:
+        return None
+    if doc.get("ref_count", 0) > 0:
+        return False
+    # Conditional on the count so a concurrent claim keeps the clip alive; a
+    # claim after this delete inserts a fresh document under a new key.
+    result = await db[COLLECTION_NAME].delete_one(
+        {"_id": doc["_id"], "key": key, "ref_count": {"$lte": 0}}
+    )
+    return bool(result.deleted_count)
+
+
+__all__ = [
+    "COLLECTION_NAME",
+    "acquire_tts_synthesis",
+    "claim_tts_audio",
+    "get_tts_audio",
+    "mark_tts_audio_ready",
+    "release_tts_audio",
+    "release_tts_synthesis",
+]
@@ -0,0 +1,98 @@
+import os
+import time
+from typing import Dict, Iterable, List
+
+from pymongo import UpdateOne
+
+from core.database import db
+from schemas.imports import Turn
+from schemas.speech_analysis import TurnSpeechAnalysis
+from schemas.speech_analysis_codec import encode_speech_analysis, expand_speech_analysis, is_compact
+
+COLLECTION_NAME = "turn_analyses"
+
+TurnAnalyses = Dict[int, TurnSpeechAnalysis]
+
+
+def _stored_form(analysis: TurnSpeechAnalysis) -> dict:
+    # "full" keeps the API shape, e.g. to inspect analyses from the mongo shell.
+    if os.getenv("SPEECH_ANALYSIS_STORAGE", "compact").strip().lower() == "full":
+        return analysis.model_dump()
+    return encode_speech_analysis(analysis)
+
+
+def _upsert(session_id: str, user_id: str, turn_index: int, analysis: TurnSpeechAnalysis) -> UpdateOne:
+    return UpdateOne(
+        {"session_id": session_id, "turn_index": turn_index},
+        {
+            "$set": {
+                "user_id": user_id,
+                "analysis": _stored_form(analysis),
+                "updated_at": int(time.time()),
+            }
+        },
+        upsert=True,
+    )
+
+
+async def save_turn_analyses(session_id: str, user_id: str, analyses: TurnAnalyses) -> None:
+    if analyses:
+        await db[COLLECTION_NAME].bulk_write(
+            [_upsert(session_id, user_id, index, analysis) for index, analysis in analyses.items()],
+            ordered=False,
+        )
+
+
+def _parse(stored: dict) -> TurnSpeechAnalysis:
+    return TurnSpeechAnalysis.model_validate(expand_speech_analysis(stored) if is_compact(stored) else stored)
+
+
+async def get_turn_analyses(session_ids: Iterable[str]) -> Dict[str, TurnAnalyses]:
+    """Analyses for many sessions in one ``$in`` query, keyed by session id then turn index."""
+    session_ids = list(dict.fromkeys(session_ids))
+    found: Dict[str, TurnAnalyses] = {session_id: {} for session_id in session_ids}
+    if not session_ids:
+        return found
+    cursor = db[COLLECTION_NAME].find(
+        {"session_id": {"$in": session_ids}},
+        {"_id": 0, "session_id": 1, "turn_index": 1, "analysis": 1},
+    )
+    async for doc in cursor:
+        found[doc["session_id"]][doc["turn_index"]] = _parse(doc["analysis"])
+    return found
+
+
+async def delete_turn_analyses(session_ids: List[str]) -> int:
+    if not session_ids:
+        return 0
+    result = await db[COLLECTION_NAME].delete_many({"session_id": {"$in": session_ids}})
+    return result.deleted_count
+
+
+async def delete_turn_analyses_for_user(user_id: str) -> int:
+    result = await db[COLLECTION_NAME].delete_many({"user_id": user_id})
+    return result.deleted_count
+
+
+async def move_embedded_speech_analysis(batch_size: int = 200) -> int:
+    """Move analyses still embedded in session turns into this collection."""
+    moved = 0
+    embedded = {"script.turns.speech_analysis": {"$type": "object"}}
+    cursor = db.sessions.find(embedded, {"userId": 1, "script.turns": 1}).batch_size(batch_size)
+    async for doc in cursor:
+        session_id = str(doc["_id"])
+        analyses = {
+            turn["index"]: Turn(**turn).speech_analysis
+            for turn in doc["script"]["turns"]
+            if isinstance(turn.get("speech_analysis"), dict)
+        }
+        # Never overwrite an analysis written since the new layout went live.
+        existing = (await get_turn_analyses([session_id]))[session_id]
+        missing = {index: analysis for index, analysis in analyses.items() if index not in existing}
+        await save_turn_analyses(session_id, doc.get("userId"), missing)
+        await db.sessions.update_one(
+            {"_id": doc["_id"]},
+            {"$unset": {"script.turns.$[].speech_analysis": ""}},
+        )
+        moved += 1
+    return moved
@@ -1,10 +1,12 @@
 
 import time
 
+from bson import ObjectId
 from pymongo import ReturnDocument
 from core.database import db
 from fastapi import HTTPException,status
 from typing import List,Optional
+from core.pagination import keyset_sort
 from schemas.user_schema import UserUpdate, UserCreate, UserOut
 
 async def create_user(user_data: UserCreate) -> UserOut:
@@ -15,9 +17,9 @@ async def create_user(user_data: UserCreate) -> UserOut:
     returnable_result = UserOut(**result)
     return returnable_result
 
-async def get_user(filter_dict: dict) -> Optional[UserOut]:
+async def get_user(filter_dict: dict, collation: Optional[dict] = None) -> Optional[UserOut]:
     try:
-        result = await db.users.find_one(filter_dict)
+        result = await db.users.find_one(filter_dict, collation=collation)
 
         if result is None:
             return None
@@ -30,12 +32,20 @@ async def get_user(filter_dict: dict) -> Optional[UserOut]:
             detail=f"An error occurred while fetching user: {str(e)}"
         )
     
+async def user_exists(user_id: str) -> bool:
+    """Existence check that reads only the ``_id`` from the index."""
+    if not ObjectId.is_valid(user_id):
+        return False
+    return await db.users.find_one({"_id": ObjectId(user_id)}, {"_id": 1}) is not None
+
+
 async def get_users(filter_dict: dict = {},start=0,stop=100) -> List[UserOut]:
     try:
         if filter_dict is None:
             filter_dict = {}
 
         cursor = (db.users.find(filter_dict)
+        .sort(keyset_sort("date_created"))
         .skip(start)
         .limit(stop - start)
         )
@@ -53,6 +63,8 @@ async def get_users(filter_dict: dict = {},start=0,stop=100) -> List[UserOut]:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An error occurred while fetching users: {str(e)}"
         )
+
+
 async def update_user(filter_dict: dict, user_data: UserUpdate) -> UserOut:
     result = await db.users.find_one_and_update(
         filter_dict,
@@ -1,12 +1,13 @@
 from bson import ObjectId
 from pydantic import AliasChoices, GetJsonSchemaHandler,  field_serializer
-from pydantic import BaseModel, EmailStr, Field,model_validator
+from pydantic import BaseModel, EmailStr, Field,field_validator,model_validator
 from pydantic_core import core_schema
 from datetime import datetime,timezone
 from typing import Optional,List,Any,Literal
 from enum import Enum
 import time
 from schemas.speech_analysis import TurnSpeechAnalysis
+from schemas.speech_analysis_codec import expand_speech_analysis, is_compact
 
 
 class TurnScore(BaseModel):
@@ -59,6 +60,14 @@ class Turn(BaseModel):
         serialization_alias="speechAnalysis",
     )
 
+    @field_validator("speech_analysis", mode="before")
+    @classmethod
+    def expand_compact_speech_analysis(cls, value: Any) -> Any:
+        # Stored turns may hold the compact form (see schemas.speech_analysis_codec).
+        if is_compact(value):
+            return expand_speech_analysis(value)
+        return value
+
 class AIGeneratedTurns(BaseModel):
 
     role: Literal["ai", "user"]
@@ -8,5 +8,7 @@ class APIResponse(GenericModel, Generic[T]):
     status_code: int = Field(serialization_alias="status_code")
     data: Optional[T] = Field(default=None, serialization_alias="data")
     detail: str = Field(serialization_alias="detail")
+    # Set by keyset-paged listings; pass it back as ?cursor= for the next page.
+    next_cursor: Optional[str] = Field(default=None, serialization_alias="next_cursor")
 
     model_config = {"populate_by_name": True}
@@ -30,6 +30,34 @@ def _calculate_completed(script: Optional[FluencyScript]) -> bool:
     )
 
 
+class SessionStatus(str, Enum):
+    generating = "generating"
+    ready = "ready"
+    failed = "failed"
+
+
+class SessionGeneration(BaseModel):
+    total_turns: int = Field(default=0, serialization_alias="totalTurns")
+    ready_turns: int = Field(default=0, serialization_alias="readyTurns")
+    first_turn_ms: Optional[int] = Field(default=None, serialization_alias="firstTurnMs")
+    error: Optional[str] = Field(default=None, serialization_alias="error")
+
+    model_config = {
+        "populate_by_name": True,
+    }
+
+
+class SessionGenerationStatus(BaseModel):
+    id: str = Field(serialization_alias="id")
+    status: SessionStatus = Field(serialization_alias="status")
+    total_turns: int = Field(default=0, serialization_alias="totalTurns")
+    ready_turns: int = Field(default=0, serialization_alias="readyTurns")
+    ready_turn_indices: List[int] = Field(default_factory=list, serialization_alias="readyTurnIndices")
+    playable_turns: int = Field(default=0, serialization_alias="playableTurns")
+    first_turn_ms: Optional[int] = Field(default=None, serialization_alias="firstTurnMs")
+    error: Optional[str] = Field(default=None, serialization_alias="error")
+
+
 class SessionBaseRequest(BaseModel):
  
     scenario: ScenarioName
@@ -41,6 +69,8 @@ class SessionBase(SessionBaseRequest):
 
 class SessionCreate(SessionBase):
     script:FluencyScript
+    status: SessionStatus = SessionStatus.ready
+    generation: Optional[SessionGeneration] = None
     date_created: int = Field(default_factory=lambda: int(time.time()), serialization_alias="dateCreated")
     last_updated: int = Field(default_factory=lambda: int(time.time()), serialization_alias="lastUpdated")
 
@@ -57,6 +87,10 @@ class SessionOut(SessionBase):
     script:FluencyScript
     average_score: Optional[float] = Field(default=None, serialization_alias="averageScore")
     completed: Optional[bool] = Field(default=None, serialization_alias="completed")
+    scored_user_turns: Optional[int] = Field(default=None, serialization_alias="scoredUserTurns")
+    last_scored_at: Optional[int] = Field(default=None, serialization_alias="lastScoredAt")
+    status: SessionStatus = Field(default=SessionStatus.ready, serialization_alias="status")
+    generation: Optional[SessionGeneration] = Field(default=None, serialization_alias="generation")
     id: Optional[str] = Field(
         default=None,
         validation_alias=AliasChoices("_id", "id"),
@@ -87,8 +121,10 @@ class SessionOut(SessionBase):
     
     @model_validator(mode="after")
     def set_completed_and_average(self):
-        self.average_score = _calculate_average_score(self.script)
-        self.completed = _calculate_completed(self.script)
+        # update_session stores these; only older documents are computed here.
+        if self.scored_user_turns is None:
+            self.average_score = _calculate_average_score(self.script)
+            self.completed = _calculate_completed(self.script)
         return self
             
     class Config:
@@ -106,6 +142,7 @@ class ListOfSessionOut(BaseModel):
         serialization_alias="id",
     )
     scenario: ScenarioName
+    status: SessionStatus = Field(default=SessionStatus.ready, serialization_alias="status")
     totalNumberOfTurns: Optional[int] = Field(default=None, serialization_alias="totalNumberOfTurns")
     last_updated: Optional[int] = Field(
         default=None,
@@ -139,3 +176,12 @@ class ListOfSessionOut(BaseModel):
 
     class Config:
         populate_by_name = True
+
+
+class SessionTurnAudio(BaseModel):
+    """One turn's audio references, as read by repositories.session.get_session_turn_audio."""
+    turn_count: int = 0
+    index: Optional[int] = None
+    role: Optional[Literal["ai", "user"]] = None
+    model_audio_url: Optional[str] = None
+    user_audio_url: Optional[str] = None
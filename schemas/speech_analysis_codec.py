@@ -0,0 +1,257 @@
+"""Columnar storage format for ``TurnSpeechAnalysis``.
+
+The API shape repeats every token and pair as objects, including one
+``exact_match`` ignored difference per correctly spoken word. Stored, a turn
+keeps the token texts once and describes the alignment as parallel columns:
+
+- ``ops``/``dec``: one character per aligned pair for the op and the grading
+  decision (near miss or why the difference was ignored)
+- ``ed``: character edit distances as bytes
+- ``ei``/``ai``: token indices, only when they do not follow from ``ops``
+- ``mo``: pair positions in mispronounced-word order
+
+Pair texts and normalized distances are derived from the tokens, so nothing
+is rounded. Analyses this layout cannot reproduce exactly are stored as-is.
+"""
+from typing import Any, Dict, List, Optional
+
+from schemas.speech_analysis import (
+    ASRMeta,
+    AlignmentMeta,
+    MispronouncedLogicMeta,
+    Token,
+    TokenizationMeta,
+    TurnSpeechAnalysis,
+)
+
+COMPACT_VERSION = 2
+
+_OPS = {"match": "m", "substitute": "s", "insert": "i", "delete": "d"}
+_DECISIONS = {
+    "near_miss": "n",
+    "insertion": "I",
+    "deletion": "D",
+    "too_far_from_expected": "f",
+    "exact_match": "x",
+    "empty_side": "e",
+    "deduped": "u",
+}
+_OPS_BY_CODE = {code: op for op, code in _OPS.items()}
+_DECISIONS_BY_CODE = {code: decision for decision, code in _DECISIONS.items()}
+_META_MODELS = {
+    "asr": ("asr_meta", ASRMeta),
+    "tok": ("tokenization_meta", TokenizationMeta),
+    "aln": ("alignment_meta", AlignmentMeta),
+    "mis": ("mispronounced_logic_meta", MispronouncedLogicMeta),
+}
+
+
+def is_compact(value: Any) -> bool:
+    return isinstance(value, dict) and value.get("v") == COMPACT_VERSION
+
+
+def _normalized(distance: int, expected: str, actual: str) -> float:
+    # Same formula as controller.grading.char_distance.normalize_distance.
+    if not expected and not actual:
+        return 0.0
+    return distance / max(1, len(expected), len(actual))
+
+
+def _plain_tokens(tokens: List[Token]) -> Optional[List[str]]:
+    if any(t.idx != i or t.confidence is not None or t.timing is not None for i, t in enumerate(tokens)):
+        return None
+    return [t.text for t in tokens]
+
+
+def _cursor_indices(ops: str, sides: str) -> List[Optional[int]]:
+    indices: List[Optional[int]] = []
+    cursor = -1
+    for op in ops:
+        if op in sides:
+            cursor += 1
+            indices.append(cursor)
+        else:
+            indices.append(None)
+    return indices
+
+
+def encode_speech_analysis(analysis: TurnSpeechAnalysis) -> Dict[str, Any]:
+    """Compact document for ``analysis``, or its plain dump if it cannot round-trip."""
+    fallback = analysis.model_dump()
+    expected_tokens = _plain_tokens(analysis.expected_tokens)
+    actual_tokens = _plain_tokens(analysis.actual_tokens)
+    if expected_tokens is None or actual_tokens is None:
+        return fallback
+
+    pairs = analysis.aligned_pairs
+    ops = "".join(_OPS[pair.op] for pair in pairs)
+    distances = [pair.edit_distance for pair in pairs]
+    for pair in pairs:
+        expected = expected_tokens[pair.expected_idx] if pair.expected_idx is not None else ""
+        actual = actual_tokens[pair.actual_idx] if pair.actual_idx is not None else ""
+        if (pair.expected, pair.actual) != (expected, actual):
+            return fallback
+        if pair.normalized_edit_distance != _normalized(pair.edit_distance, expected, actual):
+            return fallback
+
+    decisions = [""] * len(pairs)
+    ignored = iter(analysis.ignored_differences)
+    mispronounced_positions = {}
+    for position, pair in enumerate(pairs):
+        mispronounced_positions.setdefault((pair.expected_idx, pair.actual_idx), position)
+    order = []
+    for word in analysis.mispronounced_words:
+        position = mispronounced_positions.get((word.expected_idx, word.actual_idx))
+        if (
+            position is None
+            or decisions[position]
+            or word.reason != "near_miss"
+            or word.deduped
+            or word.timing is not None
+            or (word.expected, word.actual) != (pairs[position].expected, pairs[position].actual)
+            or word.normalized_edit_distance != pairs[position].normalized_edit_distance
+        ):
+            return fallback
+        decisions[position] = _DECISIONS["near_miss"]
+        order.append(position)
+    for position, pair in enumerate(pairs):
+        if decisions[position]:
+            continue
+        diff = next(ignored, None)
+        if diff is None or diff.ignored_because == "near_miss" or (
+            diff.op,
+            diff.expected,
+            diff.actual,
+            diff.expected_idx,
+            diff.actual_idx,
+            diff.normalized_edit_distance,
+        ) != (
+            pair.op,
+            pair.expected,
+            pair.actual,
+            pair.expected_idx,
+            pair.actual_idx,
+            pair.normalized_edit_distance,
+        ):
+            return fallback
+        decisions[position] = _DECISIONS[diff.ignored_because]
+    if next(ignored, None) is not None:
+        return fallback
+
+    summary = analysis.alignment_summary
+    compact: Dict[str, Any] = {
+        "v": COMPACT_VERSION,
+        "et": analysis.expected_text,
+        "at": analysis.asr_text,
+        "xt": expected_tokens,
+        "yt": actual_tokens,
+        "ops": ops,
+        "dec": "".join(decisions),
+        "ed": bytes(distances) if all(0 <= d <= 255 for d in distances) else distances,
+        "mo": order,
+        "sum": [summary.substitutions, summary.insertions, summary.deletions, summary.correct, summary.wer],
+    }
+    expected_idx = [pair.expected_idx for pair in pairs]
+    actual_idx = [pair.actual_idx for pair in pairs]
+    if expected_idx != _cursor_indices(ops, "msd"):
+        compact["ei"] = [-1 if i is None else i for i in expected_idx]
+    if actual_idx != _cursor_indices(ops, "msi"):
+        compact["ai"] = [-1 if i is None else i for i in actual_idx]
+    meta = {}
+    for name, (field, _) in _META_MODELS.items():
+        dumped = getattr(analysis, field).model_dump(exclude_defaults=True)
+        if dumped:
+            meta[name] = dumped
+    if meta:
+        compact["meta"] = meta
+    if analysis.extra:
+        compact["extra"] = analysis.extra
+    return compact
+
+
+def expand_speech_analysis(compact: Dict[str, Any]) -> Dict[str, Any]:
+    """The API shape of a compact document, as plain dicts for validation."""
+    expected_tokens: List[str] = compact["xt"]
+    actual_tokens: List[str] = compact["yt"]
+    ops = compact["ops"]
+    decisions = compact["dec"]
+    distances = compact["ed"]
+    expected_idx = (
+        [None if i < 0 else i for i in compact["ei"]] if "ei" in compact else _cursor_indices(ops, "msd")
+    )
+    actual_idx = (
+        [None if i < 0 else i for i in compact["ai"]] if "ai" in compact else _cursor_indices(ops, "msi")
+    )
+
+    aligned_pairs: List[Dict[str, Any]] = []
+    ignored: List[Dict[str, Any]] = []
+    for position, code in enumerate(ops):
+        op = _OPS_BY_CODE[code]
+        e_idx, a_idx = expected_idx[position], actual_idx[position]
+        expected = expected_tokens[e_idx] if e_idx is not None else ""
+        actual = actual_tokens[a_idx] if a_idx is not None else ""
+        distance = distances[position]
+        normalized = _normalized(distance, expected, actual)
+        aligned_pairs.append(
+            {
+                "op": op,
+                "expected_idx": e_idx,
+                "actual_idx": a_idx,
+                "expected": expected,
+                "actual": actual,
+                "edit_distance": distance,
+                "normalized_edit_distance": normalized,
+            }
+        )
+        decision = _DECISIONS_BY_CODE[decisions[position]]
+        if decision != "near_miss":
+            ignored.append(
+                {
+                    "op": op,
+                    "ignored_because": decision,
+                    "expected": expected,
+                    "actual": actual,
+                    "expected_idx": e_idx,
+                    "actual_idx": a_idx,
+                    "normalized_edit_distance": normalized,
+                }
+            )
+
+    mispronounced = []
+    for position in compact["mo"]:
+        pair = aligned_pairs[position]
+        mispronounced.append(
+            {
+                "expected": pair["expected"],
+                "actual": pair["actual"],
+                "expected_idx": pair["expected_idx"],
+                "actual_idx": pair["actual_idx"],
+                "normalized_edit_distance": pair["normalized_edit_distance"],
+                "reason": "near_miss",
+            }
+        )
+
+    substitutions, insertions, deletions, correct, wer = compact["sum"]
+    meta = compact.get("meta", {})
+    return {
+        "expected_text": compact["et"],
+        "asr_text": compact["at"],
+        **{field: meta.get(name, {}) for name, (field, _) in _META_MODELS.items()},
+        "expected_tokens": [{"idx": i, "text": t} for i, t in enumerate(expected_tokens)],
+        "actual_tokens": [{"idx": i, "text": t} for i, t in enumerate(actual_tokens)],
+        "aligned_pairs": aligned_pairs,
+        "alignment_summary": {
+            "substitutions": substitutions,
+            "insertions": insertions,
+            "deletions": deletions,
+            "correct": correct,
+            "wer": wer,
+        },
+        "mispronounced_words": mispronounced,
+        "ignored_differences": ignored,
+        "extra": dict(compact.get("extra") or {}),
+    }
+
+
+def decode_speech_analysis(compact: Dict[str, Any]) -> TurnSpeechAnalysis:
+    return TurnSpeechAnalysis.model_validate(expand_speech_analysis(compact))
@@ -4,7 +4,7 @@ from security.tokens import validate_admin_accesstoken,validate_admin_accesstoke
 from security.encrypting_jwt import decode_jwt_token,decode_jwt_token_without_expiration
 from repositories.tokens_repo import get_access_tokens,get_access_tokens_no_date_check
 from schemas.tokens_schema import refreshedToken,accessTokenOut
-from services.user_service import retrieve_user_by_user_id
+from repositories.user_repo import user_exists
  
 
 
@@ -33,9 +33,9 @@ async def verify_token_user_role(token: str = Depends(token_auth_scheme))->acces
         decoded_token =await decode_jwt_token(token=token.credentials)
         result = await get_access_tokens(accessToken=decoded_token['access_token'])
        
-        USER = await retrieve_user_by_user_id(id=result.userId)
-        if USER and result!=None:
+        if result!=None and await user_exists(result.userId):
             return result
+        result = None
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
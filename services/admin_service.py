@@ -1,11 +1,12 @@
 
 from bson import ObjectId
 from fastapi import HTTPException
-from typing import List
+from typing import List, Optional, Tuple
 
 from repositories.admin_repo import (
     create_admin,
     get_admin,
+    get_admin_page,
     get_admins,
     update_admin,
     delete_admin,
@@ -97,6 +98,9 @@ async def retrieve_admin_by_admin_id(id: str) -> AdminOut:
 async def retrieve_admins(start=0,stop=100) -> List[AdminOut]:
     return await get_admins(start=start,stop=stop)
 
+async def retrieve_admin_page(limit: int, cursor: Optional[str] = None) -> Tuple[List[AdminOut], Optional[str]]:
+    return await get_admin_page({}, limit=limit, cursor=cursor)
+
 async def update_admin_by_id(admin_id: str, admin_data: AdminUpdate,is_password_getting_changed:bool=False) -> AdminOut:
     from celery_worker import celery_app
 
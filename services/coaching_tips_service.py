@@ -2,7 +2,7 @@ import json
 import os
 import time
 from collections import Counter
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from bson import ObjectId
 from fastapi import HTTPException
@@ -16,9 +16,9 @@ from repositories.coaching_tips import (
     DuplicateKeyError,
     create_coaching_tip,
     delete_coaching_tip_by_id,
-    ensure_coaching_tip_indexes,
     get_coaching_tip_by_id,
     get_coaching_tip_by_session,
+    list_coaching_tip_page,
     list_coaching_tips,
 )
 from repositories.session import get_session
@@ -166,6 +166,7 @@ async def _call_openai_for_tip(prompt_context: Dict[str, Any]) -> Optional[Dict[
                 max_tokens=160,
             ), # pyright: ignore[reportUnknownLambdaType]
             estimated_tokens=estimated_tokens,
+            model=model_name,
         )
     except Exception:
         return None
@@ -206,15 +207,15 @@ async def generate_or_get_coaching_tip(
     if not ObjectId.is_valid(create_request.session_id):
         raise HTTPException(status_code=400, detail="Invalid session ID format")
 
-    await ensure_coaching_tip_indexes()
-
     user_id = user.userId
     session_id = create_request.session_id
     existing = await get_coaching_tip_by_session(session_id=session_id, user_id=user_id)
     if existing:
         return existing
 
-    session = await get_session(filter_dict={"_id": ObjectId(session_id), "userId": user_id})
+    session = await get_session(
+        filter_dict={"_id": ObjectId(session_id), "userId": user_id}, include_speech_analysis=True
+    )
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     script = getattr(session, "script", None)
@@ -270,6 +271,12 @@ async def list_user_coaching_tips(
     return await list_coaching_tips(user_id=user.userId, start=start, stop=stop)
 
 
+async def list_user_coaching_tip_page(
+    *, user: accessTokenOut, limit: int, cursor: Optional[str] = None
+) -> Tuple[List[CoachingTipListItem], Optional[str]]:
+    return await list_coaching_tip_page(user_id=user.userId, limit=limit, cursor=cursor)
+
+
 async def get_user_coaching_tip_by_id(
     *, tip_id: str, user: accessTokenOut
 ) -> CoachingTipResponse:
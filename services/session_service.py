@@ -1,28 +1,59 @@
+import logging
+import os
+import time
+
 from bson import ObjectId
 from fastapi import HTTPException, UploadFile
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
 
 from controller.session import (
     generate_script,
     calculate_turn_score,
     schedule_cleanup_incomplete_session,
 )
-from controller.script_generation.audio import delete_audio_by_urls
+from controller.script_generation import (
+    build_script_config,
+    generate_script_turns,
+    synthesize_script_audio,
+)
+from controller.script_generation.audio import (
+    delete_audio_keys,
+    delete_audio_objects,
+    extract_r2_key,
+    user_audio_prefixes,
+)
+from controller.script_generation.audio_urls import signed_audio_url
 from repositories.session import (
     create_session,
     get_session,
     get_sessions,
+    get_session_page,
+    get_session_summary_page,
+    get_session_audio_refs,
+    get_session_summaries,
+    set_session_script_turns,
+    set_session_status,
+    set_session_turn_audio,
+    clear_session_turn_audio,
     update_session,
     delete_session,
+    delete_sessions,
 )
+from repositories.turn_analysis import delete_turn_analyses, delete_turn_analyses_for_user
+from schemas.imports import FluencyScript, Turn
 from schemas.session import (
     SessionBase,
     SessionCreate,
+    SessionGeneration,
+    SessionGenerationStatus,
+    SessionStatus,
     SessionUpdate,
     SessionOut,
     ListOfSessionOut,
 )
 
+logger = logging.getLogger(__name__)
+
 
 async def add_session(session_data: SessionBase) -> SessionOut:
     user_script=await generate_script(user_id=session_data.userId,scenario_name=session_data.scenario)
@@ -37,6 +68,109 @@ async def add_session(session_data: SessionBase) -> SessionOut:
     return _with_stream_urls(created)
 
 
+async def add_session_in_background(session_data: SessionBase) -> SessionOut:
+    # Fail fast on missing onboarding before handing the work to Celery.
+    await build_script_config(user_id=session_data.userId, scenario_name=session_data.scenario)
+    session = SessionCreate(
+        **session_data.model_dump(),
+        script=FluencyScript(totalNumberOfTurns=0, turns=[]),
+        status=SessionStatus.generating,
+        generation=SessionGeneration(),
+    )
+    created = await create_session(session)
+    schedule_cleanup_incomplete_session(
+        session_id=created.id,
+        user_id=created.userId,
+        date_created=created.date_created,
+    )
+    try:
+        enqueue_session_generation(
+            session_id=created.id,
+            user_id=created.userId,
+            scenario=created.scenario.value,
+        )
+    except Exception as exc:
+        await set_session_status(created.id, SessionStatus.failed.value, error="Failed to enqueue script generation.")
+        raise HTTPException(status_code=503, detail="Script generation is unavailable, please retry.") from exc
+    return _with_stream_urls(created)
+
+
+def enqueue_session_generation(session_id: str, user_id: str, scenario: str) -> None:
+    from celery_worker import celery_app
+
+    celery_app.send_task(
+        "celery_worker.run_async_task",
+        args=[
+            "generate_session_script",
+            {"session_id": session_id, "user_id": user_id, "scenario": scenario},
+        ],
+    )
+
+
+async def generate_session_script(session_id: str, user_id: str, scenario: str) -> dict:
+    started = time.perf_counter()
+    turns_written = False
+    try:
+        turns = await generate_script_turns(user_id, scenario)
+        turns_written = await set_session_script_turns(
+            session_id,
+            [Turn(index=i, role=turn.role, text=turn.text).model_dump() for i, turn in enumerate(turns)],
+        )
+        if not turns_written:
+            # Deleted (e.g. by the incomplete-session cleanup) before the job ran;
+            # synthesizing now would only leak clips.
+            logger.info("Session %s is gone, skipping script audio", session_id)
+            return {"session_id": session_id, "status": "deleted"}
+
+        async def on_turn_ready(turn: Turn) -> None:
+            first_turn_ms = None
+            if turn.index == 0:
+                first_turn_ms = int((time.perf_counter() - started) * 1000)
+                logger.info("Session %s first turn playable after %d ms", session_id, first_turn_ms)
+            await set_session_turn_audio(session_id, turn.index, turn.model_audio_url, first_turn_ms=first_turn_ms)
+
+        await synthesize_script_audio(turns, user_id, scenario, on_turn_ready=on_turn_ready)
+    except Exception as exc:
+        detail = getattr(exc, "detail", None) or str(exc) or exc.__class__.__name__
+        logger.warning("Script generation failed for session %s: %s", session_id, detail)
+        if turns_written:
+            # synthesize_script_audio released the clips these turns point at.
+            await clear_session_turn_audio(session_id)
+        await set_session_status(session_id, SessionStatus.failed.value, error=str(detail))
+        return {"session_id": session_id, "status": SessionStatus.failed.value}
+
+    await set_session_status(session_id, SessionStatus.ready.value)
+    return {"session_id": session_id, "status": SessionStatus.ready.value}
+
+
+async def retrieve_session_generation_status(id: str, user_id: str) -> SessionGenerationStatus:
+    if not ObjectId.is_valid(id):
+        raise HTTPException(status_code=400, detail="Invalid session ID format")
+    session = await get_session({"_id": ObjectId(id), "userId": user_id})
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    turns = sorted(session.script.turns, key=lambda turn: turn.index)
+    ready_indices = [turn.index for turn in turns if turn.model_audio_url]
+    playable_turns = 0
+    for turn in turns:
+        if not turn.model_audio_url:
+            break
+        playable_turns += 1
+    generation = session.generation or SessionGeneration(
+        total_turns=len(turns), ready_turns=len(ready_indices)
+    )
+    return SessionGenerationStatus(
+        id=session.id,
+        status=session.status,
+        total_turns=generation.total_turns or len(turns),
+        ready_turns=len(ready_indices),
+        ready_turn_indices=ready_indices,
+        playable_turns=playable_turns,
+        first_turn_ms=generation.first_turn_ms,
+        error=generation.error,
+    )
+
+
 async def remove_session(session_id: str,user_id:str):
     if not ObjectId.is_valid(session_id):
         raise HTTPException(status_code=400, detail="Invalid session ID format")
@@ -49,8 +183,10 @@ async def remove_session(session_id: str,user_id:str):
 
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Session not found")
+    await delete_turn_analyses([session_id])
 
-    audio_urls = set()
+    # Keep repeats: shared TTS clips hold one reference per turn that uses them.
+    audio_urls = []
     script = getattr(session, "script", None)
     turns = getattr(script, "turns", None) if script else None
     if turns:
@@ -58,12 +194,14 @@ async def remove_session(session_id: str,user_id:str):
             model_audio = getattr(turn, "model_audio_url", None)
             user_audio = getattr(turn, "user_audio_url", None)
             if model_audio:
-                audio_urls.add(model_audio)
+                audio_urls.append(model_audio)
             if user_audio:
-                audio_urls.add(user_audio)
+                audio_urls.append(user_audio)
     if audio_urls:
         try:
-            await delete_audio_by_urls(list(audio_urls))
+            deletion = await delete_audio_objects(audio_urls)
+            if deletion.failed:
+                enqueue_audio_deletion(keys=deletion.failed_keys)
         except Exception:
             pass
 
@@ -71,12 +209,27 @@ async def remove_session(session_id: str,user_id:str):
     
     
     
-async def retrieve_session_by_session_id(id: str,user_id:str) -> SessionOut:
+SESSION_INCLUDES = ("analysis",)
+
+
+def parse_session_include(include: Optional[str]) -> set:
+    """``include=analysis`` (comma separated) opts a session read into the heavy extras."""
+    requested = {part.strip() for part in (include or "").split(",") if part.strip()}
+    unknown = requested.difference(SESSION_INCLUDES)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown include value(s): {', '.join(sorted(unknown))}. Allowed: {', '.join(SESSION_INCLUDES)}",
+        )
+    return requested
+
+
+async def retrieve_session_by_session_id(id: str,user_id:str,include_analysis: bool = False) -> SessionOut:
     if not ObjectId.is_valid(id):
         raise HTTPException(status_code=400, detail="Invalid session ID format")
 
     filter_dict = {"_id": ObjectId(id),"userId":user_id}
-    result = await get_session(filter_dict)
+    result = await get_session(filter_dict, include_speech_analysis=include_analysis)
 
     if not result:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -84,40 +237,126 @@ async def retrieve_session_by_session_id(id: str,user_id:str) -> SessionOut:
     return _with_stream_urls(result)
 
 
-async def retrieve_sessions(user_id:str,start=0,stop=100,filters:dict=None) -> List[SessionOut]:
+async def retrieve_sessions(user_id:str,start=0,stop=100,filters:dict=None,include_analysis: bool = False) -> List[SessionOut]:
     if filters is None:
         filters = {}
     filters["userId"] =user_id
-    sessions = await get_sessions(filter_dict=filters, start=start, stop=stop)
+    sessions = await get_sessions(
+        filter_dict=filters, start=start, stop=stop, include_speech_analysis=include_analysis
+    )
     return [_with_stream_urls(session) for session in sessions]
 
 
+async def retrieve_session_page(
+    user_id: str, limit: int, cursor: Optional[str] = None, filters: dict = None, include_analysis: bool = False
+) -> Tuple[List[SessionOut], Optional[str]]:
+    filters = {**(filters or {}), "userId": user_id}
+    sessions, next_cursor = await get_session_page(
+        filters, limit, cursor=cursor, include_speech_analysis=include_analysis
+    )
+    return [_with_stream_urls(session) for session in sessions], next_cursor
+
+
+def _session_doc_audio_urls(doc: Dict[str, Any]) -> List[str]:
+    turns = (doc.get("script") or {}).get("turns") or []
+    return [
+        url
+        for turn in turns
+        for url in (turn.get("model_audio_url"), turn.get("user_audio_url"))
+        if url
+    ]
+
+
 async def delete_sessions_for_user(userId: str, batch_size: int = 100) -> int:
     deleted = 0
+    failed_keys: List[str] = []
     while True:
-        sessions = await retrieve_sessions(user_id=userId, start=0, stop=batch_size)
-        if not sessions:
+        docs = await get_session_audio_refs({"userId": userId}, limit=batch_size)
+        if not docs:
             break
-        for session in sessions:
-            session_id = getattr(session, "id", None)
-            if not session_id:
-                continue
-            try:
-                await remove_session(session_id=session_id, user_id=userId)
-                deleted += 1
-            except HTTPException:
-                continue
+        deleted += await delete_sessions({"_id": {"$in": [doc["_id"] for doc in docs]}, "userId": userId})
+        # Shared TTS clips are released per reference here; the user's own
+        # objects are also swept by the prefix purge below. References that
+        # fail to release come back as failed keys and are retried with them,
+        # since the prefix purge does not cover tts/.
+        audio_urls = [url for doc in docs for url in _session_doc_audio_urls(doc)]
+        if audio_urls:
+            failed_keys.extend((await delete_audio_objects(audio_urls)).failed_keys)
+    await delete_turn_analyses_for_user(userId)
+    await delete_audio_with_retry(keys=failed_keys, prefixes=user_audio_prefixes(userId))
     return deleted
 
 
+def enqueue_audio_deletion(
+    keys: Optional[List[str]] = None,
+    prefixes: Optional[List[str]] = None,
+    attempt: int = 1,
+    countdown: int = 0,
+) -> None:
+    from celery_worker import celery_app
+
+    celery_app.send_task(
+        "celery_worker.run_async_task",
+        args=[
+            "delete_audio_keys",
+            {"keys": keys or [], "prefixes": prefixes or [], "attempt": attempt},
+        ],
+        countdown=countdown,
+    )
+
+
+async def delete_audio_with_retry(
+    keys: Optional[List[str]] = None,
+    prefixes: Optional[List[str]] = None,
+    attempt: int = 1,
+) -> dict:
+    """Delete R2 keys and prefixes, re-enqueueing whatever failed with backoff.
+
+    Shared clip keys drop one reference per occurrence, so only the keys
+    ``delete_audio_keys`` reports as failed are retried, never the whole list.
+    """
+    keys = list(keys or [])
+    prefixes = list(prefixes or [])
+    result = await delete_audio_keys(keys, prefixes)
+    retry_keys, retry_prefixes = result.failed_keys, result.failed_prefixes
+    deleted = len(result.deleted)
+    if retry_keys or retry_prefixes:
+        max_attempts = int(os.getenv("R2_DELETE_MAX_ATTEMPTS", "5"))
+        if attempt >= max_attempts:
+            logger.error(
+                "Giving up on deleting %d R2 keys and %d prefixes after %d attempts: %s",
+                len(retry_keys),
+                len(retry_prefixes),
+                attempt,
+                retry_keys[:20] + retry_prefixes,
+            )
+        else:
+            try:
+                enqueue_audio_deletion(
+                    keys=retry_keys,
+                    prefixes=retry_prefixes,
+                    attempt=attempt + 1,
+                    countdown=min(3600, 30 * 2 ** (attempt - 1)),
+                )
+            except Exception as exc:
+                logger.warning("Failed to enqueue R2 deletion retry: %s", exc)
+    return {"deleted": deleted, "failed_keys": len(retry_keys), "failed_prefixes": len(retry_prefixes)}
+
+
 async def retrieve_session_summaries(
     user_id: str, start: int = 0, stop: int = 100, filters: dict = None
 ) -> List[ListOfSessionOut]:
     if filters is None:
         filters = {}
     filters["userId"] = user_id
-    sessions = await get_sessions(filter_dict=filters, start=start, stop=stop)
-    return [ListOfSessionOut(**session.model_dump()) for session in sessions]
+    return await get_session_summaries(filter_dict=filters, start=start, stop=stop)
+
+
+async def retrieve_session_summary_page(
+    user_id: str, limit: int, cursor: Optional[str] = None, filters: dict = None
+) -> Tuple[List[ListOfSessionOut], Optional[str]]:
+    filters = {**(filters or {}), "userId": user_id}
+    return await get_session_summary_page(filter_dict=filters, limit=limit, cursor=cursor)
 
 
 
@@ -156,7 +395,13 @@ def _build_audio_stream_url(
     session_id: str,
     turn_index: int,
     audio_type: str,
+    stored_url: Optional[str] = None,
 ) -> str:
+    # Signed direct-to-storage URLs when AUDIO_URL_MODE allows, else the proxy.
+    if stored_url:
+        signed = signed_audio_url(session_id, turn_index, audio_type, extract_r2_key(stored_url))
+        if signed:
+            return signed
     return f"/v1/users/sessions/audio/{session_id}/{turn_index}?audio_type={audio_type}"
 
 
@@ -179,6 +424,7 @@ def _with_stream_urls(session: SessionOut) -> SessionOut:
                 session_id=session_id,
                 turn_index=turn_index,
                 audio_type="model",
+                stored_url=model_audio_url,
             )
         user_audio_url = getattr(turn, "user_audio_url", None)
         if user_audio_url:
@@ -186,5 +432,6 @@ def _with_stream_urls(session: SessionOut) -> SessionOut:
                 session_id=session_id,
                 turn_index=turn_index,
                 audio_type="user",
+                stored_url=user_audio_url,
             )
     return copy
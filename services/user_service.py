@@ -1,7 +1,6 @@
 
 import asyncio
 import logging
-import re
 import secrets
 from datetime import datetime, timedelta
 from bson import ObjectId
@@ -28,6 +27,7 @@ from dotenv import load_dotenv
 import httpx
 
 from services.email_service import send_password_reset_link
+from core.database import EMAIL_COLLATION
 from core.redis_cache import cache_get_json, cache_set_json
 load_dotenv()
 
@@ -308,9 +308,8 @@ async def user_reset_password_intiation(
 ) -> ResetPasswordInitiationResponse:
 
     email = user_details.email.strip()
-    user = await get_user(
-        filter_dict={"email": {"$regex": f"^{re.escape(email)}$", "$options": "i"}}
-    )
+    # Case-insensitive match served by the email_ci_idx collation index.
+    user = await get_user(filter_dict={"email": email}, collation=EMAIL_COLLATION)
     if user:
         reset_token = secrets.token_urlsafe(32)
         token = ResetTokenBase(
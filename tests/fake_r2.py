@@ -0,0 +1,133 @@
+"""In-memory S3/R2 stand-in served through ``httpx.MockTransport``.
+
+Covers the subset of the S3 API that ``R2ObjectStore`` uses. Point a store at
+it with ``R2ObjectStore(..., transport=FakeR2().transport())``.
+"""
+import hashlib
+import re
+import xml.etree.ElementTree as ET
+from email.utils import formatdate
+from typing import Dict, List, Optional, Set
+from urllib.parse import unquote
+
+import httpx
+
+
+class FakeR2:
+    def __init__(self, bucket: str = "bucket"):
+        self.bucket = bucket
+        self.objects: Dict[str, dict] = {}
+        self.uploads: Dict[str, Dict[int, bytes]] = {}
+        self.requests: List[httpx.Request] = []
+        self.fail_next: List[int] = []
+        self.fail_delete_keys: Set[str] = set()
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def put(self, key: str, data: bytes, content_type: str = "audio/mpeg") -> None:
+        self.objects[key] = {
+            "data": data,
+            "etag": f'"{hashlib.md5(data).hexdigest()}"',
+            "content_type": content_type,
+            "last_modified": formatdate(usegmt=True),
+        }
+
+    def _key(self, request: httpx.Request) -> Optional[str]:
+        path = unquote(request.url.path)
+        prefix = f"/{self.bucket}/"
+        return path[len(prefix):] if path.startswith(prefix) else None
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        assert request.headers["authorization"].startswith("AWS4-HMAC-SHA256 ")
+        if self.fail_next:
+            return httpx.Response(self.fail_next.pop(0))
+        key = self._key(request)
+        params = request.url.params
+        method = request.method
+        if key is None:
+            if method == "GET" and params.get("list-type") == "2":
+                return self._list(params)
+            if method == "POST" and "delete" in params:
+                return self._delete_many(request.content)
+            return httpx.Response(400)
+        if method == "POST" and "uploads" in params:
+            upload_id = f"upload-{len(self.uploads) + 1}"
+            self.uploads[upload_id] = {}
+            return httpx.Response(200, content=f"<InitiateMultipartUploadResult><UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>".encode())
+        if method == "PUT" and "uploadId" in params:
+            part = request.content
+            self.uploads[params["uploadId"]][int(params["partNumber"])] = part
+            return httpx.Response(200, headers={"etag": f'"{hashlib.md5(part).hexdigest()}"'})
+        if method == "POST" and "uploadId" in params:
+            parts = self.uploads.pop(params["uploadId"])
+            numbers = [int(n) for n in re.findall(rb"<PartNumber>(\d+)</PartNumber>", request.content)]
+            self.put(key, b"".join(parts[n] for n in numbers))
+            return httpx.Response(200, content=b"<CompleteMultipartUploadResult/>")
+        if method == "DELETE" and "uploadId" in params:
+            self.uploads.pop(params["uploadId"], None)
+            return httpx.Response(204)
+        if method == "PUT":
+            self.put(key, request.content, request.headers.get("content-type", "application/octet-stream"))
+            return httpx.Response(200, headers={"etag": self.objects[key]["etag"]})
+        if method == "DELETE":
+            self.objects.pop(key, None)
+            return httpx.Response(204)
+        obj = self.objects.get(key)
+        if obj is None:
+            return httpx.Response(404, content=b"<Error><Code>NoSuchKey</Code><Message>missing</Message></Error>")
+        headers = {
+            "etag": obj["etag"],
+            "content-type": obj["content_type"],
+            "last-modified": obj["last_modified"],
+            "accept-ranges": "bytes",
+        }
+        data = obj["data"]
+        range_header = request.headers.get("range")
+        if range_header and method == "GET":
+            match = re.fullmatch(r"bytes=(\d*)-(\d*)", range_header)
+            if not match:
+                return httpx.Response(416)
+            start_s, end_s = match.groups()
+            if start_s:
+                start = int(start_s)
+                end = min(int(end_s), len(data) - 1) if end_s else len(data) - 1
+            else:
+                start = max(0, len(data) - int(end_s))
+                end = len(data) - 1
+            if start >= len(data):
+                return httpx.Response(416)
+            headers["content-range"] = f"bytes {start}-{end}/{len(data)}"
+            return httpx.Response(206, headers=headers, content=data[start:end + 1])
+        if method == "HEAD":
+            headers["content-length"] = str(len(data))
+            return httpx.Response(200, headers=headers)
+        return httpx.Response(200, headers=headers, content=data)
+
+    def _list(self, params) -> httpx.Response:
+        prefix = params.get("prefix", "")
+        max_keys = int(params.get("max-keys", "1000"))
+        after = params.get("continuation-token") or params.get("start-after") or ""
+        keys = sorted(k for k in self.objects if k.startswith(prefix) and k > after)
+        page, rest = keys[:max_keys], keys[max_keys:]
+        contents = "".join(f"<Contents><Key>{k}</Key><Size>{len(self.objects[k]['data'])}</Size></Contents>" for k in page)
+        truncated = "true" if rest else "false"
+        token = f"<NextContinuationToken>{page[-1]}</NextContinuationToken>" if rest else ""
+        body = f'<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/"><IsTruncated>{truncated}</IsTruncated>{token}{contents}</ListBucketResult>'
+        return httpx.Response(200, content=body.encode())
+
+    def _delete_many(self, content: bytes) -> httpx.Response:
+        root = ET.fromstring(content)
+        quiet = (root.findtext("Quiet") or "").lower() == "true"
+        results = []
+        for element in root.iter():
+            if not element.tag.endswith("Key"):
+                continue
+            if element.text in self.fail_delete_keys:
+                results.append(f"<Error><Key>{element.text}</Key><Code>AccessDenied</Code><Message>denied</Message></Error>")
+                continue
+            self.objects.pop(element.text, None)
+            if not quiet:
+                results.append(f"<Deleted><Key>{element.text}</Key></Deleted>")
+        return httpx.Response(200, content=f"<DeleteResult>{''.join(results)}</DeleteResult>".encode())
@@ -0,0 +1,26 @@
+"""Random expected/ASR token pairs for grading tests and benchmarks."""
+import random
+from typing import List, Tuple
+
+VOCAB = [
+    "i", "would", "like", "a", "coffee", "please", "with", "milk", "and", "sugar",
+    "thank", "you", "very", "much", "could", "we", "book", "table", "for", "two",
+    "tonight", "espresso", "croissant", "reservation", "um", "uh",
+]
+
+
+def synthetic_turn(rng: random.Random, length: int) -> Tuple[List[str], List[str]]:
+    """``length`` expected tokens and an ASR version with drops, misreads and fillers."""
+    expected = [rng.choice(VOCAB) for _ in range(length)]
+    actual: List[str] = []
+    for token in expected:
+        roll = rng.random()
+        if roll < 0.05:
+            continue
+        if roll < 0.12:
+            actual.append(token[:-1] or token)
+        elif roll < 0.17:
+            actual.extend([token, "um"])
+        else:
+            actual.append(token)
+    return expected, actual
@@ -0,0 +1,93 @@
+import asyncio
+from types import SimpleNamespace
+
+import controller.script_generation.clients as clients
+from controller.script_generation.adaptive_concurrency import AdaptiveConcurrency
+from controller.script_generation.openai_scheduler import OpenAIScheduler
+
+
+def test_healthy_calls_grow_additively_and_429_halves():
+    controller = AdaptiveConcurrency("gpt-test", initial=2, min_limit=1, max_limit=8)
+    for _ in range(20):
+        controller.on_success(200.0)
+    grown = controller.limit
+
+    controller.on_rate_limited(retry_after_s=0.5)
+
+    assert 4 <= grown <= 8
+    assert controller.limit == grown / 2
+    # Growth pauses for the retry-after cooldown.
+    controller.on_success(200.0)
+    assert controller.limit == grown / 2
+
+
+def test_latency_spike_and_low_remaining_headers_back_off():
+    controller = AdaptiveConcurrency("gpt-test", initial=6, min_limit=1, max_limit=8)
+    controller.on_success(100.0)
+    for _ in range(10):
+        controller.on_success(1000.0)
+    assert controller.limit < 6
+
+    headers = AdaptiveConcurrency("tts", initial=6, min_limit=1, max_limit=8)
+    headers.on_headers({"x-ratelimit-remaining-requests": "3", "x-ratelimit-limit-requests": "100"})
+    assert headers.limit == 4.5
+    assert headers.snapshot()["remaining_ratio"] == 0.03
+
+
+def test_mixed_payload_sizes_are_not_read_as_congestion():
+    controller = AdaptiveConcurrency("tts", initial=4, min_limit=1, max_limit=4)
+    # Short and long turns interleaved: latency follows length, not load.
+    for _ in range(30):
+        controller.on_success(300.0, work_units=10)
+        controller.on_success(3000.0, work_units=1000)
+    assert controller.limit == 4
+    assert controller.counters["decreases"] == 0
+
+    # The same long turns getting three times slower still backs off.
+    for _ in range(10):
+        controller.on_success(9000.0, work_units=1000)
+    assert controller.limit < 4
+
+
+def test_scheduler_resize_admits_waiters_and_drains_on_shrink():
+    async def scenario():
+        scheduler = OpenAIScheduler(1)
+        await scheduler.acquire("chat", "a", budget_ms=0)
+        waiters = [asyncio.create_task(scheduler.acquire("chat", f"u{i}", budget_ms=0)) for i in range(2)]
+        await asyncio.sleep(0)
+        scheduler.set_slots(3)
+        await asyncio.gather(*waiters)
+        grown = scheduler.metrics()["in_use"]
+        scheduler.set_slots(1)
+        scheduler.release()
+        scheduler.release()
+        return grown, scheduler.metrics()["in_use"]
+
+    grown, after = asyncio.run(scenario())
+
+    assert grown == 3
+    assert after == 1
+
+
+def test_request_wrapper_feeds_per_model_controller(monkeypatch):
+    monkeypatch.setenv("OPENAI_RATE_LIMITER", "local")
+    monkeypatch.setenv("OPENAI_ADAPTIVE_CONCURRENCY", "1")
+    monkeypatch.setenv("OPENAI_MAX_CONCURRENCY", "1")
+    monkeypatch.setattr(clients, "_openai_schedulers", {})
+    monkeypatch.setattr(clients, "_openai_concurrency", {})
+    monkeypatch.setattr(clients, "_openai_quota_gate", None)
+
+    async def call():
+        await asyncio.sleep(0)
+        return SimpleNamespace(usage=None)
+
+    async def scenario():
+        for _ in range(5):
+            await clients.openai_request_with_retries(call, lane="interactive", model="asr-model")
+
+    asyncio.run(scenario())
+    metrics = clients.openai_scheduler_metrics()
+
+    assert set(metrics) == {"asr-model"}
+    assert metrics["asr-model"]["concurrency"]["successes"] == 5
+    assert metrics["asr-model"]["slots"] == metrics["asr-model"]["concurrency"]["limit"] >= 2
@@ -0,0 +1,232 @@
+import os
+import threading
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import api.v1.session as session_api
+import controller.script_generation.audio_disk_cache as audio_disk_cache
+import controller.script_generation.audio_proxy as audio_proxy
+from controller.script_generation.audio_proxy import RangeNotSatisfiable, parse_ranges
+from controller.script_generation.r2_store import ObjectMeta, R2ObjectStore
+from fake_r2 import FakeR2
+from schemas.session import SessionTurnAudio
+from security.auth import verify_token_user_role
+
+SESSION_ID = str(ObjectId())
+KEY = "tts/clip.mp3"
+AUDIO = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def proxy(monkeypatch):
+    monkeypatch.setenv("CLOUDFLARE_R2_BUCKET", "bucket")
+    monkeypatch.setenv("CLOUDFLARE_R2_PUBLIC_URL", "https://cdn.example")
+    fake = FakeR2()
+    fake.put(KEY, AUDIO)
+    store = R2ObjectStore("https://r2.example", "AKID", "secret", fake.bucket, transport=fake.transport())
+
+    async def fake_get_session_turn_audio(session_id, user_id, turn_index):
+        return SessionTurnAudio(turn_count=1, index=0, role="ai", model_audio_url=f"https://cdn.example/{KEY}")
+
+    monkeypatch.setattr(session_api, "get_session_turn_audio", fake_get_session_turn_audio)
+    monkeypatch.setattr(session_api, "get_r2_store", lambda: store)
+    monkeypatch.setattr(audio_proxy, "get_r2_store", lambda: store)
+    monkeypatch.setattr(audio_proxy, "_meta_cache", None)
+    monkeypatch.setattr(audio_disk_cache, "get_r2_store", lambda: store)
+    monkeypatch.setattr(audio_disk_cache, "_disk_cache", None)
+    monkeypatch.delenv("AUDIO_DISK_CACHE_DIR", raising=False)
+
+    app = FastAPI()
+    app.include_router(session_api.router)
+    app.dependency_overrides[verify_token_user_role] = lambda: SimpleNamespace(userId="u1")
+    with TestClient(app) as client:
+        yield SimpleNamespace(client=client, fake=fake, url=f"/sessions/audio/{SESSION_ID}/0")
+
+
+def _methods(fake):
+    return [request.method for request in fake.requests]
+
+
+def test_parse_ranges_merges_and_clamps():
+    assert parse_ranges("bytes=0-9,5-20,-10", 100) == [(0, 20), (90, 99)]
+    assert parse_ranges("bytes=50-", 100) == [(50, 99)]
+    assert parse_ranges("items=0-1", 100) is None
+    assert parse_ranges("bytes=9-3", 100) is None
+    with pytest.raises(RangeNotSatisfiable):
+        parse_ranges("bytes=100-200", 100)
+
+
+def test_range_requests_reuse_cached_metadata(proxy):
+    first = proxy.client.get(proxy.url, headers={"Range": "bytes=0-99"})
+    second = proxy.client.get(proxy.url, headers={"Range": "bytes=100-"})
+
+    assert first.status_code == 206 and first.content == AUDIO[:100]
+    assert first.headers["content-range"] == f"bytes 0-99/{len(AUDIO)}"
+    assert second.content == AUDIO[100:]
+    assert _methods(proxy.fake) == ["HEAD", "GET", "GET"]
+
+
+def test_conditional_requests_return_304_without_body_fetch(proxy):
+    full = proxy.client.get(proxy.url)
+    etag = full.headers["etag"]
+
+    by_etag = proxy.client.get(proxy.url, headers={"If-None-Match": f'W/{etag}, "other"'})
+    by_date = proxy.client.get(proxy.url, headers={"If-Modified-Since": full.headers["last-modified"]})
+    changed = proxy.client.get(proxy.url, headers={"If-None-Match": '"other"'})
+
+    assert full.status_code == 200 and full.content == AUDIO
+    assert by_etag.status_code == 304 and by_etag.content == b""
+    assert by_etag.headers["etag"] == etag
+    assert by_date.status_code == 304
+    assert changed.status_code == 200
+    assert _methods(proxy.fake) == ["HEAD", "GET", "GET"]
+
+
+def test_head_reports_length_without_touching_the_body(proxy):
+    response = proxy.client.head(proxy.url, headers={"Range": "bytes=10-19"})
+
+    assert response.status_code == 206
+    assert response.headers["content-length"] == "10"
+    assert response.headers["content-range"] == f"bytes 10-19/{len(AUDIO)}"
+    assert _methods(proxy.fake) == ["HEAD"]
+
+
+def test_multi_range_is_served_as_multipart_byteranges(proxy):
+    response = proxy.client.get(proxy.url, headers={"Range": "bytes=0-3,-4"})
+
+    assert response.status_code == 206
+    content_type = response.headers["content-type"]
+    assert content_type.startswith("multipart/byteranges; boundary=")
+    boundary = content_type.split("boundary=")[1]
+    body = response.content
+    assert int(response.headers["content-length"]) == len(body)
+    assert f"Content-Range: bytes 0-3/{len(AUDIO)}".encode() in body
+    assert f"Content-Range: bytes {len(AUDIO) - 4}-{len(AUDIO) - 1}/{len(AUDIO)}".encode() in body
+    assert AUDIO[:4] in body and AUDIO[-4:] in body
+    assert body.endswith(f"--{boundary}--\r\n".encode())
+
+
+def test_unsatisfiable_range_and_stale_if_range(proxy):
+    too_far = proxy.client.get(proxy.url, headers={"Range": f"bytes={len(AUDIO)}-"})
+    stale = proxy.client.get(proxy.url, headers={"Range": "bytes=0-9", "If-Range": '"old"'})
+
+    assert too_far.status_code == 416
+    assert too_far.headers["content-range"] == f"bytes */{len(AUDIO)}"
+    assert stale.status_code == 200 and stale.content == AUDIO
+
+
+def test_replaced_object_invalidates_cached_metadata(proxy):
+    proxy.client.head(proxy.url)
+    proxy.fake.put(KEY, b"new-audio")
+
+    response = proxy.client.get(proxy.url)
+
+    assert response.content == b"new-audio"
+    assert response.headers["content-length"] == str(len(b"new-audio"))
+    assert audio_proxy.get_object_meta_cache().get(KEY) is None
+
+
+def test_hot_clip_is_admitted_to_disk_and_served_from_it(proxy, monkeypatch, tmp_path):
+    monkeypatch.setenv("AUDIO_DISK_CACHE_DIR", str(tmp_path))
+    cache = audio_disk_cache.get_audio_disk_cache()
+
+    # Later ranges of the same play do not count towards admission.
+    proxy.client.get(proxy.url, headers={"Range": "bytes=0-99"})
+    proxy.client.get(proxy.url, headers={"Range": "bytes=100-"})
+    proxy.client.portal.call(cache.drain)
+    assert cache.metrics()["admitted"] == 0
+
+    proxy.client.get(proxy.url)
+    proxy.client.portal.call(cache.drain)
+    requests_before = len(proxy.fake.requests)
+
+    whole = proxy.client.get(proxy.url)
+    ranged = proxy.client.get(proxy.url, headers={"Range": "bytes=10-19"})
+
+    assert whole.content == AUDIO
+    assert whole.headers["etag"] == proxy.fake.objects[KEY]["etag"]
+    assert ranged.status_code == 206 and ranged.content == AUDIO[10:20]
+    assert len(proxy.fake.requests) == requests_before
+    metrics = cache.metrics()
+    assert metrics["populated"] == 1 and metrics["hits"] == 2
+    assert not [p for p in tmp_path.rglob("*") if p.suffix in {".tmp", ".lock"}]
+
+
+def test_population_skips_when_another_worker_holds_the_lock(proxy, monkeypatch, tmp_path):
+    monkeypatch.setenv("AUDIO_DISK_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("AUDIO_DISK_CACHE_ADMIT_AFTER", "1")
+    cache = audio_disk_cache.get_audio_disk_cache()
+    path = cache.path_for(KEY, proxy.fake.objects[KEY]["etag"])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path + ".lock", "w").close()
+
+    proxy.client.get(proxy.url)
+    proxy.client.portal.call(cache.drain)
+
+    assert cache.metrics()["lock_busy"] == 1
+    assert cache.lookup(KEY, proxy.fake.objects[KEY]["etag"]) is None
+
+
+def test_eviction_drops_least_recently_used_files(tmp_path, monkeypatch):
+    cache = audio_disk_cache.AudioDiskCache(str(tmp_path), max_bytes=250)
+    monkeypatch.setattr(audio_disk_cache, "_EVICTION_GRACE_S", 0.0)
+    paths = []
+    for i, mtime in enumerate([300, 100, 200]):
+        path = cache.path_for(f"k{i}", '"e"')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as handle:
+            handle.write(b"x" * 100)
+        os.utime(path, (mtime, mtime))
+        paths.append(path)
+
+    cache.evict()
+
+    remaining = [os.path.exists(path) for path in paths]
+    assert remaining == [True, False, True]
+    assert cache.metrics()["bytes_estimate"] == 200
+
+
+
+def test_first_population_scans_in_a_thread_and_rescans_when_stale(proxy, monkeypatch, tmp_path):
+    monkeypatch.setenv("AUDIO_DISK_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("AUDIO_DISK_CACHE_ADMIT_AFTER", "1")
+    scans = []
+    evict = audio_disk_cache.AudioDiskCache.evict
+
+    def tracked_evict(self):
+        scans.append(threading.current_thread() is threading.main_thread())
+        evict(self)
+
+    monkeypatch.setattr(audio_disk_cache.AudioDiskCache, "evict", tracked_evict)
+    cache = audio_disk_cache.get_audio_disk_cache()
+    assert scans == []
+
+    # Another worker already cached a clip.
+    other = cache.path_for("tts/other-worker.mp3", '"e"')
+    os.makedirs(os.path.dirname(other), exist_ok=True)
+    with open(other, "wb") as handle:
+        handle.write(b"x" * 100)
+
+    proxy.client.get(proxy.url)
+    proxy.client.portal.call(cache.drain)
+    assert scans == [False]
+    assert cache.metrics()["bytes_estimate"] == 100 + len(AUDIO)
+
+    # Once the scan is stale the next population rescans and sees the other
+    # worker's clip gone.
+    os.unlink(other)
+    cache._last_scan -= cache.rescan_s
+    proxy.fake.put("tts/second.mp3", AUDIO)
+    meta = ObjectMeta("tts/second.mp3", len(AUDIO), proxy.fake.objects["tts/second.mp3"]["etag"], None, None)
+
+    async def admit():
+        assert cache.consider("tts/second.mp3", meta)
+        await cache.drain()
+
+    proxy.client.portal.call(admit)
+    assert scans == [False, False]
+    assert cache.metrics()["bytes_estimate"] == 2 * len(AUDIO)
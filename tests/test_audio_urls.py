@@ -0,0 +1,107 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from fastapi import HTTPException
+
+import controller.script_generation.audio_urls as audio_urls
+import services.session_service as session_service
+from controller.script_generation.r2_store import R2ObjectStore
+from schemas.imports import FluencyScript, Turn
+from schemas.session import SessionOut
+
+
+@pytest.fixture
+def store(monkeypatch):
+    r2 = R2ObjectStore("https://account.r2.example.com", "AKIDEXAMPLE", "secret", "bucket")
+    monkeypatch.setattr(audio_urls, "get_r2_store", lambda: r2)
+    monkeypatch.setattr(audio_urls, "_cache", None)
+    monkeypatch.setenv("AUDIO_URL_MODE", "presigned")
+    monkeypatch.setenv("AUDIO_SIGNED_URL_TTL_S", "800")
+    yield r2
+    asyncio.run(r2.aclose())
+
+
+def test_presigned_url_matches_botocore(store):
+    pytest.importorskip("botocore")
+    from botocore.auth import S3SigV4QueryAuth
+    from botocore.awsrequest import AWSRequest
+    from botocore.credentials import Credentials
+
+    path = store.object_path("user-audio/u1/s1/turn 1.mp3")
+    request = AWSRequest(method="GET", url=f"https://account.r2.example.com{path}")
+    S3SigV4QueryAuth(Credentials("AKIDEXAMPLE", "secret"), "s3", "auto", expires=800).add_auth(request)
+    theirs = parse_qs(urlparse(request.url).query)
+    signed_at = audio_urls.datetime.datetime.strptime(theirs["X-Amz-Date"][0], "%Y%m%dT%H%M%SZ")
+
+    ours = parse_qs(urlparse(store.presign_get("user-audio/u1/s1/turn 1.mp3", 800, now=signed_at)).query)
+
+    assert ours["X-Amz-Signature"] == theirs["X-Amz-Signature"]
+    assert ours["X-Amz-Credential"] == theirs["X-Amz-Credential"]
+
+
+def test_signed_urls_are_cached_until_the_window_rolls(store):
+    first = audio_urls.signed_audio_url("s1", 0, "model", "tts/a.mp3", now=1000.0)
+    again = audio_urls.signed_audio_url("s1", 0, "model", "tts/a.mp3", now=1199.0)
+    # Another worker signing in the same window produces the same URL.
+    audio_urls._cache = None
+    other_worker = audio_urls.signed_audio_url("s1", 0, "model", "tts/a.mp3", now=1100.0)
+    rolled = audio_urls.signed_audio_url("s1", 0, "model", "tts/a.mp3", now=1200.0)
+
+    assert first == again == other_worker
+    assert rolled != first
+    assert parse_qs(urlparse(first).query)["X-Amz-Expires"] == ["800"]
+    assert audio_urls.get_signed_url_cache().metrics()["hits"] == 0
+    assert audio_urls.signed_audio_url("s1", 0, "model", "tts/b.mp3", now=1201.0) != rolled
+
+
+def test_hmac_mode_signs_public_bucket_path(monkeypatch):
+    monkeypatch.setattr(audio_urls, "_cache", None)
+    monkeypatch.setenv("AUDIO_URL_MODE", "hmac")
+    monkeypatch.setenv("AUDIO_SIGNED_URL_TTL_S", "800")
+    monkeypatch.setenv("CLOUDFLARE_R2_PUBLIC_URL", "https://cdn.example/")
+    monkeypatch.setenv("AUDIO_URL_HMAC_SECRET", "s3cret")
+
+    url = audio_urls.signed_audio_url("s1", 2, "user", "user-audio/u1/s1/turn-2.mp3", now=1050.0)
+
+    parsed = urlparse(url)
+    assert parsed.netloc == "cdn.example" and parsed.path == "/user-audio/u1/s1/turn-2.mp3"
+    timestamp, mac = parse_qs(parsed.query)["verify"][0].split("-", 1)
+    expected = hmac.new(b"s3cret", f"{parsed.path}{timestamp}".encode(), hashlib.sha256).digest()
+    assert timestamp == "1000"
+    assert base64.b64decode(mac) == expected
+
+
+def _session() -> SessionOut:
+    return SessionOut.model_construct(
+        id="s1",
+        script=FluencyScript.model_construct(
+            turns=[
+                Turn.model_construct(
+                    index=0,
+                    model_audio_url="https://cdn.example/tts/a.mp3",
+                    user_audio_url=None,
+                )
+            ]
+        ),
+    )
+
+
+def test_session_urls_fall_back_to_proxy(monkeypatch, store):
+    monkeypatch.setenv("CLOUDFLARE_R2_PUBLIC_URL", "https://cdn.example")
+    signed = session_service._with_stream_urls(_session()).script.turns[0].model_audio_url
+    assert signed.startswith("https://account.r2.example.com/bucket/tts/a.mp3?X-Amz-Algorithm=")
+
+    def missing_store():
+        raise HTTPException(status_code=500, detail="Missing Cloudflare R2 credentials")
+
+    monkeypatch.setattr(audio_urls, "get_r2_store", missing_store)
+    monkeypatch.setattr(audio_urls, "_cache", None)
+    proxied = session_service._with_stream_urls(_session()).script.turns[0].model_audio_url
+    assert proxied == "/v1/users/sessions/audio/s1/0?audio_type=model"
+
+    monkeypatch.setenv("AUDIO_URL_MODE", "proxy")
+    assert session_service._with_stream_urls(_session()).script.turns[0].model_audio_url == proxied
@@ -0,0 +1,34 @@
+import random
+
+from controller.grading.char_distance import (
+    _dp_distance,
+    char_distance_cache_info,
+    char_distances,
+    char_edit_distance,
+    clear_char_distance_cache,
+)
+
+
+def test_char_edit_distance_matches_dp():
+    rng = random.Random(7)
+    for _ in range(2000):
+        a = "".join(rng.choice("abcde'") for _ in range(rng.randint(0, 14)))
+        b = "".join(rng.choice("abcde'") for _ in range(rng.randint(0, 14)))
+        assert char_edit_distance(a, b) == _dp_distance(a, b)
+
+
+def test_char_edit_distance_long_words_fall_back_to_dp():
+    a = "ab" * 40
+    b = "ba" * 41
+    assert char_edit_distance(a, b) == _dp_distance(a, b)
+
+
+def test_char_distances_batch_and_cache():
+    clear_char_distance_cache()
+    pairs = [("coffee", "cofee"), ("coffee", "cofee"), ("", "um"), ("", "")]
+    results = char_distances(pairs)
+    assert results[0] == (1, 1 / 6)
+    assert results[1] == results[0]
+    assert results[2] == (2, 1.0)
+    assert results[3] == (0, 0.0)
+    assert char_distance_cache_info().hits >= 1
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from controller.grading import executor
+from controller.grading.executor import (
+    GradingJob,
+    grading_executor_metrics,
+    run_grading,
+    run_grading_job,
+    shutdown_grading_executor,
+)
+
+
+@pytest.mark.parametrize("mode", ["inline", "thread", "process"])
+def test_run_grading_matches_direct_job_in_every_mode(monkeypatch, mode):
+    monkeypatch.setenv("GRADING_EXECUTOR", mode)
+    monkeypatch.setenv("GRADING_EXECUTOR_WORKERS", "1")
+    job = GradingJob(
+        expected_text="I would like a coffee please",
+        transcript_text="um I would like a cofee please",
+        asr_model="test-model",
+    )
+    try:
+        output = asyncio.run(run_grading(job))
+    finally:
+        shutdown_grading_executor()
+
+    expected = run_grading_job(job)
+    assert output.score == expected.score
+    assert output.speech_analysis == expected.speech_analysis
+    assert output.mispronounced_words == ["coffee"]
+    assert output.filler_count == 2
+
+
+def test_grading_executor_metrics_track_queue_and_failures(monkeypatch):
+    monkeypatch.setenv("GRADING_EXECUTOR", "inline")
+    before = grading_executor_metrics()
+    asyncio.run(run_grading(GradingJob(expected_text="hello there", transcript_text="hello")))
+
+    def boom(job):
+        raise RuntimeError("grading failed")
+
+    monkeypatch.setattr(executor, "run_grading_job", boom)
+    with pytest.raises(RuntimeError):
+        asyncio.run(run_grading(GradingJob(expected_text="a", transcript_text="b")))
+
+    after = grading_executor_metrics()
+    assert after["mode"] == "inline"
+    assert after["submitted"] == before["submitted"] + 2
+    assert after["completed"] == before["completed"] + 1
+    assert after["failed"] == before["failed"] + 1
+    assert after["queue_depth"] == before["queue_depth"]
+
+
+def test_process_pool_warms_each_worker_once(monkeypatch):
+    pools = []
+
+    class FakePool:
+        def __init__(self, max_workers, mp_context, initializer):
+            self.initializer = initializer
+            self.submitted = []
+            pools.append(self)
+
+        def submit(self, fn, *args):
+            self.submitted.append(fn)
+
+        def shutdown(self, wait, cancel_futures):
+            pass
+
+    monkeypatch.setenv("GRADING_EXECUTOR", "process")
+    monkeypatch.setenv("GRADING_EXECUTOR_WORKERS", "3")
+    monkeypatch.setattr(executor, "ProcessPoolExecutor", FakePool)
+    try:
+        executor.start_grading_executor()
+    finally:
+        shutdown_grading_executor()
+
+    [pool] = pools
+    # The initializer does the warm-up; the submitted jobs only start workers.
+    assert pool.initializer is executor._warm_grading_worker
+    assert pool.submitted == [executor._start_grading_worker] * 3
@@ -0,0 +1,73 @@
+import asyncio
+import datetime
+
+from pymongo.errors import OperationFailure
+
+import core.database as database
+
+
+class FakeCollection:
+    def __init__(self, name, fail=False, stats=None):
+        self.name = name
+        self.fail = fail
+        self.created = []
+        self.stats = stats or []
+
+    async def create_indexes(self, models):
+        if self.fail:
+            raise OperationFailure("E11000 duplicate key error")
+        self.created.extend(model.document for model in models)
+
+    def aggregate(self, pipeline):
+        assert pipeline == [{"$indexStats": {}}]
+        stats = self.stats
+
+        class Cursor:
+            async def to_list(self, length):
+                return stats
+
+        return Cursor()
+
+
+class FakeDB(dict):
+    def __missing__(self, name):
+        self[name] = FakeCollection(name)
+        return self[name]
+
+
+def test_ensure_indexes_creates_declared_indexes_and_skips_failures(monkeypatch):
+    fake = FakeDB()
+    fake["notification_devices"] = FakeCollection("notification_devices", fail=True)
+    monkeypatch.setattr(database, "db", fake)
+
+    failed = asyncio.run(database.ensure_indexes())
+
+    assert failed == {"notification_devices": ["uniq_user_device"]}
+    by_name = {index["name"]: index for index in fake["users"].created}
+    assert by_name["email_ci_idx"]["collation"] == database.EMAIL_COLLATION
+    [ttl] = [index for index in fake["reset_tokens"].created if "expireAfterSeconds" in index]
+    assert dict(ttl["key"]) == {"expires_at": 1}
+    assert [dict(index["key"]) for index in fake["sessions"].created] == [
+        {"userId": 1, "last_updated": -1, "_id": -1},
+        {"userId": 1, "scenario": 1, "last_updated": -1, "_id": -1},
+    ]
+    assert set(fake) >= set(database.INDEXES)
+
+
+def test_index_report_lists_missing_and_unused(monkeypatch):
+    since = datetime.datetime(2026, 1, 1)
+    fake = FakeDB()
+    fake["sessions"] = FakeCollection(
+        "sessions",
+        stats=[
+            {"name": "_id_", "accesses": {"ops": 0, "since": since}},
+            {"name": "legacy_idx", "accesses": {"ops": 0, "since": since}},
+        ],
+    )
+    monkeypatch.setattr(database, "db", fake)
+
+    report = asyncio.run(database.index_report())
+
+    assert report["missing"]["sessions"] == ["user_last_updated_idx", "user_scenario_last_updated_idx"]
+    assert report["unused"] == {"sessions": [{"name": "legacy_idx", "since": since.isoformat()}]}
+    assert database.last_index_report() == report
@@ -0,0 +1,98 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import controller.script_generation.clients as clients
+import controller.script_generation.openai_limiter as limiter
+
+
+@pytest.fixture(autouse=True)
+def limiter_env(monkeypatch):
+    monkeypatch.setenv("OPENAI_MIN_INTERVAL_MS", "0")
+    monkeypatch.setenv("OPENAI_RATE_LIMITER", "redis")
+    monkeypatch.setattr(clients, "_openai_schedulers", {})
+    monkeypatch.setattr(clients, "_openai_concurrency", {})
+    monkeypatch.setattr(clients, "_openai_quota_gate", None)
+
+
+class _FakeRedis:
+    def __init__(self, decisions):
+        self.decisions = list(decisions)
+        self.acquire_args = []
+        self.reconciled = []
+        self.released = []
+
+    def acquire(self, keys, args):
+        self.acquire_args.append(args)
+        return self.decisions.pop(0)
+
+    def reconcile(self, keys, args):
+        self.reconciled.append(args[1])
+        return 1
+
+    def zrem(self, key, lease_id):
+        self.released.append(lease_id)
+        return 1
+
+
+def _install(monkeypatch, fake):
+    monkeypatch.setattr(limiter, "_acquire_script", fake.acquire)
+    monkeypatch.setattr(limiter, "_reconcile_script", fake.reconcile)
+    monkeypatch.setattr(limiter, "cache_db", SimpleNamespace(zrem=fake.zrem))
+
+
+def test_distributed_limiter_waits_releases_and_reconciles(monkeypatch):
+    fake = _FakeRedis([[0, 5], [0, -1], [1, 0]])
+    _install(monkeypatch, fake)
+
+    async def call():
+        return SimpleNamespace(usage=SimpleNamespace(total_tokens=130))
+
+    response = asyncio.run(clients.openai_request_with_retries(call, estimated_tokens=100))
+
+    assert response.usage.total_tokens == 130
+    assert len(fake.acquire_args) == 3
+    assert fake.acquire_args[0][2] == 100
+    assert fake.released == [fake.acquire_args[-1][4]]
+    assert fake.reconciled == [30]
+    assert clients.get_quota_gate().metrics()["admitted"] == 0
+
+
+def test_lease_released_when_call_fails(monkeypatch):
+    fake = _FakeRedis([[1, 0]])
+    _install(monkeypatch, fake)
+
+    async def call():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        asyncio.run(clients.openai_request_with_retries(call, estimated_tokens=10))
+
+    assert len(fake.released) == 1
+    assert fake.reconciled == []
+
+
+def test_falls_back_to_local_limiter_when_redis_fails(monkeypatch):
+    def broken(keys, args):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(limiter, "_acquire_script", broken)
+    before = limiter.openai_limiter_metrics()["local_fallbacks"]
+
+    async def call():
+        return {"usage": {"total_tokens": 4}, "text": "ok"}
+
+    response = asyncio.run(clients.openai_request_with_retries(call, estimated_tokens=10))
+
+    assert response["text"] == "ok"
+    assert limiter.openai_limiter_metrics()["local_fallbacks"] == before + 1
+    gate_metrics = clients.get_quota_gate().metrics()
+    assert gate_metrics["admitted_tokens"] == 10
+    assert gate_metrics["window_tokens"] == 4
+
+
+def test_response_token_usage_handles_missing_usage():
+    assert limiter.response_token_usage(b"mp3-bytes") is None
+    assert limiter.response_token_usage(SimpleNamespace(usage=None)) is None
+    assert limiter.response_token_usage(SimpleNamespace(usage=SimpleNamespace(total_tokens=12))) == 12
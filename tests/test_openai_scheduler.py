@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from controller.script_generation.openai_scheduler import OpenAIScheduler
+
+
+def test_freed_slot_goes_to_highest_lane_then_round_robin_users():
+    async def scenario():
+        scheduler = OpenAIScheduler(1)
+        order = []
+        await scheduler.acquire("batch", "holder", budget_ms=0)
+
+        async def call(lane, user, label):
+            async with scheduler.slot(lane, user, budget_ms=0):
+                order.append(label)
+
+        tasks = [
+            asyncio.create_task(call("batch", "u1", "tts-u1-a")),
+            asyncio.create_task(call("batch", "u1", "tts-u1-b")),
+            asyncio.create_task(call("batch", "u2", "tts-u2-a")),
+            asyncio.create_task(call("chat", "u3", "chat-u3")),
+            asyncio.create_task(call("interactive", "u4", "asr-u4")),
+        ]
+        await asyncio.sleep(0)
+        scheduler.release()
+        await asyncio.gather(*tasks)
+        return order, scheduler.metrics()
+
+    order, metrics = asyncio.run(scenario())
+
+    assert order == ["asr-u4", "chat-u3", "tts-u1-a", "tts-u2-a", "tts-u1-b"]
+    assert metrics["in_use"] == 0
+    assert metrics["lanes"]["batch"]["admitted"] == 4
+
+
+def test_waiter_is_shed_when_budget_expires():
+    async def scenario():
+        scheduler = OpenAIScheduler(1)
+        await scheduler.acquire("batch", "holder", budget_ms=0)
+        with pytest.raises(HTTPException) as excinfo:
+            await scheduler.acquire("chat", "u1", budget_ms=20)
+        scheduler.release()
+        return excinfo.value, scheduler.metrics()
+
+    error, metrics = asyncio.run(scenario())
+
+    assert error.status_code == 503
+    assert metrics["lanes"]["chat"]["shed"] == 1
+    assert metrics["lanes"]["chat"]["queued"] == 0
+    assert metrics["in_use"] == 0
+
+
+def test_admission_rejects_when_estimated_wait_exceeds_budget():
+    async def scenario():
+        scheduler = OpenAIScheduler(1)
+        scheduler._service_ms = 500.0
+        await scheduler.acquire("batch", "holder", budget_ms=0)
+        waiters = [asyncio.create_task(scheduler.acquire("interactive", f"u{i}", budget_ms=0)) for i in range(3)]
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException):
+            await scheduler.acquire("interactive", "late", budget_ms=1000)
+        for _ in range(4):
+            scheduler.release()
+        await asyncio.gather(*waiters)
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_does_not_leak_slot():
+    async def scenario():
+        scheduler = OpenAIScheduler(1)
+        await scheduler.acquire("chat", "holder", budget_ms=0)
+        waiter = asyncio.create_task(scheduler.acquire("chat", "u1", budget_ms=0))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        scheduler.release()
+        return scheduler.metrics()
+
+    metrics = asyncio.run(scenario())
+
+    assert metrics["in_use"] == 0
+    assert metrics["lanes"]["chat"]["queued"] == 0
+
+
+def test_slot_handed_over_as_budget_expires_is_used_not_leaked(monkeypatch):
+    import controller.script_generation.openai_scheduler as openai_scheduler
+
+    async def scenario():
+        scheduler = OpenAIScheduler(1)
+        await scheduler.acquire("chat", "holder", budget_ms=0)
+
+        async def handed_over_then_timed_out(future, timeout):
+            # The holder releases in the same tick the waiter's budget runs out.
+            scheduler.release()
+            raise asyncio.TimeoutError
+
+        monkeypatch.setattr(openai_scheduler.asyncio, "wait_for", handed_over_then_timed_out)
+        await scheduler.acquire("chat", "late", budget_ms=5000)
+        monkeypatch.undo()
+        admitted = scheduler.metrics()["in_use"]
+        scheduler.release()
+        return admitted, scheduler.metrics()
+
+    admitted, metrics = asyncio.run(scenario())
+
+    assert admitted == 1
+    assert metrics["in_use"] == 0
+    assert metrics["lanes"]["chat"]["shed"] == 0
@@ -0,0 +1,108 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+import repositories.admin_repo as admin_repo
+import repositories.session as session_repo
+from core.pagination import decode_cursor, encode_cursor, keyset_filter, next_cursor, page_size
+
+
+def test_cursor_round_trips_and_rejects_tampering():
+    doc_id = ObjectId()
+    cursor = encode_cursor("last_updated", 1700000000, doc_id)
+
+    assert decode_cursor(cursor, "last_updated") == (1700000000, doc_id)
+    for bad in ("not-a-cursor", cursor[:-4], encode_cursor("created_at", 1, doc_id)):
+        with pytest.raises(HTTPException) as error:
+            decode_cursor(bad, "last_updated")
+        assert error.value.status_code == 400
+
+
+def test_keyset_filter_starts_after_the_cursor_row():
+    doc_id = ObjectId()
+
+    assert keyset_filter({"userId": "u1"}, "last_updated", None) == {"userId": "u1"}
+    assert keyset_filter({"userId": "u1"}, "last_updated", encode_cursor("last_updated", 5, doc_id)) == {
+        "$and": [
+            {"userId": "u1"},
+            {
+                "$or": [
+                    {"last_updated": {"$lt": 5}},
+                    {"last_updated": None},
+                    {"last_updated": 5, "_id": {"$lt": doc_id}},
+                ]
+            },
+        ]
+    }
+    # Past the last dated row only undated rows remain, ordered by _id.
+    assert keyset_filter({}, "last_updated", encode_cursor("last_updated", None, doc_id)) == {
+        "last_updated": None,
+        "_id": {"$lt": doc_id},
+    }
+
+
+def test_next_cursor_trims_the_lookahead_row():
+    docs = [{"_id": ObjectId(), "created_at": n} for n in (3, 2, 1)]
+
+    following = next_cursor(docs, 2, "created_at")
+
+    assert [doc["created_at"] for doc in docs] == [3, 2]
+    assert decode_cursor(following, "created_at") == (2, docs[1]["_id"])
+    assert next_cursor(docs, 2, "created_at") is None
+    assert page_size(None) == 100 and page_size(0, 50) == 50 and page_size(10_000) == 200
+
+
+def test_session_summary_page_uses_the_raw_sort_key_for_the_cursor(monkeypatch):
+    ids = [ObjectId() for _ in range(3)]
+    pipelines = []
+
+    def aggregate(pipeline):
+        pipelines.append(pipeline)
+        docs = [
+            {"_id": session_id, "scenario": "cafe_ordering", "lastUpdated": 10 - i, "sort_key": None}
+            for i, session_id in enumerate(ids)
+        ]
+        return SimpleNamespace(to_list=lambda length: asyncio.sleep(0, docs))
+
+    monkeypatch.setattr(session_repo, "db", SimpleNamespace(sessions=SimpleNamespace(aggregate=aggregate)))
+
+    rows, following = asyncio.run(session_repo.get_session_summary_page({"userId": "u1"}, limit=2))
+
+    [pipeline] = pipelines
+    assert pipeline[1:3] == [{"$sort": {"last_updated": -1, "_id": -1}}, {"$limit": 3}]
+    assert [row.id for row in rows] == [str(ids[0]), str(ids[1])]
+    # Legacy rows only carry lastUpdated, so they are paged as undated rows.
+    assert decode_cursor(following, "last_updated") == (None, ids[1])
+
+
+def test_session_pages_report_database_errors_but_keep_bad_cursors_a_400(monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("mongo down")
+
+    monkeypatch.setattr(session_repo, "db", SimpleNamespace(sessions=SimpleNamespace(find=fail, aggregate=fail)))
+
+    for page in (session_repo.get_session_page, session_repo.get_session_summary_page):
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(page({"userId": "u1"}, 2))
+        assert error.value.status_code == 500
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(page({"userId": "u1"}, 2, "not-a-cursor"))
+        assert error.value.status_code == 400
+
+
+def test_admin_page_lists_the_super_admin_without_its_password_hash(monkeypatch):
+    docs = [{"_id": ObjectId(), "full_name": "Ada", "email": "ada@example.com", "password": "hash", "date_created": 1}]
+    find = lambda filter_dict: SimpleNamespace(
+        sort=lambda sort: SimpleNamespace(limit=lambda n: SimpleNamespace(to_list=lambda length: asyncio.sleep(0, list(docs))))
+    )
+    monkeypatch.setattr(admin_repo, "db", SimpleNamespace(admins=SimpleNamespace(find=find)))
+    monkeypatch.setattr(admin_repo, "SUPER_ADMIN_EMAIL", "root@example.com")
+
+    admins, following = asyncio.run(admin_repo.get_admin_page({}, limit=10))
+
+    assert following is None
+    assert [admin.id for admin in admins] == [str(docs[0]["_id"]), admin_repo.SUPER_ADMIN_ID]
+    assert [admin.password for admin in admins] == [None, None]
@@ -0,0 +1,70 @@
+import asyncio
+from types import SimpleNamespace
+
+from bson import ObjectId
+
+import repositories.admin_repo as admin_repo
+import repositories.session as session_repo
+import repositories.user_repo as user_repo
+
+
+class FakeAggregate:
+    def __init__(self, docs):
+        self.docs = docs
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        docs = self.docs
+
+        class Cursor:
+            async def to_list(self, length):
+                return docs[:length]
+
+        return Cursor()
+
+
+def test_turn_audio_projects_one_turn(monkeypatch):
+    sessions = FakeAggregate([{"turn_count": 3, "turn": {"index": 1, "role": "user", "user_audio_url": "https://cdn/u.mp3"}}])
+    monkeypatch.setattr(session_repo, "db", SimpleNamespace(sessions=sessions))
+    session_id = str(ObjectId())
+
+    turn = asyncio.run(session_repo.get_session_turn_audio(session_id, "u1", 1))
+
+    [pipeline] = sessions.pipelines
+    assert pipeline[0] == {"$match": {"_id": ObjectId(session_id), "userId": "u1"}}
+    project = pipeline[2]["$project"]
+    assert project["_id"] == 0
+    assert project["turn"]["$let"]["vars"]["t"]["$arrayElemAt"][1] == 1
+    assert set(project["turn"]["$let"]["in"]) == {"index", "role", "model_audio_url", "user_audio_url"}
+    assert (turn.turn_count, turn.index, turn.user_audio_url, turn.model_audio_url) == (3, 1, "https://cdn/u.mp3", None)
+
+
+def test_turn_audio_negative_index_and_missing_session(monkeypatch):
+    sessions = FakeAggregate([{"turn_count": 3, "turn": {}}])
+    monkeypatch.setattr(session_repo, "db", SimpleNamespace(sessions=sessions))
+    turn = asyncio.run(session_repo.get_session_turn_audio(str(ObjectId()), "u1", -1))
+    assert sessions.pipelines[0][2]["$project"]["turn"] == {"$literal": {}}
+    assert turn.turn_count == 3 and turn.index is None
+
+    sessions.docs = []
+    assert asyncio.run(session_repo.get_session_turn_audio(str(ObjectId()), "u1", 0)) is None
+
+
+def test_exists_checks_read_only_the_id(monkeypatch):
+    calls = []
+
+    async def find_one(filter_dict, projection=None):
+        calls.append((filter_dict, projection))
+        return {"_id": filter_dict["_id"]}
+
+    collection = SimpleNamespace(find_one=find_one)
+    monkeypatch.setattr(user_repo, "db", SimpleNamespace(users=collection))
+    monkeypatch.setattr(admin_repo, "db", SimpleNamespace(admins=collection))
+    user_id = str(ObjectId())
+
+    assert asyncio.run(user_repo.user_exists(user_id)) is True
+    assert asyncio.run(user_repo.user_exists("not-an-id")) is False
+    assert asyncio.run(admin_repo.admin_exists(user_id)) is True
+    assert asyncio.run(admin_repo.admin_exists(admin_repo.SUPER_ADMIN_ID)) is True
+    assert calls == [({"_id": ObjectId(user_id)}, {"_id": 1})] * 2
@@ -0,0 +1,83 @@
+import asyncio
+
+from controller.script_generation.quota_gate import QuotaGate
+
+
+def test_running_total_tracks_expiry_and_reconcile():
+    async def scenario():
+        gate = QuotaGate(window_s=0.05)
+        first = await gate.acquire(100, rpm_limit=10, tpm_limit=1000)
+        await gate.acquire(200, rpm_limit=10, tpm_limit=1000)
+        gate.reconcile(first, 40)
+        during = gate.metrics()
+        await asyncio.sleep(0.06)
+        return during, gate.metrics()
+
+    during, after = asyncio.run(scenario())
+
+    assert during["window_tokens"] == 240
+    assert during["window_requests"] == 2
+    assert after["window_tokens"] == 0
+    assert after["window_requests"] == 0
+
+
+def test_refund_wakes_head_waiter_before_window_expires():
+    async def scenario():
+        gate = QuotaGate(window_s=10.0)
+        ticket = await gate.acquire(900, rpm_limit=0, tpm_limit=1000)
+        waiter = asyncio.create_task(gate.acquire(500, rpm_limit=0, tpm_limit=1000))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        gate.reconcile(ticket, 300)
+        await asyncio.wait_for(waiter, timeout=1)
+        return gate.metrics()
+
+    metrics = asyncio.run(scenario())
+
+    assert metrics["window_tokens"] == 800
+    assert metrics["queued_admissions"] == 1
+
+
+def test_cancelled_head_hands_turn_to_next_waiter():
+    async def scenario():
+        gate = QuotaGate(window_s=0.05)
+        await gate.acquire(0, rpm_limit=1, tpm_limit=0)
+        head = asyncio.create_task(gate.acquire(0, rpm_limit=1, tpm_limit=0))
+        follower = asyncio.create_task(gate.acquire(0, rpm_limit=1, tpm_limit=0))
+        await asyncio.sleep(0.01)
+        head.cancel()
+        await asyncio.wait_for(follower, timeout=1)
+        return gate.metrics()
+
+    metrics = asyncio.run(scenario())
+
+    assert metrics["queue_depth"] == 0
+    assert metrics["admitted"] == 2
+
+
+def test_thousands_of_concurrent_callers_respect_limits_in_fifo_order():
+    callers = 3000
+    rpm_limit = 500
+    window_s = 0.02
+
+    async def scenario():
+        gate = QuotaGate(window_s=window_s)
+        admitted = []
+
+        async def call(index):
+            ticket = await gate.acquire(10, rpm_limit=rpm_limit, tpm_limit=0)
+            admitted.append((index, ticket.admitted_at))
+
+        await asyncio.gather(*[call(i) for i in range(callers)])
+        return admitted, gate.metrics()
+
+    admitted, metrics = asyncio.run(scenario())
+
+    assert [index for index, _ in admitted] == list(range(callers))
+    times = [at for _, at in admitted]
+    for start in range(0, callers - rpm_limit):
+        # Any rpm_limit + 1 consecutive admissions must span a full window.
+        assert times[start + rpm_limit] - times[start] > window_s
+    assert metrics["admitted"] == callers
+    assert metrics["queue_depth"] == 0
+    assert metrics["max_queue_depth"] == callers - rpm_limit
@@ -0,0 +1,172 @@
+import asyncio
+import datetime
+import hashlib
+import io
+
+import pytest
+
+from controller.script_generation.r2_store import MIN_PART_BYTES, R2NotFound, R2ObjectStore
+from fake_r2 import FakeR2
+
+
+def _store(fake: FakeR2, **kwargs) -> R2ObjectStore:
+    return R2ObjectStore(
+        "https://account.r2.example.com",
+        "AKIDEXAMPLE",
+        "secret",
+        fake.bucket,
+        transport=fake.transport(),
+        **kwargs,
+    )
+
+
+def test_signature_matches_botocore_sigv4():
+    pytest.importorskip("botocore")
+    from botocore.auth import S3SigV4Auth
+    from botocore.awsrequest import AWSRequest
+    from botocore.credentials import Credentials
+
+    store = R2ObjectStore("https://account.r2.example.com", "AKIDEXAMPLE", "secret", "bucket")
+    path = store.object_path("scripts/u1/turn 1.mp3")
+    body = b"audio-bytes"
+    request = AWSRequest(
+        method="PUT",
+        url=f"https://account.r2.example.com{path}?partNumber=2&uploadId=abc%2Fdef",
+        headers={"content-type": "audio/mpeg"},
+        data=body,
+    )
+    S3SigV4Auth(Credentials("AKIDEXAMPLE", "secret"), "s3", "auto").add_auth(request)
+    signed_at = datetime.datetime.strptime(request.headers["X-Amz-Date"], "%Y%m%dT%H%M%SZ")
+
+    ours = store.sign(
+        "PUT",
+        path,
+        {"partNumber": "2", "uploadId": "abc/def"},
+        {"content-type": "audio/mpeg"},
+        hashlib.sha256(body).hexdigest(),
+        now=signed_at,
+    )
+
+    assert ours["x-amz-content-sha256"] == request.headers["X-Amz-Content-SHA256"]
+    assert ours["authorization"] == request.headers["Authorization"]
+    asyncio.run(store.aclose())
+
+
+def test_put_get_range_head_delete_roundtrip():
+    fake = FakeR2()
+
+    async def scenario():
+        store = _store(fake)
+        await store.put_object("scripts/u1/a.mp3", b"0123456789", "audio/mpeg")
+        meta = await store.head_object("scripts/u1/a.mp3")
+        ranged = await store.get_object_stream("scripts/u1/a.mp3", range_header="bytes=2-5")
+        body = b"".join([chunk async for chunk in ranged.iter_chunks()])
+        whole = await store.get_object_bytes("scripts/u1/a.mp3")
+        await store.delete_object("scripts/u1/a.mp3")
+        with pytest.raises(R2NotFound):
+            await store.head_object("scripts/u1/a.mp3")
+        await store.aclose()
+        return meta, ranged, body, whole
+
+    meta, ranged, body, whole = asyncio.run(scenario())
+
+    assert meta.size == 10 and meta.content_type == "audio/mpeg"
+    assert ranged.status_code == 206
+    assert ranged.headers["content-range"] == "bytes 2-5/10"
+    assert body == b"2345"
+    assert whole == b"0123456789"
+
+
+def test_large_upload_uses_multipart_parts():
+    fake = FakeR2()
+    payload = bytes(range(256)) * (MIN_PART_BYTES * 2 // 256 + 1000)
+
+    async def scenario():
+        store = _store(fake, multipart_threshold=1024, part_size=MIN_PART_BYTES, part_concurrency=2)
+        await store.upload_fileobj(io.BytesIO(payload), "user-audio/u1/s1/turn-1.mp3", "audio/mpeg")
+        await store.aclose()
+
+    asyncio.run(scenario())
+
+    part_requests = [r for r in fake.requests if "partNumber" in r.url.params]
+    assert len(part_requests) == 3
+    assert fake.objects["user-audio/u1/s1/turn-1.mp3"]["data"] == payload
+    assert not fake.uploads
+
+
+def test_retryable_status_is_retried():
+    fake = FakeR2()
+    fake.fail_next = [503, 500]
+
+    async def scenario():
+        store = _store(fake, max_retries=3)
+        await store.put_object("k.mp3", b"abc")
+        await store.aclose()
+
+    asyncio.run(scenario())
+
+    assert fake.objects["k.mp3"]["data"] == b"abc"
+    assert len(fake.requests) == 3
+
+
+def test_delete_objects_batches_and_reports_failures():
+    fake = FakeR2()
+    keys = [f"user-audio/u1/s{i}/turn-0.mp3" for i in range(2500)]
+    for key in keys:
+        fake.put(key, b"x")
+    fake.fail_delete_keys = {keys[10], keys[2400]}
+
+    async def scenario():
+        store = _store(fake, delete_concurrency=2)
+        result = await store.delete_objects(keys + keys[:5])
+        await store.aclose()
+        return result
+
+    result = asyncio.run(scenario())
+
+    delete_requests = [r for r in fake.requests if "delete" in r.url.params]
+    assert len(delete_requests) == 3
+    assert all("content-md5" in r.headers for r in delete_requests)
+    assert sorted(result.failed_keys) == sorted([keys[10], keys[2400]])
+    assert result.failed[0].code == "AccessDenied"
+    assert len(result.deleted) == 2498
+    assert set(fake.objects) == {keys[10], keys[2400]}
+
+
+def test_failed_delete_batch_reports_every_key():
+    fake = FakeR2()
+    fake.put("a.mp3", b"x")
+    fake.fail_next = [403]
+
+    async def scenario():
+        store = _store(fake, max_retries=0)
+        result = await store.delete_objects(["a.mp3", "b.mp3"])
+        await store.aclose()
+        return result
+
+    result = asyncio.run(scenario())
+
+    assert result.deleted == []
+    assert result.failed_keys == ["a.mp3", "b.mp3"]
+    assert "a.mp3" in fake.objects
+
+
+def test_purge_prefix_pages_through_listing():
+    fake = FakeR2()
+    for i in range(25):
+        fake.put(f"scripts/u1/cafe/{i:02d}.mp3", b"x")
+    fake.put("scripts/u10/cafe/keep.mp3", b"x")
+    fake.put("tts/shared.mp3", b"x")
+
+    async def scenario():
+        store = _store(fake)
+        pages = [page async for page in store.list_keys("scripts/u1/", page_size=10)]
+        result = await store.purge_prefix("scripts/u1/")
+        await store.aclose()
+        return pages, result
+
+    pages, result = asyncio.run(scenario())
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert len(result.deleted) == 25 and not result.failed
+    assert set(fake.objects) == {"scripts/u10/cafe/keep.mp3", "tts/shared.mp3"}
@@ -16,3 +16,30 @@ def test_jwt_round_trip(monkeypatch):
     assert payload["access_token"] == "access-123"
     assert payload["user_id"] == "user-1"
     assert payload["role"] == "member"
+
+
+def test_refresh_accepts_an_access_token_past_its_ten_days(monkeypatch):
+    import time
+    from types import SimpleNamespace
+
+    from bson import ObjectId
+
+    import repositories.tokens_repo as tokens_repo
+    from core.database import INDEXES
+    from security.auth import verify_token_to_refresh
+
+    monkeypatch.setenv("JWT_SECRET", "test-secret")
+    token_id = ObjectId()
+    stored = {"_id": token_id, "userId": "user-1", "role": "member", "dateCreated": int(time.time()) - 11 * 86400}
+
+    async def find_one(filter_dict):
+        return stored if filter_dict == {"_id": token_id} else None
+
+    monkeypatch.setattr(tokens_repo, "db", SimpleNamespace(accessToken=SimpleNamespace(find_one=find_one)))
+    jwt_token = create_jwt_token(access_token=str(token_id), user_id="user-1", user_type="USER", is_activated=True)
+
+    assert tokens_repo.is_older_than_days(stored["dateCreated"])
+    result = asyncio.run(verify_token_to_refresh(SimpleNamespace(credentials=jwt_token)))
+    assert result.accesstoken == str(token_id)
+    # A TTL on accessToken would delete exactly this document.
+    assert not any("expireAfterSeconds" in index for index in INDEXES["accessToken"])
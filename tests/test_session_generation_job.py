@@ -0,0 +1,219 @@
+import asyncio
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+import controller.script_generation.generate as generate
+import controller.session_cleanup.cleanup as cleanup
+import services.session_service as session_service
+from schemas.imports import AIGeneratedTurns, FluencyScript, Turn
+from schemas.session import SessionGeneration, SessionOut
+
+
+def _fake_turns():
+    return [
+        AIGeneratedTurns(role="ai", text="Hi, what can I get you?"),
+        AIGeneratedTurns(role="user", text="A latte please."),
+        AIGeneratedTurns(role="ai", text="Coming right up."),
+    ]
+
+
+def _patch_repo(monkeypatch, calls):
+    async def fake_set_turns(session_id, turns):
+        calls.append(("turns", session_id, [turn["index"] for turn in turns]))
+        return True
+
+    async def fake_set_audio(session_id, turn_index, audio_url, first_turn_ms=None):
+        calls.append(("audio", turn_index, audio_url))
+        return True
+
+    async def fake_set_status(session_id, status, error=None):
+        calls.append(("status", status, error))
+        return True
+
+    monkeypatch.setattr(session_service, "set_session_script_turns", fake_set_turns)
+    monkeypatch.setattr(session_service, "set_session_turn_audio", fake_set_audio)
+    async def fake_clear_audio(session_id):
+        calls.append(("clear_audio", session_id))
+        return True
+
+    monkeypatch.setattr(session_service, "set_session_status", fake_set_status)
+    monkeypatch.setattr(session_service, "clear_session_turn_audio", fake_clear_audio)
+
+
+def test_generate_session_script_persists_turns_then_audio_then_ready(monkeypatch):
+    calls = []
+    _patch_repo(monkeypatch, calls)
+
+    async def fake_generate_turns(user_id, scenario):
+        return _fake_turns()
+
+    async def fake_synthesize(turns, user_id, scenario, on_turn_ready=None):
+        out = []
+        for index, turn in enumerate(turns):
+            script_turn = Turn(index=index, role=turn.role, text=turn.text, model_audio_url=f"https://cdn/{index}.mp3")
+            await on_turn_ready(script_turn)
+            out.append(script_turn)
+        return out
+
+    monkeypatch.setattr(session_service, "generate_script_turns", fake_generate_turns)
+    monkeypatch.setattr(session_service, "synthesize_script_audio", fake_synthesize)
+
+    result = asyncio.run(session_service.generate_session_script("s1", "u1", "cafe_ordering"))
+
+    assert result == {"session_id": "s1", "status": "ready"}
+    assert calls[0] == ("turns", "s1", [0, 1, 2])
+    assert [call[1] for call in calls if call[0] == "audio"] == [0, 1, 2]
+    assert calls[-1] == ("status", "ready", None)
+
+
+def test_generate_session_script_marks_failed_on_error(monkeypatch):
+    calls = []
+    _patch_repo(monkeypatch, calls)
+
+    async def fake_generate_turns(user_id, scenario):
+        raise HTTPException(status_code=502, detail="OpenAI unavailable")
+
+    monkeypatch.setattr(session_service, "generate_script_turns", fake_generate_turns)
+
+    result = asyncio.run(session_service.generate_session_script("s1", "u1", "cafe_ordering"))
+
+    assert result["status"] == "failed"
+    assert calls == [("status", "failed", "OpenAI unavailable")]
+
+
+def test_failed_synthesis_releases_clips_and_clears_session_audio(monkeypatch):
+    calls = []
+    released = []
+    _patch_repo(monkeypatch, calls)
+
+    async def fake_generate_turns(user_id, scenario):
+        return _fake_turns()
+
+    async def fake_generate_audio_url(client, text, voice, key_prefix, user_id=None):
+        if text == "Coming right up.":
+            raise HTTPException(status_code=502, detail="TTS unavailable")
+        return f"https://cdn/tts/{len(text)}.mp3"
+
+    async def fake_delete_audio_objects(audio_urls):
+        released.extend(audio_urls)
+
+    monkeypatch.setenv("AUDIO_GEN_CONCURRENCY", "1")
+    monkeypatch.setattr(session_service, "generate_script_turns", fake_generate_turns)
+    monkeypatch.setattr(generate, "get_openai_client", lambda: None)
+    monkeypatch.setattr(generate, "generate_audio_url", fake_generate_audio_url)
+    monkeypatch.setattr(generate, "delete_audio_objects", fake_delete_audio_objects)
+
+    result = asyncio.run(session_service.generate_session_script("s1", "u1", "cafe_ordering"))
+
+    assert result["status"] == "failed"
+    assert sorted(released) == ["https://cdn/tts/15.mp3", "https://cdn/tts/23.mp3"]
+    assert calls[-2:] == [("clear_audio", "s1"), ("status", "failed", "TTS unavailable")]
+
+
+def test_generation_skips_audio_for_a_deleted_session(monkeypatch):
+    calls = []
+    _patch_repo(monkeypatch, calls)
+
+    async def fake_generate_turns(user_id, scenario):
+        return _fake_turns()
+
+    async def gone(session_id, turns):
+        return False
+
+    async def fail_synthesize(*args, **kwargs):
+        raise AssertionError("synthesized audio for a deleted session")
+
+    monkeypatch.setattr(session_service, "generate_script_turns", fake_generate_turns)
+    monkeypatch.setattr(session_service, "set_session_script_turns", gone)
+    monkeypatch.setattr(session_service, "synthesize_script_audio", fail_synthesize)
+
+    result = asyncio.run(session_service.generate_session_script("s1", "u1", "cafe_ordering"))
+
+    assert result["status"] == "deleted"
+    assert calls == []
+
+
+def test_cleanup_deletes_background_sessions_that_never_got_a_script(monkeypatch):
+    deleted = []
+    sessions = {}
+    for status in ("failed", "generating", "ready"):
+        session_id = str(ObjectId())
+        sessions[session_id] = SessionOut(
+            id=session_id,
+            userId="u1",
+            scenario="cafe_ordering",
+            script=FluencyScript(totalNumberOfTurns=0, turns=[]),
+            status=status,
+            date_created=1,
+        )
+
+    async def fake_get_session(filter_dict, include_speech_analysis=False):
+        return sessions[str(filter_dict["_id"])]
+
+    async def fake_remove_session(session_id, user_id):
+        deleted.append(sessions[session_id].status.value)
+
+    monkeypatch.setattr(cleanup, "get_session", fake_get_session)
+    monkeypatch.setattr(session_service, "remove_session", fake_remove_session)
+    for session_id in sessions:
+        asyncio.run(cleanup.cleanup_incomplete_session(session_id, "u1", 1))
+
+    assert deleted == ["failed", "generating"]
+
+
+def test_synthesize_script_audio_starts_earliest_turns_first(monkeypatch):
+    monkeypatch.setenv("AUDIO_GEN_CONCURRENCY", "2")
+    started = []
+    ready = []
+
+    async def fake_generate_audio_url(client, text, voice, key_prefix, user_id=None):
+        index = int(text)
+        started.append(index)
+        # Later turns finish faster, so completion order alone would not
+        # keep turn 0 in front.
+        await asyncio.sleep(0.001 * (6 - index))
+        return f"https://cdn/{index}.mp3"
+
+    async def on_turn_ready(turn):
+        ready.append(turn.index)
+
+    monkeypatch.setattr(generate, "get_openai_client", lambda: None)
+    monkeypatch.setattr(generate, "generate_audio_url", fake_generate_audio_url)
+    turns = [AIGeneratedTurns(role="ai" if i % 2 == 0 else "user", text=str(i)) for i in range(6)]
+
+    result = asyncio.run(generate.synthesize_script_audio(turns, "u1", "cafe_ordering", on_turn_ready))
+
+    assert started == [0, 1, 2, 3, 4, 5]
+    assert [turn.index for turn in result] == [0, 1, 2, 3, 4, 5]
+    assert ready.index(0) < ready.index(2)
+    assert sorted(ready) == [0, 1, 2, 3, 4, 5]
+
+
+def test_generation_status_reports_playable_prefix(monkeypatch):
+    session_id = str(ObjectId())
+    turns = [
+        Turn(index=0, role="ai", text="a", model_audio_url="https://cdn/0.mp3"),
+        Turn(index=1, role="user", text="b", model_audio_url="https://cdn/1.mp3"),
+        Turn(index=2, role="ai", text="c"),
+        Turn(index=3, role="user", text="d", model_audio_url="https://cdn/3.mp3"),
+    ]
+    session = SessionOut(
+        id=session_id,
+        userId="u1",
+        scenario="cafe_ordering",
+        script=FluencyScript(totalNumberOfTurns=4, turns=turns),
+        status="generating",
+        generation=SessionGeneration(total_turns=4, ready_turns=3, first_turn_ms=850),
+    )
+
+    async def fake_get_session(filter_dict, include_speech_analysis=True):
+        return session
+
+    monkeypatch.setattr(session_service, "get_session", fake_get_session)
+
+    status = asyncio.run(session_service.retrieve_session_generation_status(session_id, "u1"))
+
+    assert status.ready_turn_indices == [0, 1, 3]
+    assert status.playable_turns == 2
+    assert status.first_turn_ms == 850
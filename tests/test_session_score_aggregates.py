@@ -0,0 +1,104 @@
+import asyncio
+from types import SimpleNamespace
+
+from bson import ObjectId
+
+import repositories.session as session_repo
+from schemas.imports import TurnScore, TurnUpdate
+from schemas.session import FluencyScript, ScriptTurnsUpdate, SessionOut, SessionUpdate, _calculate_completed
+
+SESSION_ID = ObjectId()
+
+
+def _doc(**extra):
+    return {
+        "_id": SESSION_ID,
+        "userId": "u1",
+        "scenario": "cafe_ordering",
+        "script": {
+            "totalNumberOfTurns": 2,
+            "turns": [
+                {"index": 0, "role": "ai", "text": "Hi"},
+                {"index": 1, "role": "user", "text": "Hello", "score": {"confidence": 80, "fluency": 70, "hesitation": 60}},
+            ],
+        },
+        **extra,
+    }
+
+
+def test_update_is_one_pipeline_write_that_recomputes_aggregates(monkeypatch):
+    calls = []
+
+    async def find_one_and_update(filter_dict, update, **kwargs):
+        calls.append((filter_dict, update, kwargs))
+        return _doc(average_score=70.0, completed=True, scored_user_turns=1, last_scored_at=123)
+
+    monkeypatch.setattr(session_repo, "db", SimpleNamespace(sessions=SimpleNamespace(find_one_and_update=find_one_and_update)))
+
+    update = SessionUpdate(
+        script=ScriptTurnsUpdate(
+            turns=[TurnUpdate(index=1, score=TurnScore(confidence=80, fluency=70, hesitation=60), mispronounced_words=["$where"])]
+        )
+    )
+    out = asyncio.run(session_repo.update_session({"_id": SESSION_ID}, update))
+
+    [(_, pipeline, kwargs)] = calls
+    assert "array_filters" not in kwargs
+    turns_stage, aggregates_stage = pipeline
+    fields = turns_stage["$set"]
+    assert set(fields) == {"last_updated", "script.turns", "last_scored_at"}
+    merge = fields["script.turns"]["$map"]["in"]["$cond"][1]["$mergeObjects"][1]
+    assert merge == {"$literal": {"score": {"confidence": 80, "fluency": 70, "hesitation": 60}, "mispronounced_words": ["$where"]}}
+    assert aggregates_stage == {"$set": session_repo.SCORE_AGGREGATES}
+    assert out.scored_user_turns == 1 and out.average_score == 70.0 and out.completed is True
+
+
+def test_reads_use_stored_aggregates_and_compute_for_old_documents():
+    stored = SessionOut(**_doc(average_score=55.0, completed=False, scored_user_turns=1))
+    legacy = SessionOut(**_doc())
+
+    assert stored.average_score == 55.0 and stored.completed is False
+    assert legacy.average_score == 70.0 and legacy.completed is True
+    assert legacy.scored_user_turns is None
+
+
+def _evaluate(expr, doc, variables=None):
+    """Just enough of the aggregation expression language for SCORE_AGGREGATES."""
+    variables = variables or {}
+    if isinstance(expr, str) and expr.startswith("$"):
+        name, *path = expr.lstrip("$").split(".")
+        value = variables[name] if expr.startswith("$$") else doc.get(name)
+        for part in path:
+            value = value.get(part) if isinstance(value, dict) else None
+        return value
+    if isinstance(expr, list):
+        return [_evaluate(item, doc, variables) for item in expr]
+    if not isinstance(expr, dict):
+        return expr
+    [(op, arg)] = expr.items()
+    if op in ("$map", "$filter"):
+        items = _evaluate(arg["input"], doc, variables)
+        body = arg["in"] if op == "$map" else arg["cond"]
+        results = [_evaluate(body, doc, {**variables, arg["as"]: item}) for item in items]
+        return results if op == "$map" else [item for item, keep in zip(items, results) if keep]
+    if op == "$size":
+        return len(_evaluate(arg, doc, variables))
+    args = _evaluate(arg, doc, variables)
+    return {
+        "$ifNull": lambda: args[0] if args[0] is not None else args[1],
+        "$eq": lambda: args[0] == args[1],
+        "$ne": lambda: args[0] != args[1],
+        "$gt": lambda: args[0] > args[1],
+        "$and": lambda: all(args),
+        "$allElementsTrue": lambda: all(args[0]),
+    }[op]()
+
+
+def test_completed_expression_matches_python_for_sessions_without_turns():
+    scored = _doc()["script"]
+    unscored = {"totalNumberOfTurns": 1, "turns": [{"index": 0, "role": "user", "text": "Hi"}]}
+    ai_only = {"totalNumberOfTurns": 1, "turns": [{"index": 0, "role": "ai", "text": "Hi"}]}
+    for script in (None, {"totalNumberOfTurns": 0, "turns": []}, ai_only, unscored, scored):
+        doc = {"status": "generating"} if script is None else {"script": script}
+        expected = _calculate_completed(FluencyScript(**script) if script else None)
+        assert _evaluate(session_repo.SCORE_AGGREGATES["completed"], doc) is expected
@@ -1,29 +1,129 @@
 import asyncio
 import pytest
-from types import SimpleNamespace
 
 import services.session_service as session_service
+from controller.script_generation.r2_store import DeleteFailure, DeleteResult
+
+
+def _doc(session_id, *urls):
+    return {"_id": session_id, "script": {"turns": [{"model_audio_url": url} for url in urls]}}
 
 
 def test_delete_sessions_for_user_deletes_all(monkeypatch):
     batches = [
-        [SimpleNamespace(id="s1"), SimpleNamespace(id="s2")],
+        [_doc("s1", "https://cdn/tts/a.mp3"), _doc("s2", "https://cdn/tts/a.mp3", None)],
         [],
     ]
-    removed = []
+    deleted_filters = []
+    audio_batches = []
+    purges = []
 
-    async def fake_retrieve_sessions(user_id, start=0, stop=100, filters=None):
+    async def fake_get_refs(filter_dict, limit=100):
+        assert filter_dict == {"userId": "user-1"} and limit == 2
         return batches.pop(0)
 
-    async def fake_remove_session(session_id, user_id):
-        removed.append((session_id, user_id))
+    async def fake_delete_sessions(filter_dict):
+        deleted_filters.append(filter_dict)
+        return len(filter_dict["_id"]["$in"])
+
+    async def fake_delete_audio_objects(urls):
+        audio_batches.append(urls)
+        return DeleteResult(deleted=["tts/a.mp3"])
+
+    async def fake_delete_audio_with_retry(keys=None, prefixes=None, attempt=1):
+        purges.append((keys, prefixes))
 
-    monkeypatch.setattr(session_service, "retrieve_sessions", fake_retrieve_sessions)
-    monkeypatch.setattr(session_service, "remove_session", fake_remove_session)
+    analysis_deletes = []
+
+    async def fake_delete_turn_analyses_for_user(user_id):
+        analysis_deletes.append(user_id)
+        return 3
+
+    monkeypatch.setattr(session_service, "get_session_audio_refs", fake_get_refs)
+    monkeypatch.setattr(session_service, "delete_sessions", fake_delete_sessions)
+    monkeypatch.setattr(session_service, "delete_audio_objects", fake_delete_audio_objects)
+    monkeypatch.setattr(session_service, "delete_audio_with_retry", fake_delete_audio_with_retry)
+    monkeypatch.setattr(session_service, "delete_turn_analyses_for_user", fake_delete_turn_analyses_for_user)
 
     deleted = asyncio.run(
         session_service.delete_sessions_for_user("user-1", batch_size=2)
     )
 
     assert deleted == 2
-    assert removed == [("s1", "user-1"), ("s2", "user-1")]
+    assert deleted_filters == [{"_id": {"$in": ["s1", "s2"]}, "userId": "user-1"}]
+    assert audio_batches == [["https://cdn/tts/a.mp3", "https://cdn/tts/a.mp3"]]
+    assert purges == [([], ["user-audio/user-1/", "scripts/user-1/"])]
+    assert analysis_deletes == ["user-1"]
+
+
+def test_failed_audio_deletes_are_requeued_with_backoff(monkeypatch):
+    calls = []
+    enqueued = []
+
+    async def fake_delete_audio_keys(keys, prefixes):
+        calls.append((keys, prefixes))
+        return DeleteResult(deleted=["a"], failed=[DeleteFailure("b", "InternalError", "")])
+
+    def fake_enqueue(keys=None, prefixes=None, attempt=1, countdown=0):
+        enqueued.append((keys, prefixes, attempt, countdown))
+
+    monkeypatch.setattr(session_service, "delete_audio_keys", fake_delete_audio_keys)
+    monkeypatch.setattr(session_service, "enqueue_audio_deletion", fake_enqueue)
+    monkeypatch.setenv("R2_DELETE_MAX_ATTEMPTS", "3")
+
+    summary = asyncio.run(session_service.delete_audio_with_retry(keys=["a", "b"], prefixes=["p/"], attempt=2))
+    asyncio.run(session_service.delete_audio_with_retry(keys=["b"], attempt=3))
+
+    assert calls == [(["a", "b"], ["p/"]), (["b"], [])]
+    assert summary == {"deleted": 1, "failed_keys": 1, "failed_prefixes": 0}
+    # The last allowed attempt gives up instead of re-enqueueing.
+    assert enqueued == [(["b"], [], 3, 60)]
+
+
+def test_purge_listing_failures_retry_only_the_prefix(monkeypatch):
+    enqueued = []
+
+    async def fake_delete_audio_keys(keys, prefixes):
+        return DeleteResult(deleted=list(keys), failed_prefixes=list(prefixes))
+
+    def fake_enqueue(keys=None, prefixes=None, attempt=1, countdown=0):
+        enqueued.append((keys, prefixes, attempt))
+
+    monkeypatch.setattr(session_service, "delete_audio_keys", fake_delete_audio_keys)
+    monkeypatch.setattr(session_service, "enqueue_audio_deletion", fake_enqueue)
+
+    summary = asyncio.run(session_service.delete_audio_with_retry(keys=["tts/a.mp3"], prefixes=["p/"]))
+
+    # Resending tts/a.mp3 would drop a second reference to the shared clip.
+    assert enqueued == [([], ["p/"], 2)]
+    assert summary == {"deleted": 1, "failed_keys": 0, "failed_prefixes": 1}
+
+
+def test_unreleased_shared_clips_are_handed_to_the_retry(monkeypatch):
+    batches = [[_doc("s1", "https://cdn/tts/a.mp3")], []]
+    retries = []
+
+    async def fake_get_refs(filter_dict, limit=100):
+        return batches.pop(0)
+
+    async def fake_delete_sessions(filter_dict):
+        return 1
+
+    async def fake_delete_audio_objects(urls):
+        return DeleteResult(failed=[DeleteFailure("tts/a.mp3", "ReleaseFailed", "")])
+
+    async def fake_delete_audio_with_retry(keys=None, prefixes=None, attempt=1):
+        retries.append(keys)
+
+    async def fake_delete_turn_analyses_for_user(user_id):
+        return 0
+
+    monkeypatch.setattr(session_service, "get_session_audio_refs", fake_get_refs)
+    monkeypatch.setattr(session_service, "delete_sessions", fake_delete_sessions)
+    monkeypatch.setattr(session_service, "delete_audio_objects", fake_delete_audio_objects)
+    monkeypatch.setattr(session_service, "delete_audio_with_retry", fake_delete_audio_with_retry)
+    monkeypatch.setattr(session_service, "delete_turn_analyses_for_user", fake_delete_turn_analyses_for_user)
+
+    asyncio.run(session_service.delete_sessions_for_user("user-1"))
+
+    assert retries == [["tts/a.mp3"]]
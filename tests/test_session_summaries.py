@@ -0,0 +1,57 @@
+import asyncio
+from types import SimpleNamespace
+
+from bson import ObjectId
+
+import repositories.session as session_repo
+import services.session_service as session_service
+
+
+class _FakeCursor:
+    def __init__(self, docs):
+        self._docs = list(docs)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._docs:
+            raise StopAsyncIteration
+        return self._docs.pop(0)
+
+
+def test_summaries_use_a_projection_and_accept_old_documents(monkeypatch):
+    pipelines = []
+    legacy_id, new_id = ObjectId(), ObjectId()
+    docs = [
+        # Written before sessions had a status; the pipeline already folded lastUpdated in.
+        {"_id": legacy_id, "scenario": "airport_checkin", "last_updated": 1700, "totalNumberOfTurns": 4, "average_score": 72.5},
+        {"_id": new_id, "scenario": "cafe_ordering", "status": "generating", "last_updated": None, "totalNumberOfTurns": 0, "average_score": None},
+    ]
+
+    def aggregate(pipeline):
+        pipelines.append(pipeline)
+        return _FakeCursor(docs)
+
+    monkeypatch.setattr(session_repo, "db", SimpleNamespace(sessions=SimpleNamespace(aggregate=aggregate)))
+
+    summaries = asyncio.run(
+        session_service.retrieve_session_summaries("user-1", start=10, stop=30, filters={"scenario": "cafe_ordering"})
+    )
+
+    [pipeline] = pipelines
+    assert pipeline[:4] == [
+        {"$match": {"scenario": "cafe_ordering", "userId": "user-1"}},
+        {"$sort": {"last_updated": -1, "_id": -1}},
+        {"$skip": 10},
+        {"$limit": 20},
+    ]
+    projection = pipeline[4]["$project"]
+    assert "script" not in projection
+    assert projection["last_updated"] == {"$ifNull": ["$last_updated", "$lastUpdated"]}
+
+    first, second = summaries
+    assert first.id == str(legacy_id) and first.scenario.value == "airport_check_in"
+    assert first.status.value == "ready" and first.average_score == 72.5
+    assert first.model_dump(by_alias=True)["totalNumberOfTurns"] == 4
+    assert second.status.value == "generating" and second.average_score is None
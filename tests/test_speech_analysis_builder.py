@@ -1,8 +1,15 @@
 import math
+import random
 
-from controller.grading.speech_analysis_builder import build_speech_analysis
-from controller.grading.scoring import MISPRONOUNCED_THRESHOLD
+from controller.grading.speech_analysis_builder import (
+    build_speech_analysis,
+    project_speech_analysis,
+)
+from controller.grading.scoring import MISPRONOUNCED_THRESHOLD, compute_scores, grade_turn
 from controller.grading.text_align import align_words, tokenize
+from grading_reference import reference_build_speech_analysis, reference_compute_scores
+from schemas.imports import TurnScore
+from synthetic_turns import synthetic_turn
 
 
 def test_build_speech_analysis_near_miss():
@@ -31,3 +38,54 @@ def test_build_speech_analysis_near_miss():
     assert math.isclose(analysis.alignment_summary.wer, 1 / 3, rel_tol=1e-5)
     ignored_reasons = {item.ignored_because for item in analysis.ignored_differences}
     assert "exact_match" in ignored_reasons
+
+
+def _assert_matches_reference(expected_text, asr_text, leniency=1.0):
+    expected_tokens = tokenize(expected_text)
+    actual_tokens = tokenize(asr_text)
+    reference = reference_compute_scores(expected_tokens, actual_tokens, leniency)
+    confidence, fluency, hesitation, wer, _, _, alignment, mispronounced = reference
+    legacy = reference_build_speech_analysis(
+        expected_text=expected_text,
+        asr_text=asr_text,
+        expected_tokens=expected_tokens,
+        actual_tokens=actual_tokens,
+        alignment=alignment,
+        mispronounced_words=mispronounced,
+        threshold=MISPRONOUNCED_THRESHOLD,
+        asr_model="test-model",
+        asr_parameters={},
+    )
+
+    result = grade_turn(expected_tokens, actual_tokens, leniency)
+    projected = project_speech_analysis(
+        result,
+        expected_text=expected_text,
+        asr_text=asr_text,
+        asr_model="test-model",
+        asr_parameters={},
+    )
+
+    assert projected == legacy
+    assert result.turn_score() == TurnScore(
+        confidence=confidence, fluency=fluency, hesitation=hesitation
+    )
+    assert result.wer == wer
+    assert result.mispronounced_words == mispronounced
+    live = compute_scores(expected_tokens, actual_tokens, leniency)
+    assert live[:6] == reference[:6] and live[7] == mispronounced
+    return result
+
+
+def test_grade_turn_projection_matches_frozen_two_pass_path():
+    result = _assert_matches_reference("I would like a coffee please", "um i would like a cofee cofee plese")
+    assert "coffee" in result.mispronounced_words
+    assert {pair.decision for pair in result.pairs} >= {"exact_match", "insertion", "near_miss"}
+
+
+def test_grade_turn_matches_frozen_two_pass_path_on_random_turns():
+    rng = random.Random(3)
+    for length in (1, 5, 20, 80):
+        for _ in range(15):
+            expected, actual = synthetic_turn(rng, length)
+            _assert_matches_reference(" ".join(expected), " ".join(actual), leniency=rng.choice([0.5, 1.0, 1.5]))
@@ -0,0 +1,51 @@
+import random
+
+import bson
+
+from controller.grading.scoring import grade_turn
+from controller.grading.speech_analysis_builder import project_speech_analysis
+from schemas.imports import Turn
+from schemas.speech_analysis import Token
+from schemas.speech_analysis_codec import decode_speech_analysis, encode_speech_analysis, is_compact
+from synthetic_turns import synthetic_turn
+
+
+def _graded_analysis(rng: random.Random, length: int):
+    expected, actual = synthetic_turn(rng, length)
+    result = grade_turn(expected, actual, 1.0)
+    return project_speech_analysis(result, expected_text=" ".join(expected), asr_text=" ".join(actual))
+
+
+def test_round_trip_matches_graded_turns():
+    rng = random.Random(3)
+    for length in list(range(0, 6)) + [rng.randint(8, 40) for _ in range(200)]:
+        analysis = _graded_analysis(rng, length)
+        compact = encode_speech_analysis(analysis)
+        assert is_compact(compact)
+        # Through BSON, as stored: bytes come back as bytes, tuples as lists.
+        stored = bson.decode(bson.encode({"a": compact}))["a"]
+        assert decode_speech_analysis(stored).model_dump() == analysis.model_dump()
+
+
+def test_compact_form_is_much_smaller():
+    rng = random.Random(5)
+    analysis = _graded_analysis(rng, 20)
+    full = len(bson.encode(analysis.model_dump()))
+    compact = len(bson.encode(encode_speech_analysis(analysis)))
+    assert compact * 3 < full
+
+
+def test_turn_reads_both_storage_forms():
+    analysis = _graded_analysis(random.Random(9), 12)
+    base = {"index": 1, "role": "user", "text": analysis.expected_text}
+    compact_turn = Turn(**base, speech_analysis=encode_speech_analysis(analysis))
+    full_turn = Turn(**base, speech_analysis=analysis.model_dump())
+    assert compact_turn.model_dump(by_alias=True) == full_turn.model_dump(by_alias=True)
+
+
+def test_analysis_with_token_timing_is_stored_as_is():
+    analysis = _graded_analysis(random.Random(11), 6)
+    analysis.actual_tokens[0] = Token(idx=0, text=analysis.actual_tokens[0].text, confidence=0.5)
+    stored = encode_speech_analysis(analysis)
+    assert not is_compact(stored)
+    assert stored == analysis.model_dump()
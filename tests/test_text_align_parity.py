@@ -0,0 +1,101 @@
+import random
+from typing import List, Tuple
+
+from controller.grading.text_align import AlignmentResult, align_words
+
+
+def _reference_align_words(expected: List[str], actual: List[str]) -> AlignmentResult:
+    rows = len(expected) + 1
+    cols = len(actual) + 1
+    dp = [[0] * cols for _ in range(rows)]
+    back = [[None] * cols for _ in range(rows)]
+
+    for i in range(1, rows):
+        dp[i][0] = i
+        back[i][0] = "del"
+    for j in range(1, cols):
+        dp[0][j] = j
+        back[0][j] = "ins"
+
+    for i in range(1, rows):
+        for j in range(1, cols):
+            cost = 0 if expected[i - 1] == actual[j - 1] else 1
+            options = [
+                (dp[i - 1][j] + 1, "del"),
+                (dp[i][j - 1] + 1, "ins"),
+                (dp[i - 1][j - 1] + cost, "sub" if cost else "eq"),
+            ]
+            best_cost, best_op = min(options, key=lambda x: x[0])
+            dp[i][j] = best_cost
+            back[i][j] = best_op
+
+    i, j = len(expected), len(actual)
+    subs = ins = dels = 0
+    aligned: List[Tuple[str, str]] = []
+    while i > 0 or j > 0:
+        op = back[i][j]
+        if op in ("eq", "sub"):
+            if op == "sub":
+                subs += 1
+            aligned.append((expected[i - 1], actual[j - 1]))
+            i -= 1
+            j -= 1
+        elif op == "del":
+            dels += 1
+            aligned.append((expected[i - 1], ""))
+            i -= 1
+        else:
+            ins += 1
+            aligned.append(("", actual[j - 1]))
+            j -= 1
+
+    aligned.reverse()
+    return AlignmentResult(subs, ins, dels, aligned)
+
+
+def _noisy_copy(rng: random.Random, tokens: List[str], vocab: List[str], noise: float) -> List[str]:
+    out: List[str] = []
+    for token in tokens:
+        roll = rng.random()
+        if roll < noise / 3:
+            continue
+        if roll < 2 * noise / 3:
+            out.append(rng.choice(vocab))
+        elif roll < noise:
+            out.extend([token, rng.choice(vocab)])
+        else:
+            out.append(token)
+    return out
+
+
+def test_align_words_edge_cases_match_reference():
+    cases = [
+        ([], []),
+        (["a"], []),
+        ([], ["a", "b"]),
+        (["a", "b", "c"], ["a", "b", "c"]),
+        (["a", "a", "a"], ["a"]),
+        (["a", "b"], ["b", "a"]),
+        (["i", "like", "coffee"], ["i", "like", "cofee"]),
+    ]
+    for expected, actual in cases:
+        assert align_words(expected, actual) == _reference_align_words(expected, actual)
+
+
+def test_align_words_random_parity_with_reference():
+    rng = random.Random(1234)
+    vocab = ["a", "b", "c", "d", "um", "the"]
+    for _ in range(400):
+        expected = [rng.choice(vocab) for _ in range(rng.randint(0, 30))]
+        actual = [rng.choice(vocab) for _ in range(rng.randint(0, 30))]
+        assert align_words(expected, actual) == _reference_align_words(expected, actual)
+
+
+def test_align_words_noisy_long_turn_parity_with_reference():
+    rng = random.Random(99)
+    vocab = [f"w{i}" for i in range(40)] + ["um", "uh", "like"]
+    for length in (10, 50, 200):
+        for noise in (0.05, 0.3, 0.9):
+            expected = [rng.choice(vocab) for _ in range(length)]
+            actual = _noisy_copy(rng, expected, vocab, noise)
+            assert align_words(expected, actual) == _reference_align_words(expected, actual)
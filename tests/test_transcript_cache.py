@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+import controller.grading.transcript_cache as transcript_cache
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    store = {}
+
+    async def fake_get(key):
+        return store.get(key)
+
+    async def fake_set(key, value, ttl_seconds):
+        store[key] = value
+
+    monkeypatch.setattr(transcript_cache, "cache_get_json", fake_get)
+    monkeypatch.setattr(transcript_cache, "cache_set_json", fake_set)
+    transcript_cache.clear_local_transcript_cache()
+    yield store
+    transcript_cache.clear_local_transcript_cache()
+
+
+def test_retry_hits_local_then_redis_cache(fake_redis):
+    calls = []
+
+    async def transcribe():
+        calls.append(1)
+        return "i would like a coffee"
+
+    first = asyncio.run(transcript_cache.get_or_transcribe("abc", "asr-1", transcribe))
+    second = asyncio.run(transcript_cache.get_or_transcribe("abc", "asr-1", transcribe))
+    transcript_cache.clear_local_transcript_cache()
+    third = asyncio.run(transcript_cache.get_or_transcribe("abc", "asr-1", transcribe))
+    other_model = asyncio.run(transcript_cache.get_or_transcribe("abc", "asr-2", transcribe))
+
+    assert first == ("i would like a coffee", False)
+    assert second == ("i would like a coffee", True)
+    assert third == ("i would like a coffee", True)
+    assert other_model == ("i would like a coffee", False)
+    assert len(calls) == 2
+    assert transcript_cache.transcript_cache_key("abc", "asr-1") in fake_redis
+
+
+def test_concurrent_duplicates_share_one_transcription(fake_redis):
+    calls = []
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def transcribe():
+            calls.append(1)
+            await release.wait()
+            return "hello"
+
+        tasks = [
+            asyncio.create_task(transcript_cache.get_or_transcribe("dup", "asr-1", transcribe))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    results = asyncio.run(scenario())
+    assert [text for text, _ in results] == ["hello", "hello", "hello"]
+    assert sorted(hit for _, hit in results) == [False, True, True]
+    assert len(calls) == 1
+
+
+def test_redis_failure_falls_back_to_transcription(monkeypatch):
+    async def broken(*args, **kwargs):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(transcript_cache, "cache_get_json", broken)
+    monkeypatch.setattr(transcript_cache, "cache_set_json", broken)
+    transcript_cache.clear_local_transcript_cache()
+    before = transcript_cache.transcript_cache_metrics()["redis_errors"]
+
+    async def transcribe():
+        return "ok"
+
+    assert asyncio.run(transcript_cache.get_or_transcribe("x", "asr-1", transcribe)) == ("ok", False)
+    assert transcript_cache.transcript_cache_metrics()["redis_errors"] == before + 2
+
+
+def test_cancelled_leader_does_not_fail_waiting_followers(fake_redis):
+    calls = []
+
+    async def scenario():
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def transcribe():
+            calls.append(1)
+            started.set()
+            await release.wait()
+            return "hello"
+
+        leader = asyncio.create_task(transcript_cache.get_or_transcribe("gone", "asr-1", transcribe))
+        await started.wait()
+        followers = [
+            asyncio.create_task(transcript_cache.get_or_transcribe("gone", "asr-1", transcribe)) for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*followers)
+
+    results = asyncio.run(scenario())
+    assert [text for text, _ in results] == ["hello", "hello"]
+    assert sorted(hit for _, hit in results) == [False, True]
+    # The leader's call plus one retry by the follower that took over.
+    assert len(calls) == 2
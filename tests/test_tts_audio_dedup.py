@@ -0,0 +1,209 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import controller.script_generation.audio as audio
+from controller.script_generation.r2_store import DeleteResult
+
+
+class _FakeTTSIndex:
+    def __init__(self):
+        self.docs = {}
+
+    async def claim(self, content_hash, key, url, **meta):
+        doc = self.docs.setdefault(
+            content_hash, {"_id": content_hash, "key": key, "url": url, "ready": False, "ref_count": 0}
+        )
+        doc["ref_count"] += 1
+        return dict(doc)
+
+    async def get(self, content_hash):
+        doc = self.docs.get(content_hash)
+        return dict(doc) if doc else None
+
+    async def acquire(self, content_hash, key, owner, lease_s):
+        doc = self.docs.get(content_hash)
+        if not doc or doc["key"] != key or doc["ready"] or doc.get("owner"):
+            return False
+        doc["owner"] = owner
+        return True
+
+    async def release_synthesis(self, content_hash, owner):
+        doc = self.docs.get(content_hash)
+        if doc and doc.get("owner") == owner:
+            doc.pop("owner")
+
+    async def mark_ready(self, content_hash, key):
+        doc = self.docs.get(content_hash)
+        if doc and doc["key"] == key:
+            doc["ready"] = True
+            doc.pop("owner", None)
+
+    async def release(self, key, count=1):
+        for content_hash, doc in list(self.docs.items()):
+            if doc["key"] == key:
+                doc["ref_count"] -= count
+                if doc["ref_count"] > 0:
+                    return False
+                del self.docs[content_hash]
+                return True
+        return None
+
+
+@pytest.fixture
+def tts_env(monkeypatch):
+    monkeypatch.setenv("CLOUDFLARE_R2_BUCKET", "bucket")
+    monkeypatch.setenv("CLOUDFLARE_R2_PUBLIC_URL", "https://cdn.example")
+    monkeypatch.setenv("TTS_DEDUP_ENABLED", "1")
+    index = _FakeTTSIndex()
+    uploads = []
+    deleted = []
+    synth_calls = []
+
+    async def fake_synthesize(client, tts_model, voice, text, user_id=None):
+        synth_calls.append((tts_model, voice, text))
+        return b"mp3"
+
+    async def fake_upload(audio_bytes, key):
+        uploads.append(key)
+        return f"https://cdn.example/{key}"
+
+    async def fake_delete_object(key):
+        deleted.append(key)
+
+    async def fake_delete_objects(keys):
+        deleted.extend(keys)
+        return DeleteResult(deleted=list(keys))
+
+    fake_r2 = SimpleNamespace(delete_object=fake_delete_object, delete_objects=fake_delete_objects)
+
+    monkeypatch.setattr(audio, "claim_tts_audio", index.claim)
+    monkeypatch.setattr(audio, "get_tts_audio", index.get)
+    monkeypatch.setattr(audio, "acquire_tts_synthesis", index.acquire)
+    monkeypatch.setattr(audio, "release_tts_synthesis", index.release_synthesis)
+    monkeypatch.setattr(audio, "mark_tts_audio_ready", index.mark_ready)
+    monkeypatch.setattr(audio, "_CLIP_POLL_S", 0.001)
+    monkeypatch.setattr(audio, "release_tts_audio", index.release)
+    monkeypatch.setattr(audio, "_synthesize_speech", fake_synthesize)
+    monkeypatch.setattr(audio, "upload_audio_bytes", fake_upload)
+    monkeypatch.setattr(audio, "get_r2_store", lambda: fake_r2)
+    return SimpleNamespace(index=index, uploads=uploads, deleted=deleted, synth_calls=synth_calls)
+
+
+def test_identical_lines_are_synthesized_once(tts_env):
+    async def scenario():
+        first = await audio.generate_audio_url(None, "Hello  there!", "alloy", "scripts/u1/cafe")
+        second = await audio.generate_audio_url(None, "Hello there!", "alloy", "scripts/u2/cafe")
+        other_voice = await audio.generate_audio_url(None, "Hello there!", "nova", "scripts/u2/cafe")
+        return first, second, other_voice
+
+    first, second, other_voice = asyncio.run(scenario())
+    assert first == second
+    assert other_voice != first
+    assert first.startswith("https://cdn.example/tts/")
+    assert len(tts_env.synth_calls) == 2
+    assert len(tts_env.uploads) == 2
+
+
+def test_shared_clip_deleted_only_after_last_reference(tts_env):
+    url = asyncio.run(audio.generate_audio_url(None, "Welcome back", "alloy", "scripts/u1/cafe"))
+    asyncio.run(audio.generate_audio_url(None, "Welcome back", "alloy", "scripts/u2/cafe"))
+    key = url.replace("https://cdn.example/", "")
+
+    assert asyncio.run(audio.delete_audio_by_urls([url])) == 0
+    assert tts_env.deleted == []
+
+    user_audio = "https://cdn.example/user-audio/u1/s1/turn-1.mp3"
+    assert asyncio.run(audio.delete_audio_by_urls([url, user_audio])) == 2
+    assert tts_env.deleted == [key, "user-audio/u1/s1/turn-1.mp3"]
+
+
+def test_repeated_shared_urls_release_all_references_at_once(tts_env):
+    url = asyncio.run(audio.generate_audio_url(None, "Welcome back", "alloy", "scripts/u1/cafe"))
+    asyncio.run(audio.generate_audio_url(None, "Welcome back", "alloy", "scripts/u1/cafe"))
+    key = url.replace("https://cdn.example/", "")
+
+    assert asyncio.run(audio.delete_audio_by_urls([url, url])) == 1
+    assert tts_env.deleted == [key]
+    assert tts_env.index.docs == {}
+
+
+def test_unreleased_shared_references_come_back_for_retry(tts_env, monkeypatch):
+    url = asyncio.run(audio.generate_audio_url(None, "Welcome back", "alloy", "scripts/u1/cafe"))
+    asyncio.run(audio.generate_audio_url(None, "Welcome back", "alloy", "scripts/u1/cafe"))
+    key = url.replace("https://cdn.example/", "")
+    release = tts_env.index.release
+
+    async def index_down(key, count=1):
+        raise RuntimeError("mongo down")
+
+    monkeypatch.setattr(audio, "release_tts_audio", index_down)
+    result = asyncio.run(audio.delete_audio_objects([url, url, "https://cdn.example/user-audio/u1/a.mp3"]))
+
+    assert result.failed_keys == [key, key]
+    assert tts_env.deleted == ["user-audio/u1/a.mp3"]
+
+    # The retry path releases both references and deletes the clip only then.
+    monkeypatch.setattr(audio, "release_tts_audio", release)
+    retried = asyncio.run(audio.delete_audio_keys(result.failed_keys, []))
+
+    assert retried.failed == [] and tts_env.deleted[-1] == key
+    assert tts_env.index.docs == {}
+
+
+def test_failed_synthesis_releases_claim(tts_env, monkeypatch):
+    async def failing_synthesize(client, tts_model, voice, text, user_id=None):
+        raise RuntimeError("tts down")
+
+    monkeypatch.setattr(audio, "_synthesize_speech", failing_synthesize)
+    with pytest.raises(RuntimeError):
+        asyncio.run(audio.generate_audio_url(None, "Bye", "alloy", "scripts/u1/cafe"))
+    assert tts_env.index.docs == {}
+
+
+def test_concurrent_claimers_wait_for_the_one_synthesizing(tts_env, monkeypatch):
+    async def slow_synthesize(client, tts_model, voice, text, user_id=None):
+        tts_env.synth_calls.append(text)
+        await asyncio.sleep(0.02)
+        return b"mp3"
+
+    monkeypatch.setattr(audio, "_synthesize_speech", slow_synthesize)
+
+    async def scenario():
+        return await asyncio.gather(
+            *(audio.generate_audio_url(None, "Same line", "alloy", f"scripts/u{i}/cafe") for i in range(5))
+        )
+
+    urls = asyncio.run(scenario())
+    assert len(set(urls)) == 1
+    assert tts_env.synth_calls == ["Same line"]
+    [doc] = tts_env.index.docs.values()
+    assert doc["ref_count"] == 5 and doc["ready"]
+
+
+def test_waiter_takes_over_when_the_synthesizer_fails(tts_env, monkeypatch):
+    attempts = []
+
+    async def flaky_synthesize(client, tts_model, voice, text, user_id=None):
+        attempts.append(text)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise RuntimeError("tts down")
+        return b"mp3"
+
+    monkeypatch.setattr(audio, "_synthesize_speech", flaky_synthesize)
+
+    async def scenario():
+        return await asyncio.gather(
+            audio.generate_audio_url(None, "Retry me", "alloy", "scripts/u1/cafe"),
+            audio.generate_audio_url(None, "Retry me", "alloy", "scripts/u2/cafe"),
+            return_exceptions=True,
+        )
+
+    first, second = asyncio.run(scenario())
+    assert isinstance(first, RuntimeError)
+    assert second.startswith("https://cdn.example/tts/")
+    assert len(attempts) == 2
+    [doc] = tts_env.index.docs.values()
+    assert doc["ref_count"] == 1 and doc["ready"]
@@ -0,0 +1,126 @@
+import asyncio
+import random
+from types import SimpleNamespace
+
+from bson import ObjectId
+
+import repositories.session as session_repo
+import repositories.turn_analysis as turn_analysis_repo
+from controller.grading.scoring import grade_turn
+from controller.grading.speech_analysis_builder import project_speech_analysis
+from schemas.imports import TurnScore, TurnUpdate
+from schemas.session import ScriptTurnsUpdate, SessionUpdate
+from schemas.speech_analysis_codec import is_compact
+from synthetic_turns import synthetic_turn
+
+
+def _analysis(seed: int):
+    expected, actual = synthetic_turn(random.Random(seed), 10)
+    result = grade_turn(expected, actual, 1.0)
+    return project_speech_analysis(result, expected_text=" ".join(expected), asr_text=" ".join(actual))
+
+
+def _doc(session_id, **turn_extra):
+    return {
+        "_id": session_id,
+        "userId": "u1",
+        "scenario": "cafe_ordering",
+        "script": {
+            "totalNumberOfTurns": 2,
+            "turns": [
+                {"index": 0, "role": "ai", "text": "Hi"},
+                {"index": 1, "role": "user", "text": "Hello", **turn_extra},
+            ],
+        },
+    }
+
+
+class FakeAnalyses:
+    def __init__(self):
+        self.docs = {}
+        self.finds = []
+
+    async def bulk_write(self, requests, ordered=True):
+        for request in requests:
+            doc = request._doc["$set"]
+            key = (request._filter["session_id"], request._filter["turn_index"])
+            self.docs[key] = {"session_id": key[0], "turn_index": key[1], **doc}
+
+    def find(self, filter_dict, projection=None):
+        self.finds.append(filter_dict)
+        wanted = set(filter_dict["session_id"]["$in"])
+
+        async def cursor():
+            for (session_id, _), doc in list(self.docs.items()):
+                if session_id in wanted:
+                    yield doc
+
+        return cursor()
+
+
+def test_update_writes_analysis_to_its_own_collection(monkeypatch):
+    session_id = ObjectId()
+    analyses = FakeAnalyses()
+    calls = []
+
+    async def find_one_and_update(filter_dict, update, **kwargs):
+        calls.append((update, kwargs))
+        return _doc(session_id, score={"confidence": 80, "fluency": 70, "hesitation": 60})
+
+    monkeypatch.setattr(session_repo, "db", SimpleNamespace(sessions=SimpleNamespace(find_one_and_update=find_one_and_update)))
+    monkeypatch.setattr(turn_analysis_repo, "db", {"turn_analyses": analyses})
+
+    analysis = _analysis(1)
+    update = SessionUpdate(
+        script=ScriptTurnsUpdate(
+            turns=[TurnUpdate(index=1, score=TurnScore(confidence=80, fluency=70, hesitation=60), speech_analysis=analysis)]
+        )
+    )
+    out = asyncio.run(session_repo.update_session({"_id": session_id}, update))
+
+    [(pipeline, kwargs)] = calls
+    merge = pipeline[0]["$set"]["script.turns"]["$map"]["in"]["$cond"][1]["$mergeObjects"][1]["$literal"]
+    assert merge["speech_analysis"] is None
+    assert kwargs["projection"] == {"script.turns.speech_analysis": 0}
+    stored = analyses.docs[(str(session_id), 1)]
+    assert stored["user_id"] == "u1" and is_compact(stored["analysis"])
+    assert out.script.turns[1].speech_analysis == analysis
+
+
+def test_list_loads_analyses_for_all_sessions_in_one_query(monkeypatch):
+    ids = [ObjectId(), ObjectId()]
+    analyses = FakeAnalyses()
+    finds = []
+
+    def find(filter_dict, projection=None):
+        finds.append(projection)
+
+        class Cursor:
+            def sort(self, keys):
+                return self
+
+            def skip(self, n):
+                return self
+
+            def limit(self, n):
+                return self
+
+            async def to_list(self, length):
+                return [_doc(session_id) for session_id in ids]
+
+        return Cursor()
+
+    monkeypatch.setattr(session_repo, "db", SimpleNamespace(sessions=SimpleNamespace(find=find)))
+    monkeypatch.setattr(turn_analysis_repo, "db", {"turn_analyses": analyses})
+    asyncio.run(turn_analysis_repo.save_turn_analyses(str(ids[1]), "u1", {1: _analysis(2)}))
+
+    plain = asyncio.run(session_repo.get_sessions({"userId": "u1"}))
+    assert finds == [{"script.turns.speech_analysis": 0}]
+    assert analyses.finds == []
+    assert all(turn.speech_analysis is None for session in plain for turn in session.script.turns)
+
+    loaded = asyncio.run(session_repo.get_sessions({"userId": "u1"}, include_speech_analysis=True))
+    assert finds[-1] is None
+    assert analyses.finds == [{"session_id": {"$in": [str(i) for i in ids]}}]
+    assert loaded[0].script.turns[1].speech_analysis is None
+    assert loaded[1].script.turns[1].speech_analysis == _analysis(2)
@@ -0,0 +1,123 @@
+import asyncio
+import importlib
+from types import SimpleNamespace
+
+from bson import ObjectId
+
+from controller.grading.audio_source import SpooledAudio
+
+# controller.grading re-exports a function under the module's name.
+turn_scoring = importlib.import_module("controller.grading.calculate_turn_score")
+
+SESSION_ID = str(ObjectId())
+USER_ID = str(ObjectId())
+
+
+class _FakeUpload:
+    def __init__(self, data: bytes):
+        self._data = data
+        self._pos = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        if size < 0:
+            size = len(self._data) - self._pos
+        chunk = self._data[self._pos : self._pos + size]
+        self._pos += len(chunk)
+        return chunk
+
+
+def _session():
+    turns = [
+        SimpleNamespace(index=0, role="ai", text="Hello, what can I get you?"),
+        SimpleNamespace(index=1, role="user", text="I would like a coffee"),
+    ]
+    return SimpleNamespace(script=SimpleNamespace(turns=turns))
+
+
+def test_spooled_audio_moves_large_uploads_to_disk():
+    data = b"x" * 5000
+    spooled = asyncio.run(SpooledAudio.from_upload(_FakeUpload(data), max_memory_bytes=1024))
+    assert spooled.on_disk
+    with spooled.open() as first, spooled.open() as second:
+        assert first.read(10) == data[:10]
+        assert second.read() == data
+    spooled.cleanup()
+    assert not spooled.on_disk
+
+
+def test_pipelined_mode_overlaps_upload_and_finalizes_in_background(monkeypatch):
+    monkeypatch.setenv("TURN_SCORING_PIPELINE", "1")
+    events = []
+    updates = []
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def fake_asr(audio, user_id=None):
+            events.append("asr_start")
+            await asyncio.sleep(0)
+            return "I would like a cofee", {"model": "test-asr"}
+
+        async def fake_upload(audio_file, key):
+            events.append("upload_start")
+            await release.wait()
+            return f"https://r2.example/{key}"
+
+        async def fake_update_session(filter_dict, payload):
+            updates.append(payload)
+
+        monkeypatch.setattr(turn_scoring, "_run_asr", fake_asr)
+        monkeypatch.setattr(turn_scoring, "upload_audio_file", fake_upload)
+        monkeypatch.setattr(turn_scoring, "update_session", fake_update_session)
+
+        payload = await turn_scoring.calculate_turn_score(
+            session_id=SESSION_ID,
+            user_id=USER_ID,
+            turn_index=1,
+            audio=b"mp3-bytes",
+            session=_session(),
+        )
+        turn_update = payload.script.turns[0]
+        assert turn_update.score is not None
+        assert turn_update.user_audio_url is None
+        assert updates == []
+
+        release.set()
+        await asyncio.gather(*list(turn_scoring._background_uploads))
+        return payload
+
+    asyncio.run(scenario())
+
+    assert sorted(events) == ["asr_start", "upload_start"]
+    assert len(updates) == 1
+    finalized = updates[0].script.turns[0]
+    assert finalized.index == 1
+    assert finalized.user_audio_url.endswith(f"user-audio/{USER_ID}/{SESSION_ID}/turn-1.mp3")
+    assert finalized.score is None
+
+
+def test_sequential_mode_includes_audio_url(monkeypatch):
+    monkeypatch.delenv("TURN_SCORING_PIPELINE", raising=False)
+
+    async def fake_asr(audio, user_id=None):
+        return "I would like a coffee", {"model": "test-asr"}
+
+    async def fake_upload(audio_file, key):
+        assert audio_file.read() == b"mp3-bytes"
+        return f"https://r2.example/{key}"
+
+    monkeypatch.setattr(turn_scoring, "_run_asr", fake_asr)
+    monkeypatch.setattr(turn_scoring, "upload_audio_file", fake_upload)
+
+    payload = asyncio.run(
+        turn_scoring.calculate_turn_score(
+            session_id=SESSION_ID,
+            user_id=USER_ID,
+            turn_index=1,
+            audio=b"mp3-bytes",
+            session=_session(),
+        )
+    )
+    turn_update = payload.script.turns[0]
+    assert turn_update.user_audio_url.startswith("https://r2.example/user-audio/")
+    assert turn_update.score.confidence == 100